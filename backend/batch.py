@@ -0,0 +1,78 @@
+"""코호트 배치 분석 CLI
+
+사용법:
+    python batch.py manifest.json [--upload-dir uploads] [--batch-id ID]
+
+manifest.json 형식 (파일 경로는 --upload-dir 기준 상대 경로 또는 절대 경로):
+    {
+      "name": "2025 1기",
+      "companies": [
+        {
+          "company": "회사A",
+          "mentor_input": {"growth": "...", "kpi": "...", "strategy": "..."},
+          "business_plan_files": ["a/plan.pdf"],
+          "meeting_audio_files": ["a/meeting1.m4a"]
+        }
+      ]
+    }
+
+같은 manifest로 다시 실행하면 체크포인트에서 이어서 처리하고, 끝나면 결과 번들(zip) 경로와
+처리량(회사/시간)을 출력합니다. 같은 배치를 다른 프로세스가 실행 중이면 실행하지 않고 종료합니다.
+"""
+import argparse
+import asyncio
+import hashlib
+
+from config import WHISPER_PRELOAD, BATCH_DB_PATH, BATCH_OUTPUT_DIR, BATCH_MAX_COMPANIES, JOB_LEASE_SECONDS
+from models.schemas import BatchManifest
+from services.batch_manager import BatchManager
+from services.pipeline import run_analysis
+from services.stt_service import preload_whisper_models, shutdown_stt_pool
+from services.gpt_service import init_llm_client, close_llm_client
+
+
+async def main(manifest_path: str, upload_dir: str, batch_id: str = None) -> None:
+    with open(manifest_path, 'rb') as f:
+        raw = f.read()
+    manifest = BatchManifest.model_validate_json(raw)
+    # manifest 내용으로 배치 ID를 정해서 같은 manifest는 이어서 실행
+    batch_id = batch_id or "cli-" + hashlib.sha256(raw).hexdigest()[:16]
+
+    if WHISPER_PRELOAD:
+        await asyncio.to_thread(preload_whisper_models)
+    init_llm_client()
+
+    manager = BatchManager(
+        BATCH_DB_PATH,
+        BATCH_OUTPUT_DIR,
+        BATCH_MAX_COMPANIES,
+        lambda request, progress: run_analysis(request, upload_dir, progress),
+        source="cli",
+        lease_seconds=JOB_LEASE_SECONDS,
+    )
+    manager.create(manifest, batch_id)
+    print(f"🏁 배치 {batch_id}: {len(manifest.companies)}개 회사")
+    try:
+        ran = await manager.run_batch(batch_id)
+    finally:
+        await close_llm_client()
+        shutdown_stt_pool()
+    if not ran:
+        return
+
+    batch = manager.get_batch(batch_id)
+    for company in batch["companies"]:
+        if company["error"]:
+            print(f"  ❌ {company['company']}: {company['error']}")
+    print(f"📦 결과 번들: {manager.bundle_path(batch_id)}")
+    print(f"⏱️ 처리량: {batch['companies_per_hour']}개 회사/시간 "
+          f"({batch['completed']}/{batch['total']}개 성공, {batch['elapsed_seconds']:.0f}초)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Station C 코호트 배치 분석")
+    parser.add_argument("manifest", help="회사별 파일과 멘토 입력을 담은 manifest JSON 경로")
+    parser.add_argument("--upload-dir", default="uploads", help="manifest 파일 경로의 기준 디렉토리")
+    parser.add_argument("--batch-id", default=None, help="이어서 실행할 배치 ID (기본값: manifest 내용 해시)")
+    args = parser.parse_args()
+    asyncio.run(main(args.manifest, args.upload_dir, args.batch_id))
@@ -0,0 +1,225 @@
+"""벤치마크용 합성 문서/오디오 생성
+
+같은 seed와 scale이면 항상 같은 파일이 만들어지므로 커밋 간 결과를 비교할 수 있습니다.
+HWP는 쓰기 라이브러리가 없어 생성하지 않고, hwp_dir을 지정하면 그 안의 실제 HWP 파일을 포함합니다.
+합성 오디오는 발화가 없는 톤이므로, STT 정확도(WER/CER)는 speech_dir의 실제 한국어 녹음과
+같은 이름의 정답 전사(.txt)로 측정합니다.
+"""
+import glob
+import math
+import os
+import random
+import shutil
+import struct
+import subprocess
+import wave
+
+SAMPLE_RATE = 16000
+
+# 정확도 측정용 실제 녹음 확장자
+SPEECH_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg")
+
+# 텍스트 레이어용 기본 문구 (PDF 내장 폰트는 한글을 지원하지 않아 영문)
+_LATIN_WORDS = (
+    "revenue growth market customer subscription platform pilot hospital investment seed series "
+    "target retention churn pricing partner channel roadmap hiring engineer sales budget runway"
+).split()
+
+_SEED_TEXT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "test_meeting_audio.txt")
+
+
+def _korean_lines(rng: random.Random, count: int) -> list:
+    # 저장소의 예시 미팅 녹취록 문장을 섞어서 사용
+    try:
+        with open(_SEED_TEXT_PATH, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if len(line.strip()) > 10]
+    except OSError:
+        lines = []
+    if not lines:
+        lines = ["올해 매출 목표는 12억원이며 병원 파트너 3곳과 파일럿을 진행 중입니다."]
+    return [rng.choice(lines) for _ in range(count)]
+
+
+def _latin_line(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(_LATIN_WORDS) for _ in range(words))
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(path: str, pages: int, rng: random.Random, lines_per_page: int = 45) -> None:
+    """텍스트 레이어가 있는 PDF (Helvetica, 외부 라이브러리 없이 직접 작성)"""
+    body = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    page_ids = []
+    next_id = 4
+    for page in range(pages):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        lines = [f"Page {page + 1}"] + [_latin_line(rng) for _ in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        body[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+        body[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(page_id)
+    body[2] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in range(1, next_id):
+        offsets[object_id] = len(out)
+        out += f"{object_id} 0 obj\n{body[object_id]}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {next_id}\n0000000000 65535 f \n".encode()
+    for object_id in range(1, next_id):
+        out += f"{offsets[object_id]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _text_image(rng: random.Random, lines: int = 30, size=(1240, 1754)):
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    for index in range(lines):
+        draw.text((80, 80 + index * 50), _latin_line(rng, 10), fill=0)
+    return image
+
+
+def make_scanned_pdf(path: str, pages: int, rng: random.Random) -> None:
+    """텍스트 레이어 없이 이미지로만 된 PDF (스캔본, 모든 페이지 OCR 대상)"""
+    images = [_text_image(rng) for _ in range(pages)]
+    images[0].save(path, "PDF", resolution=150, save_all=True, append_images=images[1:])
+
+
+def make_mixed_pdf(path: str, text_pages: int, scanned_pages: int, rng: random.Random, work_dir: str) -> None:
+    """텍스트 페이지와 스캔 페이지가 섞인 PDF (선택적 OCR 확인용)"""
+    from PyPDF2 import PdfReader, PdfWriter
+
+    text_path = os.path.join(work_dir, "_mixed_text.pdf")
+    scanned_path = os.path.join(work_dir, "_mixed_scanned.pdf")
+    make_text_pdf(text_path, text_pages, rng)
+    make_scanned_pdf(scanned_path, scanned_pages, rng)
+    writer = PdfWriter()
+    for source in (text_path, scanned_path):
+        for page in PdfReader(source).pages:
+            writer.add_page(page)
+    with open(path, "wb") as f:
+        writer.write(f)
+    os.remove(text_path)
+    os.remove(scanned_path)
+
+
+def make_docx(path: str, paragraphs: int, tables: int, rng: random.Random) -> None:
+    """문단과 표가 있는 DOCX"""
+    from docx import Document
+
+    document = Document()
+    document.add_heading("사업계획서", level=1)
+    for line in _korean_lines(rng, paragraphs):
+        document.add_paragraph(line)
+    for _ in range(tables):
+        table = document.add_table(rows=6, cols=4)
+        for row in range(6):
+            for col in range(4):
+                table.cell(row, col).text = f"{rng.randint(1, 999)}백만원" if row and col else f"항목 {row}-{col}"
+    document.save(path)
+
+
+def make_image(path: str, rng: random.Random) -> None:
+    """텍스트가 그려진 이미지 (OCR 대상)"""
+    _text_image(rng, lines=20, size=(1240, 1100)).save(path)
+
+
+def make_audio(path: str, seconds: float, rng: random.Random) -> None:
+    """16kHz mono WAV - 음성 대역 톤(발화)과 무음이 번갈아 나옴 (VAD 분할 확인용)"""
+    total = int(seconds * SAMPLE_RATE)
+    frames = bytearray()
+    position = 0
+    while position < total:
+        voiced = min(total - position, int(rng.uniform(3, 12) * SAMPLE_RATE))
+        frequency = rng.uniform(120, 260)
+        for n in range(voiced):
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * n / SAMPLE_RATE)
+            value = 9000 * envelope * math.sin(2 * math.pi * frequency * n / SAMPLE_RATE)
+            frames += struct.pack("<h", int(value + rng.gauss(0, 200)))
+        position += voiced
+        silence = min(total - position, int(rng.uniform(0.6, 3) * SAMPLE_RATE))
+        frames += b"".join(struct.pack("<h", int(rng.gauss(0, 30))) for _ in range(silence))
+        position += silence
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(bytes(frames))
+
+
+def audio_duration(path: str) -> float:
+    """오디오 길이(초) - WAV는 직접 읽고, 나머지는 ffprobe 사용"""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as f:
+            return f.getnframes() / f.getframerate()
+    output = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip())
+
+
+def build_corpus(out_dir: str, scale: int = 1, seed: int = 42, hwp_dir: str = None,
+                 audio_seconds: tuple = (30, 120), speech_dir: str = None) -> list:
+    """합성 코퍼스 생성 후 [{"kind", "path", "bytes", ...}] 반환
+
+    scale을 키우면 페이지 수/문단 수가 비례해서 늘어납니다.
+    speech_dir의 녹음은 정답 전사(같은 이름의 .txt)가 있으면 "reference"로 함께 담깁니다.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    items = []
+
+    def add(kind: str, filename: str, build, **meta) -> None:
+        path = os.path.join(out_dir, filename)
+        try:
+            build(path)
+        except Exception as e:
+            print(f"⚠️ 코퍼스 생성 실패 {filename}: {e}")
+            return
+        items.append({"kind": kind, "path": path, "bytes": os.path.getsize(path), **meta})
+
+    add("pdf_text", "plan_text.pdf", lambda p: make_text_pdf(p, 10 * scale, rng), pages=10 * scale)
+    add("pdf_scanned", "plan_scanned.pdf", lambda p: make_scanned_pdf(p, 2 * scale, rng), pages=2 * scale)
+    add("pdf_mixed", "plan_mixed.pdf", lambda p: make_mixed_pdf(p, 6 * scale, scale, rng, out_dir),
+        pages=7 * scale)
+    add("docx", "plan.docx", lambda p: make_docx(p, 80 * scale, 2 * scale, rng))
+    add("image", "plan_scan.png", lambda p: make_image(p, rng))
+    for seconds in audio_seconds:
+        add("audio", f"meeting_{int(seconds)}s.wav", lambda p, s=seconds: make_audio(p, s, rng), seconds=seconds)
+
+    if hwp_dir:
+        for source in sorted(glob.glob(os.path.join(hwp_dir, "*.hwp"))):
+            add("hwp", os.path.basename(source), lambda p, s=source: shutil.copyfile(s, p))
+
+    if speech_dir:
+        for source in sorted(glob.glob(os.path.join(speech_dir, "*"))):
+            stem, extension = os.path.splitext(source)
+            if extension.lower() not in SPEECH_EXTENSIONS:
+                continue
+            reference = None
+            if os.path.exists(stem + ".txt"):
+                with open(stem + ".txt", encoding="utf-8") as f:
+                    reference = f.read()
+            try:
+                seconds = audio_duration(source)
+            except Exception as e:
+                print(f"⚠️ 오디오 길이 확인 실패 {os.path.basename(source)}: {e}")
+                continue
+            add("audio", os.path.basename(source), lambda p, s=source: shutil.copyfile(s, p),
+                seconds=seconds, reference=reference)
+    return items
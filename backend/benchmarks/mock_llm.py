@@ -0,0 +1,136 @@
+"""OpenAI 호환 모의 LLM 서버 (벤치마크용)
+
+실제 API 대신 설정한 지연 시간 후 고정된 형식의 응답을 돌려줍니다.
+단독 실행도 가능합니다:
+    python -m benchmarks.mock_llm --port 8100 --latency 0.5
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock python main.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_FILLER = "■ 모의 응답 - 미팅 내용과 사업계획서를 바탕으로 정리한 진단 내용입니다. "
+
+
+def _estimate_tokens(text: str) -> int:
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii) // 4 + 1
+
+
+def create_app(latency: float = 0.5, tokens_per_second: float = 200.0,
+               completion_tokens: int = 300, error_rate: float = 0.0) -> FastAPI:
+    """모의 서버 앱 생성
+
+    응답 시간은 latency(첫 토큰까지) + completion_tokens / tokens_per_second 초이고,
+    error_rate 비율만큼 429(Retry-After: 0)를 돌려줘 재시도 경로도 측정할 수 있습니다.
+    """
+    app = FastAPI()
+    stats = {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    app.state.stats = stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "mock rate limit", "type": "rate_limit_error"}},
+                status_code=429,
+                headers={"retry-after": "0"},
+            )
+
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+        text = (_FILLER * (completion_tokens // _estimate_tokens(_FILLER) + 1))[:completion_tokens]
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            keys = response_format["json_schema"]["schema"].get("properties", {}).keys()
+            text = json.dumps({key: text for key in keys}, ensure_ascii=False)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        base = {"id": f"mock-{stats['requests']}", "created": int(time.time()), "model": body.get("model", "mock")}
+
+        await asyncio.sleep(latency)
+        if not body.get("stream"):
+            await asyncio.sleep(completion_tokens / tokens_per_second)
+            return {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            }
+
+        async def events():
+            piece = 20
+            for start in range(0, len(text), piece):
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": text[start:start + piece]}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(_estimate_tokens(text[start:start + piece]) / tokens_per_second)
+            done = {**base, "object": "chat.completion.chunk",
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\n"
+            yield f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+class MockLLMServer:
+    """모의 서버를 백그라운드 스레드에서 실행"""
+
+    def __init__(self, port: int = 8100, **options):
+        self.port = port
+        self.app = create_app(**options)
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def stats(self) -> dict:
+        return dict(self.app.state.stats)
+
+    def start(self) -> "MockLLMServer":
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("모의 LLM 서버를 시작하지 못했습니다")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI 호환 모의 LLM 서버")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5, help="첫 토큰까지 지연 시간(초)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency, args.tokens_per_second, args.completion_tokens, args.error_rate),
+        host="127.0.0.1", port=args.port,
+    )
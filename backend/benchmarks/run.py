@@ -0,0 +1,501 @@
+"""분석 파이프라인 벤치마크
+
+합성 코퍼스로 파일 형식별 추출, STT, 전체 /analyze 흐름을 측정하고 결과를 JSON으로 저장합니다.
+LLM은 로컬 모의 서버(benchmarks.mock_llm)를 사용하므로 API 키나 비용 없이 반복 실행할 수 있습니다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.run
+    python -m benchmarks.run --suites extract,analyze --scale 2 --repeat 5 --llm-latency 1.0
+    python -m benchmarks.run --baseline benchmarks/results/이전결과.json
+
+결과 파일에는 단계별 지연시간 p50/p95/p99, 처리량, 최대 메모리(RSS)와 커밋 정보가 들어갑니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+SUITES = ("startup", "extract", "stt", "analyze")
+
+# 새 프로세스에서 API 모듈을 불러오고 시작 리포트를 JSON으로 출력
+_STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+from utils.plugins import startup_report
+print(json.dumps({"import_seconds": seconds, **startup_report()}))
+"""
+
+
+def percentiles(values: list) -> dict:
+    """지연시간 목록 -> min/mean/p50/p95/p99/max (초)"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 4)
+
+    return {
+        "min": round(ordered[0], 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class RSSSampler:
+    """with 블록 동안 프로세스 메모리(RSS)를 주기적으로 측정해 최대값 기록"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            # /proc이 없는 환경은 프로세스 전체 최대값으로 대신함 (Linux는 KB, macOS는 바이트)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self.peak = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak / (1024 * 1024), 1)
+
+
+def _children_peak_mb() -> float:
+    # 추출/PDF 워커 프로세스 중 가장 큰 RSS
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round((maxrss if sys.platform == "darwin" else maxrss * 1024) / (1024 * 1024), 1)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _top_imports(importtime_log: str, limit: int = 15) -> list:
+    """python -X importtime 출력에서 누적 시간이 큰 최상위 패키지 (초)"""
+    costs = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            package = name.strip().split(".")[0]
+            costs[package] = max(costs.get(package, 0), int(cumulative.strip()))
+    ranked = sorted(costs.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"module": name, "seconds": round(micros / 1e6, 4)} for name, micros in ranked]
+
+
+async def bench_startup(repeat: int) -> dict:
+    """API 모듈 import 시간, 메모리, 무거운 모듈(torch/whisper/PIL 등) 로드 여부와 import 비용 상위 패키지"""
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "WHISPER_PRELOAD": "false"}
+    latencies = []
+    report = {}
+    importtime_log = ""
+    for index in range(repeat):
+        command = [sys.executable] + (["-X", "importtime"] if index == 0 else []) + ["-c", _STARTUP_SCRIPT]
+        process = await asyncio.to_thread(subprocess.run, command, env=env, capture_output=True, text=True)
+        if process.returncode != 0:
+            return {"skipped": f"API 모듈 import 실패: {process.stderr.strip().splitlines()[-1:]}"}
+        report = json.loads(process.stdout.strip().splitlines()[-1])
+        if index == 0:
+            # importtime 측정은 자체 오버헤드가 있어 지연시간 집계에서는 제외
+            importtime_log = process.stderr
+        else:
+            latencies.append(report["import_seconds"])
+    if not latencies:
+        latencies.append(report["import_seconds"])
+
+    loaded = [name for name, present in report["heavy_modules"].items() if present]
+    print(f"  🚀 API import p50 {percentiles(latencies)['p50']:.2f}초, RSS {report['rss_mb']}MB, "
+          f"무거운 모듈: {', '.join(loaded) or '없음'}")
+    return {
+        "latency": percentiles(latencies),
+        "rss_mb": report["rss_mb"],
+        "modules": report["modules"],
+        "heavy_modules": report["heavy_modules"],
+        "top_imports": _top_imports(importtime_log),
+    }
+
+
+async def bench_extract(corpus: list, repeat: int) -> dict:
+    """파일 형식별 추출 측정 (분석과 같은 extraction_service 경로 - 추출 워커 프로세스, PDF 페이지 병렬)"""
+    from services.extraction_service import extract_file
+    from utils.document import error_document
+    from utils.file_processor import is_extraction_error
+
+    cases = {}
+    for item in corpus:
+        if item["kind"] == "audio":
+            continue
+        latencies = []
+        document = {"text": ""}
+        for _ in range(repeat):
+            started = time.perf_counter()
+            try:
+                document = await extract_file(item["path"])
+            except Exception as e:
+                document = error_document(str(e))
+            latencies.append(time.perf_counter() - started)
+        text = document["text"]
+        median = percentiles(latencies)["p50"] or 1e-9
+        case = {
+            "kind": item["kind"],
+            "bytes": item["bytes"],
+            "characters": len(text),
+            "latency": percentiles(latencies),
+            "mb_per_second": round(item["bytes"] / (1024 * 1024) / median, 3),
+        }
+        if "pages" in item:
+            case["pages"] = item["pages"]
+            case["pages_per_second"] = round(item["pages"] / median, 2)
+        if is_extraction_error(document):
+            case["error"] = document["error"][:300]
+        cases[os.path.basename(item["path"])] = case
+        print(f"  📄 {os.path.basename(item['path'])}: p50 {case['latency']['p50']:.3f}초, {len(text)}자"
+              + (" (오류)" if "error" in case else ""))
+    return {"cases": cases}
+
+
+def _edit_distance(reference: list, hypothesis: list) -> int:
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp)))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(reference: str, hypothesis: str) -> dict:
+    """WER(어절 단위)와 CER(공백 제외 글자 단위) - 문장 부호와 대소문자는 무시"""
+    def normalize(text: str) -> str:
+        return " ".join("".join(ch if ch.isalnum() else " " for ch in text.lower()).split())
+
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    words, chars = reference.split(), reference.replace(" ", "")
+    return {
+        "wer": round(_edit_distance(words, hypothesis.split()) / max(len(words), 1), 4),
+        "cer": round(_edit_distance(list(chars), list(hypothesis.replace(" ", ""))) / max(len(chars), 1), 4),
+    }
+
+
+async def bench_stt(corpus: list, repeat: int, variants: list) -> dict:
+    """STT 백엔드/모델별 측정 - 실시간 대비 처리 배율(RTF), 정답 전사가 있으면 WER/CER
+
+    variants는 (백엔드, 모델 크기) 목록입니다 (예: whisper/tiny와 faster_whisper/small 비교).
+    """
+    try:
+        from services.stt_service import transcribe_file, shutdown_stt_pool
+    except ImportError as e:
+        return {"skipped": f"STT 의존성 없음: {e}"}
+
+    cases = {}
+    summary = {}
+    try:
+        for backend, model_size in variants:
+            variant = f"{backend}/{model_size}"
+            factors, accuracy = [], []
+            for item in corpus:
+                if item["kind"] != "audio":
+                    continue
+                latencies = []
+                result = {"text": "", "segments": []}
+                try:
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        result = await transcribe_file(item["path"], model_size, backend)
+                        latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    # 백엔드 미설치, 모델 다운로드 실패 등은 해당 조합만 건너뜀
+                    print(f"  ⏭️ {variant} 건너뜀 - {type(e).__name__}: {e}")
+                    break
+                median = percentiles(latencies)["p50"] or 1e-9
+                case = {
+                    "backend": backend,
+                    "model": model_size,
+                    "audio_seconds": item["seconds"],
+                    "segments": len(result["segments"]),
+                    "latency": percentiles(latencies),
+                    "real_time_factor": round(median / item["seconds"], 4),
+                    "audio_seconds_per_second": round(item["seconds"] / median, 2),
+                }
+                factors.append(case["real_time_factor"])
+                if item.get("reference"):
+                    case.update(error_rates(item["reference"], result["text"]))
+                    accuracy.append(case)
+                cases[f"{variant}/{os.path.basename(item['path'])}"] = case
+                print(f"  🎵 {variant} {os.path.basename(item['path'])}: p50 {median:.2f}초 "
+                      f"(RTF {case['real_time_factor']:.3f})"
+                      + (f", WER {case['wer']:.1%}, CER {case['cer']:.1%}" if "wer" in case else ""))
+            if factors:
+                summary[variant] = {
+                    "mean_real_time_factor": round(sum(factors) / len(factors), 4),
+                    "mean_wer": round(sum(c["wer"] for c in accuracy) / len(accuracy), 4) if accuracy else None,
+                    "mean_cer": round(sum(c["cer"] for c in accuracy) / len(accuracy), 4) if accuracy else None,
+                }
+    finally:
+        shutdown_stt_pool()
+    return {"cases": cases, "variants": summary}
+
+
+async def bench_analyze(corpus: list, requests: int, concurrency: int, include_audio: bool) -> dict:
+    """업로드 → POST /analyze 전체 흐름 측정 (LLM은 모의 서버)"""
+    import httpx
+
+    try:
+        from main import app
+    except ImportError as e:
+        return {"skipped": f"분석 파이프라인 의존성 없음: {e}"}
+    from services.gpt_service import init_llm_client, close_llm_client
+
+    init_llm_client()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            plan_files, audio_files = [], []
+            for item in corpus:
+                is_audio = item["kind"] == "audio"
+                if is_audio and not include_audio:
+                    continue
+                with open(item["path"], "rb") as f:
+                    response = await client.post(
+                        "/upload/meeting-audio" if is_audio else "/upload/business-plan",
+                        files={"file": (os.path.basename(item["path"]), f)},
+                    )
+                response.raise_for_status()
+                (audio_files if is_audio else plan_files).append(response.json()["file_path"])
+
+            body = {
+                "mentor_input": {"growth": "성장 단계 재검토 필요", "kpi": "", "strategy": "병원 채널 확대"},
+                "business_plan_files": plan_files,
+                "meeting_audio_files": audio_files,
+            }
+            semaphore = asyncio.Semaphore(concurrency)
+            latencies = []
+            failures = 0
+
+            async def one() -> None:
+                nonlocal failures
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/analyze", json=body)
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        failures += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(requests)))
+            wall = time.perf_counter() - started
+    finally:
+        await close_llm_client()
+
+    print(f"  🧪 /analyze {requests}회 (동시 {concurrency}): p50 {percentiles(latencies)['p50']:.2f}초, "
+          f"{requests * 60 / wall:.1f}회/분")
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "business_plan_files": len(plan_files),
+        "meeting_audio_files": len(audio_files),
+        "latency": percentiles(latencies),
+        "wall_seconds": round(wall, 3),
+        "requests_per_minute": round(requests * 60 / wall, 2),
+    }
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> list:
+    """이전 결과와 p50/p95 비교, threshold(비율) 이상 느려진 항목 목록 반환"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n📊 기준 결과와 비교: {baseline_path} (커밋 {baseline['meta'].get('commit')})")
+
+    regressions = []
+
+    def check(name: str, current: dict, previous: dict) -> None:
+        for key in ("p50", "p95"):
+            before, after = previous.get(key), current.get(key)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            marker = "⚠️" if change > threshold else "  "
+            print(f"  {marker} {name} {key}: {before:.3f}초 → {after:.3f}초 ({change:+.1%})")
+            if change > threshold:
+                regressions.append({"case": name, "metric": key, "before": before, "after": after, "change": change})
+
+    for suite, result in results["suites"].items():
+        previous = baseline.get("suites", {}).get(suite, {})
+        if "latency" in result and "latency" in previous:
+            check(suite, result["latency"], previous["latency"])
+        for case, values in result.get("cases", {}).items():
+            previous_case = previous.get("cases", {}).get(case)
+            if previous_case and "latency" in previous_case:
+                check(f"{suite}/{case}", values["latency"], previous_case["latency"])
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Station C 분석 파이프라인 벤치마크")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"실행할 벤치마크 (쉼표 구분: {', '.join(SUITES)})")
+    parser.add_argument("--scale", type=int, default=1, help="코퍼스 크기 배수 (페이지/문단 수)")
+    parser.add_argument("--audio-seconds", default="30,120", help="생성할 오디오 길이 목록 (초, 쉼표 구분)")
+    parser.add_argument("--hwp-dir", default=None, help="포함할 실제 HWP 파일 디렉토리 (HWP는 생성 불가)")
+    parser.add_argument("--speech-dir", default=None,
+                        help="STT 정확도 측정용 한국어 녹음 디렉토리 (같은 이름의 .txt 정답 전사로 WER/CER 계산)")
+    parser.add_argument("--stt-variants", default="",
+                        help="비교할 STT 백엔드/모델 (쉼표 구분, 예: whisper:tiny,faster_whisper:small, 기본: 현재 설정)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="추출/STT 반복 횟수")
+    parser.add_argument("--requests", type=int, default=4, help="/analyze 요청 수")
+    parser.add_argument("--concurrency", type=int, default=2, help="/analyze 동시 요청 수")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="모의 LLM 첫 토큰 지연(초)")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--llm-completion-tokens", type=int, default=300)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="모의 LLM 429 응답 비율")
+    parser.add_argument("--llm-port", type=int, default=8100)
+    parser.add_argument("--cache", action="store_true", help="결과 캐시 사용 (기본: 끄고 매번 새로 계산)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/시각_커밋.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--regression-threshold", type=float, default=0.10, help="회귀로 표시할 지연 증가 비율")
+    args = parser.parse_args()
+    suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+
+    # 백엔드 설정은 import 시점에 환경 변수를 읽으므로 모듈을 불러오기 전에 지정
+    work_dir = tempfile.mkdtemp(prefix="station_c_bench_")
+    os.environ.update({
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "mock",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+        "CACHE_ENABLED": "true" if args.cache else "false",
+        "CACHE_DIR": os.path.join(work_dir, "cache"),
+        "JOBS_DB_PATH": os.path.join(work_dir, "jobs", "jobs.sqlite3"),
+        "BATCH_DB_PATH": os.path.join(work_dir, "jobs", "batches.sqlite3"),
+        "WHISPER_PRELOAD": "false",
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    os.chdir(work_dir)
+
+    from benchmarks.corpus import build_corpus
+    from benchmarks.mock_llm import MockLLMServer
+
+    print(f"🏗️ 합성 코퍼스 생성 (scale {args.scale}): {work_dir}")
+    corpus = build_corpus(
+        os.path.join(work_dir, "corpus"), args.scale, args.seed, args.hwp_dir,
+        tuple(float(s) for s in args.audio_seconds.split(",") if s.strip()), args.speech_dir,
+    )
+    server = MockLLMServer(
+        args.llm_port,
+        latency=args.llm_latency,
+        tokens_per_second=args.llm_tokens_per_second,
+        completion_tokens=args.llm_completion_tokens,
+        error_rate=args.llm_error_rate,
+    ).start()
+
+    import config
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+            "config": {
+                name: getattr(config, name)
+                for name in dir(config)
+                if name.isupper() and "KEY" not in name
+            },
+            "corpus": [{k: v for k, v in item.items() if k not in ("path", "reference")}
+                       | {"file": os.path.basename(item["path"])} for item in corpus],
+        },
+        "suites": {},
+    }
+
+    stt_available = True
+    try:
+        for suite in suites:
+            print(f"\n⏱️ {suite} 벤치마크")
+            started = time.perf_counter()
+            with RSSSampler() as rss:
+                if suite == "startup":
+                    result = asyncio.run(bench_startup(args.repeat))
+                elif suite == "extract":
+                    result = asyncio.run(bench_extract(corpus, args.repeat))
+                elif suite == "stt":
+                    variants = [
+                        tuple(variant.strip().split(":", 1))
+                        for variant in args.stt_variants.split(",") if ":" in variant
+                    ] or [(config.STT_BACKEND, config.WHISPER_DEFAULT_MODEL)]
+                    result = asyncio.run(bench_stt(corpus, args.repeat, variants))
+                    stt_available = "skipped" not in result
+                elif suite == "analyze":
+                    result = asyncio.run(bench_analyze(corpus, args.requests, args.concurrency, stt_available))
+                else:
+                    print(f"⚠️ 알 수 없는 벤치마크: {suite}")
+                    continue
+            if "skipped" in result:
+                print(f"  ⏭️ 건너뜀 - {result['skipped']}")
+            result["suite_seconds"] = round(time.perf_counter() - started, 3)
+            result["peak_rss_mb"] = rss.peak_mb
+            result["children_peak_rss_mb"] = _children_peak_mb()
+            results["suites"][suite] = result
+    finally:
+        results["meta"]["mock_llm"] = server.stats
+        server.stop()
+
+    output = output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    print(f"\n💾 결과 저장: {output}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.regression_threshold)
+        if regressions:
+            print(f"❌ 성능 회귀 {len(regressions)}건 (기준 대비 {args.regression_threshold:.0%} 이상 느려짐)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,3 +4,147 @@ from dotenv import load_dotenv
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# OpenAI 호환 서버 주소 (로컬 모의 서버 등, 비워두면 OpenAI 기본값)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-5")
+
+# Whisper STT 설정
+WHISPER_MODEL_SIZES = [s.strip() for s in os.getenv("WHISPER_MODEL_SIZES", "tiny").split(",") if s.strip()] or ["tiny"]
+WHISPER_DEFAULT_MODEL = os.getenv("WHISPER_DEFAULT_MODEL", WHISPER_MODEL_SIZES[0])
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "true").lower() == "true"
+WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "false").lower() == "true"
+STT_MAX_WORKERS = int(os.getenv("STT_MAX_WORKERS", "2"))
+
+# STT 백엔드: "whisper"(openai-whisper, PyTorch) 또는 "faster_whisper"(CTranslate2, CPU int8 양자화 추론)
+# 모델 크기(WHISPER_MODEL_SIZES/WHISPER_DEFAULT_MODEL)는 두 백엔드 모두 같은 이름(tiny/base/small/medium/large-v3)을 사용
+STT_BACKEND = os.getenv("STT_BACKEND", "whisper").lower()
+# faster_whisper 연산 형식 (int8, int8_float32, int16, float32)
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+# 빔 크기 (1이면 greedy 디코딩, 클수록 정확도가 오르고 느려짐)
+STT_BEAM_SIZE = int(os.getenv("STT_BEAM_SIZE", "1"))
+# STT 워커 하나가 쓰는 연산 스레드 수 (0이면 CPU 코어 수 / STT_MAX_WORKERS)
+STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "0"))
+STT_MAX_QUEUE = int(os.getenv("STT_MAX_QUEUE", "16"))
+
+# 무음 구간 분할(VAD) 후 세그먼트 병렬 STT 설정
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+STT_VAD_ENABLED = os.getenv("STT_VAD_ENABLED", "true").lower() == "true"
+STT_SEGMENT_MAX_SECONDS = float(os.getenv("STT_SEGMENT_MAX_SECONDS", "30"))
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-45"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+VAD_SPEECH_PAD_MS = int(os.getenv("VAD_SPEECH_PAD_MS", "200"))
+
+# 녹취록 압축 (반복 n-gram/간투사/거의 같은 세그먼트 제거, 발화 단위 병합 후 미팅 요약 프롬프트에 사용)
+TRANSCRIPT_COMPACTION_ENABLED = os.getenv("TRANSCRIPT_COMPACTION_ENABLED", "true").lower() == "true"
+# 이 값 이상 비슷한(추정 Jaccard 유사도) 세그먼트는 앞에 나온 것만 남김
+COMPACTION_DUPLICATE_THRESHOLD = float(os.getenv("COMPACTION_DUPLICATE_THRESHOLD", "0.8"))
+# 세그먼트 사이 간격이 이 값(초) 이하면 같은 발화 문단으로 병합
+COMPACTION_TURN_GAP_SECONDS = float(os.getenv("COMPACTION_TURN_GAP_SECONDS", "1.5"))
+
+# LLM 요청 스케줄러 설정
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30.0"))
+
+# LLM HTTP 연결 풀 설정
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "600"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+
+# 결과 캐시 설정 (추출/STT/LLM 요약)
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "256"))
+CACHE_DISK_MAX_MB = int(os.getenv("CACHE_DISK_MAX_MB", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# 업로드 설정
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_BUSINESS_PLAN_MB = int(os.getenv("MAX_BUSINESS_PLAN_MB", "100"))
+MAX_MEETING_AUDIO_MB = int(os.getenv("MAX_MEETING_AUDIO_MB", "2048"))
+
+# 업로드 파일 저장소
+# local: UPLOAD_DIR이 저장소 (여러 서버에서 쓰려면 공유 볼륨을 마운트), s3: S3 호환 저장소 (UPLOAD_DIR은 서버별 캐시)
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "uploads/")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")
+
+# 분석 저장소 (업로드 메타데이터, 단계별 결과, 보고서 섹션)
+ANALYSIS_DB_PATH = os.getenv("ANALYSIS_DB_PATH", os.path.join("jobs", "analyses.sqlite3"))
+
+# 백그라운드 분석 작업 설정
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join("jobs", "jobs.sqlite3"))
+MAX_RUNNING_JOBS = int(os.getenv("MAX_RUNNING_JOBS", "2"))
+# 작업 대기열 (sqlite: JOBS_DB_PATH 파일을 한 서버의 프로세스들이 공유, redis: REDIS_URL을 여러 서버가 공유)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# 실행 중인 작업의 임대 시간(초) - 워커가 이 시간 동안 갱신하지 못하면 다른 워커가 다시 실행
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# 이 횟수만큼 실행 중에 중단된(워커가 죽은) 작업은 다시 실행하지 않고 실패 처리
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# 다른 프로세스가 넣은 작업/이벤트를 확인하는 간격(초)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+# API 프로세스에서도 작업을 실행할지 여부 (false면 worker.py 프로세스만 실행)
+RUN_JOB_WORKERS = os.getenv("RUN_JOB_WORKERS", "true").lower() == "true"
+# uvicorn API 워커 프로세스 수
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# 코호트 배치 분석 설정
+BATCH_DB_PATH = os.getenv("BATCH_DB_PATH", "jobs/batches.sqlite3")
+BATCH_OUTPUT_DIR = os.getenv("BATCH_OUTPUT_DIR", "batches")
+BATCH_MAX_COMPANIES = int(os.getenv("BATCH_MAX_COMPANIES", "2"))
+
+# PDF 추출 설정
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "2"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_MIN_TEXT_CHARS = int(os.getenv("PDF_MIN_TEXT_CHARS", "20"))
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+
+# OCR 설정
+# tesserocr(Tesseract C API)가 설치되어 있으면 프로세스마다 초기화된 엔진을 OCR_THREADS개까지 재사용하고,
+# 없으면 pytesseract(이미지마다 tesseract 실행)로 처리합니다.
+OCR_LANG = os.getenv("OCR_LANG", "kor+eng")
+OCR_TESSDATA_PATH = os.getenv("OCR_TESSDATA_PATH", "")
+OCR_THREADS = int(os.getenv("OCR_THREADS", "2"))
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "6000"))
+OCR_TILE_HEIGHT = int(os.getenv("OCR_TILE_HEIGHT", "2400"))
+OCR_DESKEW = os.getenv("OCR_DESKEW", "true").lower() == "true"
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "true").lower() == "true"
+
+# KPI/사업비 프롬프트에 원문 그대로 보내는 재무/KPI 섹션·표 발췌 최대 글자 수
+DOCUMENT_EXCERPT_MAX_CHARS = int(os.getenv("DOCUMENT_EXCERPT_MAX_CHARS", "12000"))
+
+# 규칙 기반 KPI 표 최대 행 수 (LLM 프롬프트에 그대로 포함)
+KPI_TABLE_MAX_ROWS = int(os.getenv("KPI_TABLE_MAX_ROWS", "200"))
+
+# 서버 시작 시 API 프로세스에 미리 불러올 추출기 (확장자 쉼표 구분, 예: "pdf,docx,hwp,png")
+# 비워두면 추출기는 추출 워커 프로세스에서 처음 사용할 때만 불러오므로 업로드 전용 워커의 시작 시간과 메모리가 작아집니다.
+# 미리 불러오면 워커 프로세스가 fork 시 그대로 물려받아 파일마다 import하지 않습니다.
+EXTRACTOR_PRELOAD = [ext.strip().lower() for ext in os.getenv("EXTRACTOR_PRELOAD", "").split(",") if ext.strip()]
+
+# 파일 추출 워커 설정
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "300"))
+
+# 분석 요청 하나에 포함된 파일(사업계획서/미팅 오디오)을 동시에 처리하는 수
+ANALYSIS_FILE_CONCURRENCY = int(os.getenv("ANALYSIS_FILE_CONCURRENCY", "4"))
+
+# 요청별 트레이스(단계별 소요 시간 JSON) 저장
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+
+# 보고서 생성 방식: "shared_prefix"(공통 자료를 앞부분으로 공유하며 섹션별 호출) 또는 "structured"(JSON 스키마 한 번 호출)
+REPORT_MODE = os.getenv("REPORT_MODE", "shared_prefix").lower()
+
+# 긴 문서/녹취록 요약 설정 (토큰 수는 추정치)
+SUMMARY_SINGLE_PASS_TOKENS = int(os.getenv("SUMMARY_SINGLE_PASS_TOKENS", "60000"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "12000"))
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
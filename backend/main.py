@@ -1,21 +1,148 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import time
+
+# 서버 시작 시간 측정 기준 (무거운 엔진은 utils.plugins로 지연 로딩)
+_BOOT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, PlainTextResponse
 import os
+import json
 import uuid
-import aiofiles
 import asyncio
-from typing import List
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from config import (
+    WHISPER_PRELOAD,
+    EXTRACTOR_PRELOAD,
+    UPLOAD_CHUNK_SIZE,
+    MAX_BUSINESS_PLAN_MB,
+    MAX_MEETING_AUDIO_MB,
+    UPLOAD_DIR,
+    STORAGE_BACKEND,
+    S3_BUCKET,
+    S3_PREFIX,
+    S3_ENDPOINT_URL,
+    ANALYSIS_DB_PATH,
+    JOBS_DB_PATH,
+    MAX_RUNNING_JOBS,
+    JOB_QUEUE_BACKEND,
+    REDIS_URL,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL,
+    RUN_JOB_WORKERS,
+    API_WORKERS,
+    BATCH_DB_PATH,
+    BATCH_OUTPUT_DIR,
+    BATCH_MAX_COMPANIES,
+)
 
 # 모델 임포트
-from models.schemas import MentorInput, AnalysisRequest, AnalysisResponse, UploadedFile
+from models.schemas import (
+    AnalysisRequest,
+    AnalysisResponse,
+    AnalysisRecord,
+    ReportSectionRequest,
+    UploadedFile,
+    UploadSessionRequest,
+    UploadSession,
+    JobSubmitResponse,
+    JobStatusResponse,
+    BatchManifest,
+    BatchSubmitResponse,
+    BatchStatusResponse,
+)
 
 # 서비스 임포트
-from services.business_plan_analyzer import analyze_business_plan
-from services.meeting_analyzer import analyze_meeting_audio
-from services.kpi_extractor import extract_kpis
-from services.report_generator import generate_reports
+from services.pipeline import run_analysis, stream_analysis, regenerate_report_section
+from services.analysis_store import AnalysisStore
+from services.report_generator import REPORT_SECTIONS
+from services.job_manager import JobManager
+from services.job_queue import create_job_queue
+from services.batch_manager import BatchManager
+from services.stt_service import preload_whisper_models, shutdown_stt_pool
+from services.gpt_service import init_llm_client, close_llm_client, get_llm_metrics
+
+# 유틸 임포트
+from utils.cache import remember_file_sha256
+from utils.telemetry import span, render_prometheus, get_stage_stats
+from utils.plugins import load as load_plugin, mark_boot, startup_report, rss_mb
+from utils.storage import create_storage
+from utils.upload_handler import (
+    make_upload_path,
+    save_upload_stream,
+    create_upload_session,
+    get_upload_session,
+    append_upload_chunk,
+    complete_upload_session,
+    UploadTooLargeError,
+    UploadSessionError,
+)
+
+# 업로드 파일 저장소 (로컬/공유 볼륨 또는 S3 호환 저장소, UPLOAD_DIR은 이 서버에서 분석할 때 읽는 위치)
+storage = create_storage(STORAGE_BACKEND, UPLOAD_DIR, S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL)
+
+# 업로드와 분석 단계별 결과 저장소 (같은 분석을 다시 실행하면 바뀐 단계만 계산)
+analysis_store = AnalysisStore(ANALYSIS_DB_PATH)
+
+async def fetch_request_files(request: AnalysisRequest) -> None:
+    """분석할 파일을 저장소에서 UPLOAD_DIR로 준비 (다른 서버에서 업로드된 파일)"""
+    await asyncio.to_thread(storage.fetch_many, request.business_plan_files + request.meeting_audio_files)
+
+async def run_stored_analysis(request: AnalysisRequest, progress=None) -> AnalysisResponse:
+    await fetch_request_files(request)
+    return await run_analysis(request, UPLOAD_DIR, progress, store=analysis_store)
+
+# 백그라운드 분석 작업 관리자 (대기열은 여러 프로세스/서버가 공유, 실행은 RUN_JOB_WORKERS 또는 worker.py)
+job_manager = JobManager(
+    create_job_queue(JOB_QUEUE_BACKEND, JOBS_DB_PATH, REDIS_URL, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS),
+    MAX_RUNNING_JOBS,
+    run_stored_analysis,
+    JOB_POLL_INTERVAL,
+)
+
+# 코호트 배치 분석 관리자 (STT/추출/LLM 자원은 단일 분석과 공유, LLM은 낮은 우선순위)
+batch_manager = BatchManager(
+    BATCH_DB_PATH,
+    BATCH_OUTPUT_DIR,
+    BATCH_MAX_COMPANIES,
+    run_stored_analysis,
+    lease_seconds=JOB_LEASE_SECONDS,
+)
+
+mark_boot("imports", _BOOT_STARTED)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Whisper 모델을 시작 시 한번만 로드 (요청마다 로드하지 않음)
+    if WHISPER_PRELOAD:
+        await asyncio.to_thread(preload_whisper_models)
+    # 설정된 추출기만 미리 로드 (나머지는 추출 워커에서 처음 사용할 때)
+    for extension in EXTRACTOR_PRELOAD:
+        try:
+            load_plugin("extractor", extension)
+        except Exception as e:
+            print(f"❌ 추출기 사전 로드 실패 ({extension}): {e}")
+    # LLM 클라이언트와 연결 풀을 앱 수명 동안 재사용
+    try:
+        init_llm_client()
+    except Exception as e:
+        print(f"❌ LLM 클라이언트 초기화 실패: {e}")
+    # 대기열 작업 실행 (재시작 전에 끝나지 않은 작업/배치는 임대가 만료되면 다시 실행)
+    if RUN_JOB_WORKERS:
+        job_manager.start_workers()
+        batch_manager.start_recovery()
+    mark_boot("ready", _BOOT_STARTED)
+    print(f"🚀 서버 시작 완료: {time.perf_counter() - _BOOT_STARTED:.2f}초, RSS {rss_mb()}MB")
+    yield
+    await batch_manager.shutdown()
+    await job_manager.shutdown()
+    await close_llm_client()
+    shutdown_stt_pool()
 
-app = FastAPI(title="Station C AI 진단보고서 API", version="1.0.0")
+app = FastAPI(title="Station C AI 진단보고서 API", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -26,98 +153,277 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 업로드된 파일 저장 디렉토리
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @app.get("/")
 async def root():
     return {"message": "Station C AI 진단보고서 API"}
 
-@app.post("/upload/business-plan")
-async def upload_business_plan(file: UploadFile = File(...)):
-    """사업계획서 파일 업로드"""
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus 메트릭 (단계별 소요 시간 히스토그램/분위수, 바이트/글자/토큰/재시도 합계)"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/stages")
+async def stage_metrics():
+    """단계별 호출 수, 오류 수, 평균/p50/p95/p99 소요 시간(초)"""
+    return get_stage_stats()
+
+@app.get("/metrics/startup")
+async def startup_metrics():
+    """서버 시작 소요 시간, 현재 메모리, 무거운 모듈(torch/whisper/PIL 등) 로드 여부, 플러그인 로드 비용"""
+    return startup_report()
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """LLM 호출 지연시간 및 토큰 사용량 통계"""
+    return get_llm_metrics()
+
+# 업로드 종류별 최대 크기 (바이트)
+UPLOAD_LIMITS = {
+    "business_plan": MAX_BUSINESS_PLAN_MB * 1024 * 1024,
+    "meeting_audio": MAX_MEETING_AUDIO_MB * 1024 * 1024,
+}
+
+# 업로드 경로별 크기 제한 (본문을 읽기 전에 Content-Length로 조기 거절)
+UPLOAD_ROUTE_LIMITS = {
+    "/upload/business-plan": UPLOAD_LIMITS["business_plan"],
+    "/upload/meeting-audio": UPLOAD_LIMITS["meeting_audio"],
+}
+
+# multipart 경계/헤더 여유분
+MULTIPART_OVERHEAD = 64 * 1024
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    limit = UPLOAD_ROUTE_LIMITS.get(request.url.path)
+    content_length = request.headers.get("content-length")
+    if limit and content_length and content_length.isdigit() and int(content_length) > limit + MULTIPART_OVERHEAD:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"파일 크기가 허용 한도({limit // (1024 * 1024)}MB)를 초과했습니다."}
+        )
+    return await call_next(request)
+
+async def save_uploaded_file(file: UploadFile, prefix: str) -> UploadedFile:
+    """업로드 파일을 청크 단위로 저장 (크기 제한 및 SHA-256 계산)"""
     try:
         file_id = str(uuid.uuid4())
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-        file_path = f"business_plan_{file_id}.{file_extension}"
+        file_path = make_upload_path(prefix, file.filename, file_id)
         full_path = os.path.join(UPLOAD_DIR, file_path)
         
-        async with aiofiles.open(full_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        with span(f"upload.{prefix}") as current:
+            size, sha256 = await save_upload_stream(file, full_path, UPLOAD_LIMITS[prefix])
+            await asyncio.to_thread(storage.save, file_path)
+            current.set(bytes=size)
+        remember_file_sha256(full_path, sha256)
         
-        return UploadedFile(file_id=file_id, filename=file.filename, file_path=file_path)
+        uploaded = UploadedFile(file_id=file_id, filename=file.filename, file_path=file_path, size=size, sha256=sha256)
+        await asyncio.to_thread(analysis_store.record_upload, prefix, uploaded.model_dump())
+        return uploaded
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 업로드 실패: {str(e)}")
 
+@app.post("/upload/business-plan")
+async def upload_business_plan(file: UploadFile = File(...)):
+    """사업계획서 파일 업로드"""
+    return await save_uploaded_file(file, "business_plan")
+
 @app.post("/upload/meeting-audio")
 async def upload_meeting_audio(file: UploadFile = File(...)):
     """미팅 오디오 파일 업로드"""
+    return await save_uploaded_file(file, "meeting_audio")
+
+@app.post("/upload/{upload_type}/sessions", response_model=UploadSession)
+async def create_chunked_upload(upload_type: str, request: UploadSessionRequest):
+    """대용량 파일용 분할(재개 가능) 업로드 세션 생성
+
+    upload_type은 business-plan 또는 meeting-audio입니다.
+    이후 PUT /upload/sessions/{upload_id}로 Upload-Offset 헤더와 함께 청크를 순서대로 보내고,
+    POST /upload/sessions/{upload_id}/complete로 완료합니다.
+    """
+    prefix = upload_type.replace("-", "_")
+    if prefix not in UPLOAD_LIMITS:
+        raise HTTPException(status_code=404, detail=f"지원하지 않는 업로드 종류: {upload_type}")
     try:
-        file_id = str(uuid.uuid4())
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-        file_path = f"meeting_audio_{file_id}.{file_extension}"
-        full_path = os.path.join(UPLOAD_DIR, file_path)
-        
-        async with aiofiles.open(full_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        return UploadedFile(file_id=file_id, filename=file.filename, file_path=file_path)
+        session = create_upload_session(UPLOAD_DIR, prefix, request.filename, request.total_size, UPLOAD_LIMITS[prefix])
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return UploadSession(chunk_size=UPLOAD_CHUNK_SIZE, **session)
+
+@app.get("/upload/sessions/{upload_id}", response_model=UploadSession)
+async def get_chunked_upload(upload_id: str):
+    """분할 업로드 상태 조회 (중단 후 재개할 오프셋 확인)"""
+    try:
+        session = get_upload_session(UPLOAD_DIR, upload_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return UploadSession(chunk_size=UPLOAD_CHUNK_SIZE, **session)
+
+@app.put("/upload/sessions/{upload_id}", response_model=UploadSession)
+async def upload_chunk(upload_id: str, request: Request, upload_offset: int = Header(...)):
+    """분할 업로드 청크 전송 (요청 본문을 스트리밍으로 이어서 기록)"""
+    try:
+        session = await append_upload_chunk(UPLOAD_DIR, upload_id, upload_offset, request.stream())
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadSessionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return UploadSession(chunk_size=UPLOAD_CHUNK_SIZE, **session)
+
+@app.post("/upload/sessions/{upload_id}/complete", response_model=UploadedFile)
+async def complete_chunked_upload(upload_id: str):
+    """분할 업로드 완료"""
+    try:
+        uploaded = await asyncio.to_thread(complete_upload_session, UPLOAD_DIR, upload_id)
+        await asyncio.to_thread(storage.save, uploaded["file_path"])
+    except UploadSessionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"파일 업로드 실패: {str(e)}")
+    remember_file_sha256(os.path.join(UPLOAD_DIR, uploaded["file_path"]), uploaded["sha256"])
+    prefix = uploaded.pop("prefix")
+    await asyncio.to_thread(analysis_store.record_upload, prefix, uploaded)
+    return UploadedFile(**uploaded)
 
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_documents(request: AnalysisRequest):
-    """문서 분석 및 보고서 생성"""
+    """문서 분석 및 보고서 생성 (결과는 저장소에 저장되고 응답의 analysis_id로 다시 조회/재실행)"""
     try:
-        # 1. 사업계획서 분석과 미팅 오디오 분석을 비동기로 동시 처리
-        business_plan_task = None
-        meeting_task = None
-        
-        if request.business_plan_files:
-            business_plan_task = analyze_business_plan(request.business_plan_files, UPLOAD_DIR)
-        
-        if request.meeting_audio_files:
-            meeting_task = analyze_meeting_audio(request.meeting_audio_files, UPLOAD_DIR)
-        
-        # 비동기로 동시 실행
-        tasks = []
-        if business_plan_task:
-            tasks.append(business_plan_task)
-        if meeting_task:
-            tasks.append(meeting_task)
-        
-        if tasks:
-            results = await asyncio.gather(*tasks)
-            business_plan_summary = results[0] if business_plan_task else ""
-            meeting_summary = results[1] if meeting_task else (results[0] if not business_plan_task else "")
-        else:
-            business_plan_summary = ""
-            meeting_summary = ""
-        
-        # 2. KPI 추출
-        extracted_kpis = await extract_kpis(business_plan_summary, meeting_summary)
-        
-        # 3. 보고서 생성 (멘토 입력 가중치 적용)
-        reports = await generate_reports(
-            business_plan_summary, 
-            meeting_summary, 
-            extracted_kpis, 
-            request.mentor_input
-        )
-        
-        return AnalysisResponse(
-            business_plan_summary=business_plan_summary,
-            meeting_summary=meeting_summary,
-            extracted_kpis=extracted_kpis,
-            reports=reports
-        )
-        
+        return await run_stored_analysis(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"분석 실패: {str(e)}")
+
+@app.get("/analyses/{analysis_id}", response_model=AnalysisRecord)
+async def get_analysis(analysis_id: str):
+    """저장된 분석 요청, 최종 결과, 단계별 저장 현황 조회"""
+    record = await asyncio.to_thread(analysis_store.get_analysis, analysis_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="분석을 찾을 수 없습니다.")
+    return record
+
+@app.put("/analyses/{analysis_id}", response_model=AnalysisResponse)
+async def rerun_analysis(analysis_id: str, request: AnalysisRequest):
+    """저장된 분석을 바뀐 요청(파일, 멘토 입력)으로 다시 실행 - 입력이 바뀐 단계와 그 뒤 단계만 다시 계산"""
+    if await asyncio.to_thread(analysis_store.get_analysis, analysis_id) is None:
+        raise HTTPException(status_code=404, detail="분석을 찾을 수 없습니다.")
+    try:
+        await fetch_request_files(request)
+        return await run_analysis(request, UPLOAD_DIR, store=analysis_store, analysis_id=analysis_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"분석 실패: {str(e)}")
 
+@app.post("/analyses/{analysis_id}/reports/{section}", response_model=AnalysisResponse)
+async def regenerate_report(analysis_id: str, section: str, request: ReportSectionRequest):
+    """저장된 분석의 보고서 섹션 하나를 LLM 한 번 호출로 다시 생성 (멘토 입력을 바꿔서 생성 가능)"""
+    if section not in REPORT_SECTIONS:
+        raise HTTPException(status_code=404, detail=f"지원하지 않는 보고서 섹션: {section}")
+    if await asyncio.to_thread(analysis_store.get_analysis, analysis_id) is None:
+        raise HTTPException(status_code=404, detail="분석을 찾을 수 없습니다.")
+    try:
+        await fetch_request_files(await asyncio.to_thread(analysis_store.get_request, analysis_id))
+        return await regenerate_report_section(analysis_store, analysis_id, section, UPLOAD_DIR, request.mentor_input)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"보고서 생성 실패: {str(e)}")
+
+def format_sse(event: str, data: dict, event_id=None) -> str:
+    """Server-Sent Events 메시지 형식으로 변환"""
+    message = ""
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    message += f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return message
+
+@app.post("/analyze/stream")
+async def analyze_documents_stream(request: AnalysisRequest):
+    """문서 분석 및 보고서 생성 (SSE 스트리밍)
+
+    단계별 진행 이벤트(progress)와 보고서 섹션 토큰(token)을 도착하는 대로 보내고,
+    섹션이 끝나면 section, 전체가 끝나면 result 이벤트를 보냅니다.
+    """
+    async def event_stream():
+        try:
+            await fetch_request_files(request)
+            async for event in stream_analysis(request, UPLOAD_DIR, store=analysis_store):
+                yield format_sse(event.pop("type"), event)
+        except Exception as e:
+            yield format_sse("error", {"detail": f"분석 실패: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_analysis_job(request: AnalysisRequest):
+    """분석 작업 등록 (즉시 작업 ID 반환, 분석은 백그라운드에서 진행)"""
+    job_id = await job_manager.submit(request)
+    return JobSubmitResponse(job_id=job_id, status="queued")
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_analysis_job(job_id: str):
+    """분석 작업 상태, 단계별 진행 상황, 부분/최종 결과 조회"""
+    job = await job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """분석 작업 진행 이벤트 스트림 (SSE)
+
+    재연결 시 Last-Event-ID 헤더를 보내면 그 이후 이벤트부터 이어서 받습니다.
+    """
+    if await job_manager.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    after_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    
+    async def event_stream():
+        async for event in job_manager.stream_events(job_id, after_seq):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_sse("progress", event, event["seq"])
+        yield format_sse("done", await job_manager.get_job(job_id))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/batches", response_model=BatchSubmitResponse, status_code=202)
+async def submit_batch(manifest: BatchManifest):
+    """코호트 배치 분석 등록 (회사별 파일과 멘토 입력 목록, 분석은 백그라운드에서 진행)"""
+    if not manifest.companies:
+        raise HTTPException(status_code=400, detail="분석할 회사가 없습니다.")
+    batch_id = await batch_manager.submit(manifest)
+    return BatchSubmitResponse(batch_id=batch_id, status="queued", total=len(manifest.companies))
+
+@app.get("/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch(batch_id: str):
+    """배치 진행 상황, 회사별 상태, 처리량(회사/시간) 조회"""
+    batch = await asyncio.to_thread(batch_manager.get_batch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+    return batch
+
+@app.get("/batches/{batch_id}/bundle")
+async def download_batch_bundle(batch_id: str):
+    """완료된 배치의 결과 번들(zip) 다운로드"""
+    batch = await asyncio.to_thread(batch_manager.get_batch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+    if not batch["bundle_ready"]:
+        raise HTTPException(status_code=409, detail="배치 분석이 아직 끝나지 않았습니다.")
+    return FileResponse(batch_manager.bundle_path(batch_id), media_type="application/zip",
+                        filename=f"batch_{batch_id}.zip")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
\ No newline at end of file
+    # API_WORKERS > 1이면 프로세스 여러 개로 실행 (작업 대기열과 저장소는 프로세스 간 공유)
+    if API_WORKERS > 1:
+        uvicorn.run("main:app", host="0.0.0.0", port=8002, workers=API_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8002)
\ No newline at end of file
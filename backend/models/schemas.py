@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class MentorInput(BaseModel):
     growth: str
@@ -12,12 +12,89 @@ class AnalysisRequest(BaseModel):
     meeting_audio_files: List[str] = []
 
 class AnalysisResponse(BaseModel):
+    analysis_id: Optional[str] = None
     business_plan_summary: str
     meeting_summary: str
     extracted_kpis: str
+    kpi_table: list = []
     reports: dict
+    llm_usage: dict = {}
+    transcript_compaction: dict = {}
+
+class ReportSectionRequest(BaseModel):
+    mentor_input: Optional[MentorInput] = None
+
+class AnalysisRecord(BaseModel):
+    analysis_id: str
+    request: AnalysisRequest
+    result: Optional[AnalysisResponse] = None
+    stages: dict = {}
+    created_at: float
+    updated_at: float
 
 class UploadedFile(BaseModel):
     file_id: str
     filename: str
     file_path: str
+    size: int = 0
+    sha256: str = ""
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    total_size: int = 0
+
+class UploadSession(BaseModel):
+    upload_id: str
+    filename: str
+    total_size: int
+    offset: int
+    chunk_size: int
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    updated_at: float
+    stages: dict = {}
+    partial: dict = {}
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+
+class BatchCompany(BaseModel):
+    company: str
+    mentor_input: MentorInput
+    business_plan_files: List[str] = []
+    meeting_audio_files: List[str] = []
+
+class BatchManifest(BaseModel):
+    name: str = ""
+    companies: List[BatchCompany]
+
+class BatchSubmitResponse(BaseModel):
+    batch_id: str
+    status: str
+    total: int
+
+class BatchCompanyStatus(BaseModel):
+    company: str
+    status: str
+    error: Optional[str] = None
+    duration: Optional[float] = None
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    name: str
+    status: str
+    created_at: float
+    updated_at: float
+    total: int
+    completed: int
+    failed: int
+    elapsed_seconds: float
+    companies_per_hour: float
+    companies: List[BatchCompanyStatus] = []
+    bundle_ready: bool = False
@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from models.schemas import AnalysisRequest
+from utils.cache import make_key
+
+# 단계 의존 관계 (단계 -> 입력으로 쓰는 앞 단계)
+# 각 단계의 입력 키는 자신의 입력(파일 해시, 프롬프트 등)과 앞 단계 결과의 해시로 만들어지므로
+# 앞 단계 결과가 바뀌면 뒤 단계도 다시 계산됩니다.
+STAGE_DEPENDENCIES = {
+    "extraction": (),
+    "transcription": (),
+    "business_plan_summary": ("extraction",),
+    "meeting_summary": ("transcription",),
+    "kpi": ("extraction", "transcription"),
+    "report": ("business_plan_summary", "meeting_summary", "kpi", "extraction"),
+}
+
+
+def value_digest(value) -> str:
+    """단계 결과 해시 (뒤 단계 입력 키에 사용)"""
+    return make_key("value", json.dumps(value, ensure_ascii=False, sort_keys=True))
+
+
+def stage_input_key(stage: str, *inputs) -> str:
+    """단계 이름 + 입력(앞 단계 결과 해시 포함)으로 입력 키 생성"""
+    return make_key(f"stage:{stage}", *inputs)
+
+
+class AnalysisStore:
+    """업로드와 분석 단계별 결과 저장소 (SQLite)
+
+    업로드 파일 메타데이터, 분석 요청/최종 결과, 단계별 결과(추출, 녹취록, 요약, KPI, 보고서 섹션)를
+    분석 ID 기준으로 저장합니다. 단계 결과는 입력 키와 함께 저장되므로, 같은 분석을 다시 실행하면
+    입력이 바뀐 단계(와 그 뒤 단계)만 다시 계산합니다 (STAGE_DEPENDENCIES 참고).
+    보고서 섹션은 "report:{section}" 단계로 섹션별로 저장됩니다.
+    메서드는 SQLite를 바로 호출하므로 이벤트 루프에서는 asyncio.to_thread로 호출합니다.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # 여러 API/워커 프로세스가 같은 DB를 쓰므로 다른 프로세스가 쓰는 중이면 timeout초까지 대기
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            " file_path TEXT PRIMARY KEY, file_id TEXT NOT NULL, kind TEXT NOT NULL, filename TEXT NOT NULL,"
+            " size INTEGER NOT NULL, sha256 TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " id TEXT PRIMARY KEY, request TEXT NOT NULL, result TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " analysis_id TEXT NOT NULL, stage TEXT NOT NULL, input_key TEXT NOT NULL, value TEXT NOT NULL,"
+            " updated REAL NOT NULL, PRIMARY KEY (analysis_id, stage))"
+        )
+        self._db.commit()
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+            return rows
+
+    # ---- 업로드 ----
+
+    def record_upload(self, kind: str, uploaded: dict) -> None:
+        """업로드 완료된 파일 메타데이터 저장 (UploadedFile 필드)"""
+        self._execute(
+            "INSERT OR REPLACE INTO uploads (file_path, file_id, kind, filename, size, sha256, created)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (uploaded["file_path"], uploaded["file_id"], kind, uploaded["filename"],
+             uploaded["size"], uploaded["sha256"], time.time()),
+        )
+
+    def get_upload(self, file_path: str):
+        rows = self._execute(
+            "SELECT file_path, file_id, kind, filename, size, sha256, created FROM uploads WHERE file_path = ?",
+            (file_path,),
+        )
+        if not rows:
+            return None
+        file_path, file_id, kind, filename, size, sha256, created = rows[0]
+        return {"file_path": file_path, "file_id": file_id, "kind": kind, "filename": filename,
+                "size": size, "sha256": sha256, "created_at": created}
+
+    # ---- 분석 ----
+
+    def create_analysis(self, request: AnalysisRequest) -> str:
+        analysis_id = str(uuid.uuid4())
+        now = time.time()
+        self._execute(
+            "INSERT INTO analyses (id, request, created, updated) VALUES (?, ?, ?, ?)",
+            (analysis_id, request.model_dump_json(), now, now),
+        )
+        return analysis_id
+
+    def update_request(self, analysis_id: str, request: AnalysisRequest) -> None:
+        self._execute(
+            "UPDATE analyses SET request = ?, updated = ? WHERE id = ?",
+            (request.model_dump_json(), time.time(), analysis_id),
+        )
+
+    def get_request(self, analysis_id: str):
+        rows = self._execute("SELECT request FROM analyses WHERE id = ?", (analysis_id,))
+        return AnalysisRequest.model_validate_json(rows[0][0]) if rows else None
+
+    def save_result(self, analysis_id: str, result: dict) -> None:
+        self._execute(
+            "UPDATE analyses SET result = ?, updated = ? WHERE id = ?",
+            (json.dumps(result, ensure_ascii=False), time.time(), analysis_id),
+        )
+
+    def get_analysis(self, analysis_id: str):
+        """분석 요청, 최종 결과, 저장된 단계 목록 조회 (없으면 None)"""
+        rows = self._execute(
+            "SELECT id, request, result, created, updated FROM analyses WHERE id = ?", (analysis_id,)
+        )
+        if not rows:
+            return None
+        analysis_id, request, result, created, updated = rows[0]
+        stages = {
+            stage: {"input_key": input_key, "updated_at": stage_updated}
+            for stage, input_key, stage_updated in self._execute(
+                "SELECT stage, input_key, updated FROM artifacts WHERE analysis_id = ? ORDER BY updated",
+                (analysis_id,),
+            )
+        }
+        return {
+            "analysis_id": analysis_id,
+            "request": json.loads(request),
+            "result": json.loads(result) if result else None,
+            "stages": stages,
+            "created_at": created,
+            "updated_at": updated,
+        }
+
+    # ---- 단계 결과 ----
+
+    def get_artifact(self, analysis_id: str, stage: str, input_key: str):
+        """입력 키가 같은 단계 결과 (입력이 바뀌었거나 없으면 None)"""
+        rows = self._execute(
+            "SELECT value FROM artifacts WHERE analysis_id = ? AND stage = ? AND input_key = ?",
+            (analysis_id, stage, input_key),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def put_artifact(self, analysis_id: str, stage: str, input_key: str, value) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO artifacts (analysis_id, stage, input_key, value, updated) VALUES (?, ?, ?, ?, ?)",
+            (analysis_id, stage, input_key, json.dumps(value, ensure_ascii=False), time.time()),
+        )
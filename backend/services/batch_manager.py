@@ -0,0 +1,334 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+from models.schemas import AnalysisRequest, BatchManifest
+from services.job_queue import QUEUED, RUNNING, COMPLETED, FAILED, FINISHED_STATUSES, make_worker_id
+from services.llm_scheduler import llm_priority, PRIORITY_LOW
+
+
+def _slug(name: str) -> str:
+    """회사 이름 -> 파일 이름으로 쓸 수 있는 문자열"""
+    return re.sub(r"[^\w-]+", "_", name).strip("_") or "company"
+
+
+class BatchManager:
+    """코호트(여러 회사) 배치 분석 관리
+
+    회사별 분석 요청과 진행 상태를 SQLite에 체크포인트로 저장하므로, 중간에 서버나 CLI가 죽어도
+    다시 실행하면 끝나지 않은 회사부터 이어서 처리합니다.
+    회사는 최대 max_running개씩 동시에 분석하고, STT 워커 풀·추출 워커·LLM 스케줄러는
+    단일 분석 요청과 같이 공유합니다 (LLM 요청은 priority로 실행되어 대화형 요청이 먼저 처리됨).
+    회사별 결과는 output_dir/{batch_id}/ 아래 JSON으로 저장하고, 끝나면 {batch_id}.zip 번들로 묶습니다.
+
+    배치 DB는 여러 프로세스가 공유할 수 있으므로, 배치를 실행하는 프로세스는 임대(lease_seconds)를 잡고
+    주기적으로 갱신합니다. 임대가 살아 있는 배치는 다른 프로세스가 이어서 실행하지 않습니다.
+    source는 배치를 만든 쪽("api" 또는 "cli")으로, recover()는 같은 source의 배치만 이어서 실행합니다
+    (CLI는 업로드 디렉토리가 달라 서버에서 이어서 실행할 수 없음).
+
+    runner는 (request, progress)를 받아 AnalysisResponse를 반환하는 코루틴 함수입니다.
+    create/get_batch는 SQLite를 바로 호출하므로 이벤트 루프에서는 asyncio.to_thread로 호출합니다.
+    """
+
+    def __init__(self, db_path: str, output_dir: str, max_running: int, runner, priority: int = PRIORITY_LOW,
+                 source: str = "api", lease_seconds: float = 60.0):
+        self.runner = runner
+        self.output_dir = output_dir
+        self.max_running = max_running
+        self.priority = priority
+        self.source = source
+        self.lease_seconds = lease_seconds
+        self.worker_id = make_worker_id()
+        self._tasks = {}
+        self._recovery = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # 여러 API/워커 프로세스와 CLI가 같은 DB를 쓰므로 다른 프로세스가 쓰는 중이면 timeout초까지 대기
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            " id TEXT PRIMARY KEY, name TEXT NOT NULL, status TEXT NOT NULL,"
+            " elapsed REAL NOT NULL DEFAULT 0, created REAL NOT NULL, updated REAL NOT NULL,"
+            " source TEXT NOT NULL DEFAULT 'api', owner TEXT, lease_until REAL)"
+        )
+        # 이전 버전 DB에 출처/임대 컬럼 추가 (CLI 배치는 ID가 "cli-"로 시작)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(batches)")}
+        for column, kind in (("source", "TEXT NOT NULL DEFAULT 'api'"), ("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE batches ADD COLUMN {column} {kind}")
+        if "source" not in columns:
+            self._db.execute("UPDATE batches SET source = 'cli' WHERE id LIKE 'cli-%'")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS batch_items ("
+            " batch_id TEXT NOT NULL, idx INTEGER NOT NULL, company TEXT NOT NULL, request TEXT NOT NULL,"
+            " status TEXT NOT NULL, error TEXT, started REAL, finished REAL, PRIMARY KEY (batch_id, idx))"
+        )
+        self._db.commit()
+
+    # ---- 저장소 ----
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+            return rows
+
+    def _update(self, sql: str, params: tuple = ()) -> int:
+        # 바뀐 행 수 반환
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            self._db.commit()
+            return cursor.rowcount
+
+    def _batch_dir(self, batch_id: str) -> str:
+        return os.path.join(self.output_dir, batch_id)
+
+    def bundle_path(self, batch_id: str) -> str:
+        """완료된 배치의 결과 번들(zip) 경로"""
+        return os.path.join(self.output_dir, f"{batch_id}.zip")
+
+    def get_batch(self, batch_id: str):
+        """배치 상태, 회사별 진행 상황, 처리량 조회 (없으면 None)"""
+        rows = self._execute(
+            "SELECT id, name, status, elapsed, created, updated FROM batches WHERE id = ?", (batch_id,)
+        )
+        if not rows:
+            return None
+        batch_id, name, status, elapsed, created, updated = rows[0]
+
+        items = self._execute(
+            "SELECT company, status, error, started, finished FROM batch_items WHERE batch_id = ? ORDER BY idx",
+            (batch_id,),
+        )
+        companies = [
+            {
+                "company": company,
+                "status": item_status,
+                "error": error,
+                "duration": round(finished - started, 1) if started and finished else None,
+            }
+            for company, item_status, error, started, finished in items
+        ]
+        completed = sum(1 for item in companies if item["status"] == COMPLETED)
+        return {
+            "batch_id": batch_id,
+            "name": name,
+            "status": status,
+            "created_at": created,
+            "updated_at": updated,
+            "total": len(companies),
+            "completed": completed,
+            "failed": sum(1 for item in companies if item["status"] == FAILED),
+            "elapsed_seconds": round(elapsed, 1),
+            "companies_per_hour": round(completed * 3600 / elapsed, 2) if elapsed > 0 else 0.0,
+            "companies": companies,
+            "bundle_ready": os.path.exists(self.bundle_path(batch_id)),
+        }
+
+    # ---- 실행 ----
+
+    def create(self, manifest: BatchManifest, batch_id: str = None) -> str:
+        """배치와 회사별 분석 요청 저장 후 배치 ID 반환 (이미 있는 batch_id면 그대로 반환)"""
+        batch_id = batch_id or str(uuid.uuid4())
+        if self._execute("SELECT 1 FROM batches WHERE id = ?", (batch_id,)):
+            return batch_id
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO batches (id, name, status, created, updated, source) VALUES (?, ?, ?, ?, ?, ?)",
+                (batch_id, manifest.name, QUEUED, now, now, self.source),
+            )
+            self._db.executemany(
+                "INSERT INTO batch_items (batch_id, idx, company, request, status) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (batch_id, idx, company.company,
+                     AnalysisRequest(**company.model_dump(exclude={"company"})).model_dump_json(), QUEUED)
+                    for idx, company in enumerate(manifest.companies)
+                ],
+            )
+            self._db.commit()
+        return batch_id
+
+    async def submit(self, manifest: BatchManifest) -> str:
+        """배치 등록 후 백그라운드에서 실행, 배치 ID 반환"""
+        batch_id = await asyncio.to_thread(self.create, manifest)
+        self._start(batch_id)
+        return batch_id
+
+    async def recover(self) -> int:
+        """끝나지 않았고 실행 중인 프로세스도 없는(임대 만료) 같은 source의 배치를 이어서 실행"""
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT id FROM batches WHERE source = ? AND status IN (?, ?) AND (owner IS NULL OR lease_until < ?)"
+            " ORDER BY created",
+            (self.source, QUEUED, RUNNING, time.time()),
+        )
+        batch_ids = [batch_id for (batch_id,) in rows if batch_id not in self._tasks]
+        for batch_id in batch_ids:
+            self._start(batch_id)
+        if batch_ids:
+            print(f"🔁 미완료 배치 분석 {len(batch_ids)}개 이어서 실행")
+        return len(batch_ids)
+
+    def start_recovery(self) -> None:
+        """끝나지 않은 배치를 이 프로세스에서 이어서 실행 (분석 작업 워커를 실행하는 프로세스에서 호출)
+
+        시작할 때와 이후 임대 시간마다 확인하므로, 실행하던 프로세스가 죽은 배치는 임대가 만료된 뒤 이어서 실행됩니다.
+        """
+        self._recovery = asyncio.create_task(self._recover_loop())
+
+    async def _recover_loop(self) -> None:
+        while True:
+            try:
+                await self.recover()
+            except Exception as e:
+                print(f"❌ 배치 복구 확인 실패: {e}")
+            await asyncio.sleep(self.lease_seconds)
+
+    def _start(self, batch_id: str) -> None:
+        task = asyncio.create_task(self.run_batch(batch_id))
+        self._tasks[batch_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(batch_id, None))
+
+    def _claim(self, batch_id: str) -> bool:
+        # 임대가 없거나 만료된 배치만 이 프로세스가 가져감
+        now = time.time()
+        return self._update(
+            "UPDATE batches SET status = ?, owner = ?, lease_until = ?, updated = ?"
+            " WHERE id = ? AND (owner IS NULL OR owner = ? OR lease_until < ?)",
+            (RUNNING, self.worker_id, now + self.lease_seconds, now, batch_id, self.worker_id, now),
+        ) > 0
+
+    async def _keep_lease(self, batch_id: str, task: asyncio.Task, lost: list) -> None:
+        # 임대 시간의 1/3마다 갱신, 다른 프로세스가 가져갔으면 이 실행은 중단
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            renewed = await asyncio.to_thread(
+                self._update,
+                "UPDATE batches SET lease_until = ? WHERE id = ? AND owner = ?",
+                (time.time() + self.lease_seconds, batch_id, self.worker_id),
+            )
+            if not renewed:
+                print(f"⚠️ 배치 임대 상실 {batch_id}: 실행 중단")
+                lost.append(batch_id)
+                task.cancel()
+                return
+
+    async def run_batch(self, batch_id: str) -> bool:
+        """배치에서 끝나지 않은 회사들을 분석하고 결과 번들 생성 (완료/실패한 회사는 건너뜀)
+
+        다른 프로세스가 임대를 가지고 실행 중인 배치면 실행하지 않고 False를 반환합니다.
+        """
+        if not await asyncio.to_thread(self._claim, batch_id):
+            print(f"⏭️ 다른 프로세스가 실행 중인 배치 {batch_id}")
+            return False
+        lost = []
+        lease = asyncio.create_task(self._keep_lease(batch_id, asyncio.current_task(), lost))
+        try:
+            await self._run_pending(batch_id)
+        except asyncio.CancelledError:
+            if lost:
+                # 임대를 잃은 배치는 이미 다른 프로세스가 이어서 실행 중
+                return False
+            raise
+        finally:
+            lease.cancel()
+            # 중단된 배치는 임대를 풀어 다른 프로세스(또는 다음 시작 시)가 바로 이어서 실행
+            await asyncio.to_thread(
+                self._update,
+                "UPDATE batches SET owner = NULL, lease_until = NULL WHERE id = ? AND owner = ?",
+                (batch_id, self.worker_id),
+            )
+
+        batch = await asyncio.to_thread(self.get_batch, batch_id)
+        print(f"📦 배치 분석 완료 {batch_id}: {batch['completed']}/{batch['total']}개 성공, "
+              f"{batch['companies_per_hour']}개/시간")
+        return True
+
+    async def _run_pending(self, batch_id: str) -> None:
+        pending = await asyncio.to_thread(
+            self._execute,
+            "SELECT idx, company, request FROM batch_items WHERE batch_id = ? AND status NOT IN (?, ?) ORDER BY idx",
+            (batch_id, *FINISHED_STATUSES),
+        )
+        os.makedirs(self._batch_dir(batch_id), exist_ok=True)
+        semaphore = asyncio.Semaphore(self.max_running)
+        # 처리량 계산용 실행 시간 (중단되었다가 재개한 경우 멈춰 있던 시간은 제외)
+        mark = [time.time()]
+
+        def checkpoint(sql: str, params: tuple) -> None:
+            # 회사별 작업이 스레드에서 동시에 부르므로 mark도 락 안에서 갱신
+            with self._lock:
+                now = time.time()
+                self._db.execute(sql, params)
+                self._db.execute(
+                    "UPDATE batches SET elapsed = elapsed + ?, updated = ? WHERE id = ?",
+                    (now - mark[0], now, batch_id),
+                )
+                self._db.commit()
+                mark[0] = now
+
+        async def run_company(idx: int, company: str, raw_request: str) -> None:
+            async with semaphore:
+                await asyncio.to_thread(
+                    checkpoint,
+                    "UPDATE batch_items SET status = ?, error = NULL, started = ? WHERE batch_id = ? AND idx = ?",
+                    (RUNNING, time.time(), batch_id, idx),
+                )
+                print(f"🏢 배치 분석 시작 [{idx + 1}] {company}")
+                try:
+                    with llm_priority(self.priority):
+                        response = await self.runner(AnalysisRequest.model_validate_json(raw_request), None)
+                    path = os.path.join(self._batch_dir(batch_id), f"{idx + 1:03d}_{_slug(company)}.json")
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump({"company": company, **response.model_dump()}, f, ensure_ascii=False, indent=2)
+                except asyncio.CancelledError:
+                    # 중단된 회사는 다음 실행 시 처음부터 다시 분석
+                    raise
+                except Exception as e:
+                    print(f"❌ 배치 분석 실패 {company}: {e}")
+                    await asyncio.to_thread(
+                        checkpoint,
+                        "UPDATE batch_items SET status = ?, error = ?, finished = ? WHERE batch_id = ? AND idx = ?",
+                        (FAILED, f"분석 실패: {str(e)}", time.time(), batch_id, idx),
+                    )
+                    return
+                await asyncio.to_thread(
+                    checkpoint,
+                    "UPDATE batch_items SET status = ?, finished = ? WHERE batch_id = ? AND idx = ?",
+                    (COMPLETED, time.time(), batch_id, idx),
+                )
+                print(f"✅ 배치 분석 완료 [{idx + 1}] {company}")
+
+        await asyncio.gather(*(run_company(*row) for row in pending))
+        await asyncio.to_thread(self._write_bundle, batch_id)
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE batches SET status = ?, updated = ? WHERE id = ? AND owner = ?",
+            (COMPLETED, time.time(), batch_id, self.worker_id),
+        )
+
+    def _write_bundle(self, batch_id: str) -> None:
+        # 회사별 결과 JSON + 요약(summary.json)을 zip 하나로 묶음
+        batch_dir = self._batch_dir(batch_id)
+        with open(os.path.join(batch_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.get_batch(batch_id), f, ensure_ascii=False, indent=2)
+        shutil.make_archive(os.path.join(self.output_dir, batch_id), "zip", batch_dir)
+
+    async def shutdown(self) -> None:
+        """실행 중인 배치 취소 (체크포인트는 남겨두고 다른 프로세스나 다음 시작 시 이어서 실행)"""
+        if self._recovery is not None:
+            self._recovery.cancel()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,37 +1,35 @@
+import asyncio
 import os
-from utils.file_processor import extract_text_from_file
-from services.gpt_service import call_gpt
+import re
+from config import DOCUMENT_EXCERPT_MAX_CHARS
+from services.extraction_service import extract_files
+from utils.file_processor import is_extraction_error
+from services.summarizer import summarize_text
+from services.progress import report_progress
+from services.kpi_extractor import extract_document_kpis, format_kpi_table, merge_kpi_rows
+from utils.document import select_blocks, render_excerpt
 
-async def analyze_business_plan(file_paths: list, upload_dir: str) -> str:
-    """사업계획서 분석 (OCR + GPT)"""
-    if not file_paths:
-        return "업로드된 사업계획서가 없습니다."
-    
-    # 파일 내용을 텍스트로 추출 (OCR 및 다양한 파일 형식 지원)
-    extracted_text = ""
-    for file_path in file_paths:
-        try:
-            # 실제 파일 경로로 읽기
-            full_path = os.path.join(upload_dir, file_path)
-            if os.path.exists(full_path):
-                # OCR 및 파일 처리 함수 사용
-                content = extract_text_from_file(full_path)
-                extracted_text += f"\n\n=== 파일: {file_path} ===\n{content}"
-            else:
-                extracted_text += f"\n\n=== 파일: {file_path} ===\n파일을 찾을 수 없습니다."
-        except Exception as e:
-            print(f"파일 처리 오류 {file_path}: {e}")
-            extracted_text += f"\n\n=== 파일: {file_path} ===\n파일 처리 중 오류 발생: {str(e)}"
-    
-    # GPT-5로 직접 전체 텍스트 분석 (청크 처리 제거)
-    print(f"📄 사업계획서 텍스트 길이: {len(extracted_text)}자")
-    
-    final_prompt = f"""
+# 재무/KPI 프롬프트에 원문 그대로 보낼 섹션 제목과 표 내용
+FINANCE_KPI_PATTERN = re.compile(
+    r"사업비|지원금|자기부담|예산|재무|자금|투자|매출|손익|비용|인건비|KPI|성과|지표|목표|고용|고객"
+)
+
+def build_business_plan_prompt(extracted_text: str, kpi_table: str = "") -> str:
+    """사업계획서 요약 프롬프트 (■ 형식)
+
+    kpi_table은 원문에서 규칙 기반으로 추출한 수치표이며, 금액 항목은 이 표의 값을 그대로 옮기도록 합니다.
+    """
+    kpi_reference = f"""
+    원문에서 추출한 수치표 (항목 | 값 | 원문 표기 | 출처) - 금액과 수치는 이 표의 값을 그대로 사용하세요:
+    {kpi_table}
+    """ if kpi_table else ""
+    return f"""
     다음은 사업계획서에서 추출된 전체 텍스트입니다.
     이 텍스트를 분석하여 Station C 진단보고서에 필요한 핵심 정보를 추출해주세요. 마크다운은 제외해주세요.
     
     사업계획서 텍스트:
     {extracted_text}
+    {kpi_reference}
     
     다음 형식으로 핵심 내용을 정리해주세요. 마크다운 문법을 사용하지 말고 일반 텍스트로 작성해주세요:
     
@@ -71,5 +69,79 @@ async def analyze_business_plan(file_paths: list, upload_dir: str) -> str:
     3. 숫자, 금액, 연도 등은 정확히 추출하세요.
     4. 정보가 없는 경우에만 "정보 없음"으로 표시하세요.
     """
+
+def build_financial_excerpt(documents: list, max_chars: int = DOCUMENT_EXCERPT_MAX_CHARS) -> str:
+    """재무/KPI 관련 섹션과 표만 원문 그대로 발췌 (파일별 구분, 최대 max_chars자)"""
+    parts = []
+    for file_path, document in documents:
+        excerpt = render_excerpt(document, select_blocks(document, FINANCE_KPI_PATTERN))
+        if excerpt:
+            parts.append(f"=== 파일: {file_path} ===\n{excerpt}")
+    return "\n\n".join(parts)[:max_chars]
+
+async def extract_business_plan(file_paths: list, upload_dir: str, progress=None) -> dict:
+    """사업계획서 파일 추출 단계 (OCR 포함)
+
+    {"text", "financial_excerpt", "kpi_rows", "complete"}를 반환합니다. 발췌는 재무/KPI 관련 섹션과 표를
+    요약 없이 그대로 담아 KPI/사업비 프롬프트에서 정확한 수치를 쓰도록 하고, KPI 수치는
+    services.kpi_extractor로 원문에서 직접 추출합니다. complete는 모든 파일이 오류 없이 추출되었는지 여부입니다.
+    """
+    # 파일 내용을 텍스트로 추출 (OCR 및 다양한 파일 형식 지원)
+    report_progress(progress, "extraction", "started", files=len(file_paths))
+    # 파일들을 워커 프로세스에서 동시에 추출 (이벤트 루프를 막지 않고, 파일별로 오류/시간 초과 격리)
+    full_paths = [os.path.join(upload_dir, file_path) for file_path in file_paths]
+    existing = [full_path for full_path in full_paths if os.path.exists(full_path)]
+    names = dict(zip(full_paths, file_paths))
+
+    def on_done(full_path: str, document, error) -> None:
+        if error is not None:
+            report_progress(progress, "extraction", "progress", file=names[full_path], error=str(error))
+        else:
+            report_progress(progress, "extraction", "progress", file=names[full_path], characters=len(document["text"]))
+
+    contents = dict(zip(existing, await extract_files(existing, on_done=on_done)))
+    
+    sections = []
+    documents = []
+    complete = True
+    for file_path, full_path in zip(file_paths, full_paths):
+        document = contents.get(full_path)
+        if document is None:
+            content = "파일을 찾을 수 없습니다."
+            complete = False
+        elif isinstance(document, Exception):
+            print(f"파일 처리 오류 {file_path}: {document}")
+            content = f"파일 처리 중 오류 발생: {str(document)}"
+            complete = False
+        else:
+            content = document["text"]
+            complete = complete and not is_extraction_error(document)
+            documents.append((file_path, document))
+        sections.append(f"\n\n=== 파일: {file_path} ===\n{content}")
+    extracted_text = "".join(sections)
+    financial_excerpt = build_financial_excerpt(documents)
+    kpi_rows = await asyncio.to_thread(
+        lambda: [row for file_path, document in documents for row in extract_document_kpis(document, file_path)]
+    )
     
-    return await call_gpt(final_prompt)
+    report_progress(progress, "extraction", "completed", characters=len(extracted_text))
+    
+    print(f"📄 사업계획서 텍스트 길이: {len(extracted_text)}자 (재무/KPI 발췌 {len(financial_excerpt)}자)")
+    return {
+        "text": extracted_text,
+        "financial_excerpt": financial_excerpt,
+        "kpi_rows": kpi_rows,
+        "complete": complete,
+    }
+
+async def summarize_business_plan(extraction: dict, progress=None) -> str:
+    """사업계획서 요약 단계 (추출 결과 + 규칙 기반 KPI 수치표 -> GPT)"""
+    report_progress(progress, "business_plan_summary", "started")
+    # 긴 텍스트는 청크별로 나눠 동시에 요약한 뒤 합침 (청크 요약은 캐시되어 바뀐 부분만 다시 요약)
+    kpi_rows = extraction["kpi_rows"]
+    kpi_table = format_kpi_table(merge_kpi_rows(kpi_rows)) if kpi_rows else ""
+    summary = await summarize_text(
+        extraction["text"], "business_plan", lambda text: build_business_plan_prompt(text, kpi_table)
+    )
+    report_progress(progress, "business_plan_summary", "completed", result=summary)
+    return summary
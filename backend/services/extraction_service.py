@@ -0,0 +1,169 @@
+import asyncio
+import multiprocessing
+import os
+
+from config import (
+    EXTRACTION_WORKERS,
+    EXTRACTION_TIMEOUT,
+    PDF_PAGES_PER_TASK,
+    PDF_PARALLEL_MIN_PAGES,
+    ANALYSIS_FILE_CONCURRENCY,
+)
+from utils.cache import result_cache
+from utils.concurrency import map_limited
+from utils.telemetry import span, annotate
+from utils.plugins import resolve
+from utils.file_processor import (
+    extract_document_from_file,
+    extraction_cache_key,
+    is_extraction_error,
+    pdf_pages_to_document,
+)
+
+# 워커 프로세스 없이 스레드에서 바로 처리하는 가벼운 형식
+INLINE_EXTENSIONS = ("txt",)
+
+# PDF 페이지 단위 추출 함수 - 이름으로 넘겨 워커 프로세스에서만 PyPDF2/OCR 엔진을 불러옴
+_PDF_PAGE_COUNT = "utils.pdf_extractor:get_pdf_page_count"
+_PDF_PAGE_RANGE = "utils.pdf_extractor:extract_pdf_page_range"
+
+# 동시에 실행되는 추출 워커 프로세스 수 제한
+_semaphore = None
+
+
+class ExtractionTimeoutError(Exception):
+    """파일 추출이 제한 시간을 넘은 경우"""
+
+
+class ExtractionWorkerError(Exception):
+    """추출 워커 프로세스가 비정상 종료되었거나 추출 중 예외가 발생한 경우"""
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(EXTRACTION_WORKERS)
+    return _semaphore
+
+
+def _worker_entry(conn, func, args) -> None:
+    try:
+        if isinstance(func, str):
+            func = resolve(func)
+        conn.send((True, func(*args)))
+    except BaseException as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _receive(conn):
+    # 워커가 결과를 보내기 전에 죽으면 EOFError -> None
+    try:
+        return conn.recv()
+    except EOFError:
+        return None
+    finally:
+        conn.close()
+
+
+async def _run_isolated(func, *args):
+    """func(*args)를 별도 프로세스에서 실행 (func는 함수 또는 "패키지.모듈:함수" 문자열)
+
+    워커가 크래시하거나(세그폴트 등) 취소/타임아웃되면 해당 프로세스만 종료하므로
+    다른 파일 처리와 서버 프로세스에는 영향을 주지 않습니다.
+    """
+    async with _get_semaphore():
+        ctx = multiprocessing.get_context()
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_worker_entry, args=(child_conn, func, args))
+        process.start()
+        child_conn.close()
+        try:
+            message = await asyncio.to_thread(_receive, parent_conn)
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        finally:
+            await asyncio.to_thread(process.join)
+
+    if message is None:
+        raise ExtractionWorkerError(f"추출 프로세스가 비정상 종료되었습니다 (exit code {process.exitcode})")
+    ok, payload = message
+    if not ok:
+        raise ExtractionWorkerError(payload)
+    return payload
+
+
+async def _extract_pdf(full_path: str) -> dict:
+    # PDF는 페이지 묶음 단위로 워커에 나눠서 처리 (가장 느린 페이지 묶음 시간에 수렴)
+    # 페이지가 적으면 워커 하나에서 처리 (프로세스 시작 비용이 더 큼)
+    page_count = await _run_isolated(_PDF_PAGE_COUNT, full_path)
+    per_task = page_count if page_count < PDF_PARALLEL_MIN_PAGES else PDF_PAGES_PER_TASK
+    ranges = [
+        (start, min(start + per_task, page_count))
+        for start in range(0, page_count, max(per_task, 1))
+    ]
+    results = await asyncio.gather(
+        *(_run_isolated(_PDF_PAGE_RANGE, full_path, start, end) for start, end in ranges)
+    )
+    pages = [page for pages in results for page in pages]
+    annotate(pages=len(pages), ocr_pages=sum(1 for page in pages if page["ocr"]))
+    return pdf_pages_to_document(pages, os.path.basename(full_path))
+
+
+async def _extract(full_path: str) -> dict:
+    key = await asyncio.to_thread(extraction_cache_key, full_path)
+    cached = result_cache.get(key)
+    if cached is not None:
+        print(f"♻️ 추출 캐시 사용: {os.path.basename(full_path)}")
+        annotate(cached=True)
+        return cached
+
+    extension = full_path.split('.')[-1].lower()
+    if extension in INLINE_EXTENSIONS:
+        document = await asyncio.to_thread(extract_document_from_file, full_path)
+    elif extension == 'pdf':
+        document = await _extract_pdf(full_path)
+    else:
+        document = await _run_isolated(extract_document_from_file, full_path)
+
+    if not is_extraction_error(document):
+        result_cache.set(key, document)
+    return document
+
+
+async def extract_file(full_path: str, timeout: float = EXTRACTION_TIMEOUT) -> dict:
+    """파일 하나를 이벤트 루프 밖에서 문서(utils.document 형식)로 추출 (제한 시간 초과 시 ExtractionTimeoutError)"""
+    extension = full_path.split('.')[-1].lower()
+    with span(f"extraction.{extension}", file=os.path.basename(full_path), bytes=os.path.getsize(full_path)) as current:
+        try:
+            document = await asyncio.wait_for(_extract(full_path), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ExtractionTimeoutError(f"파일 처리 시간이 {timeout:.0f}초를 초과했습니다.")
+        text = document["text"]
+        current.set(characters=len(text), tables=sum(1 for block in document["blocks"] if block["type"] == "table"))
+        if is_extraction_error(document):
+            current.fail(document["error"][:200])
+        return document
+
+
+async def extract_files(full_paths: list, timeout: float = EXTRACTION_TIMEOUT,
+                        concurrency: int = ANALYSIS_FILE_CONCURRENCY, on_done=None) -> list:
+    """여러 파일을 최대 concurrency개까지 동시에 추출
+
+    입력 순서대로 결과를 반환하며, 실패한 파일은 해당 위치에 예외 객체가 들어갑니다.
+    on_done(full_path, document, error)는 파일 하나가 끝날 때마다 호출됩니다.
+    """
+    async def run(full_path: str) -> dict:
+        try:
+            document = await extract_file(full_path, timeout)
+        except Exception as e:
+            if on_done:
+                on_done(full_path, None, e)
+            raise
+        if on_done:
+            on_done(full_path, document, None)
+        return document
+
+    return await map_limited(run, full_paths, concurrency)
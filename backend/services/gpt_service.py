@@ -1,22 +1,261 @@
+import contextlib
+import contextvars
+import time
+from collections import deque
+
+import httpx
 import openai
-from config import OPENAI_API_KEY
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    LLM_MODEL,
+    LLM_POOL_SIZE,
+    LLM_TIMEOUT,
+    LLM_CONNECT_TIMEOUT,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_HTTP2,
+)
+from services.llm_scheduler import llm_scheduler
+from utils.cache import result_cache, make_key
+from utils.telemetry import record_span
+
+SYSTEM_PROMPT = "당신은 Station C 진단보고서 전문가입니다. 제공된 정보를 정확히 분석하고, 추측이나 가정 없이 실제 데이터만을 바탕으로 진단보고서를 작성해주세요. 정보가 명확하지 않은 경우 '정보 없음'으로 표시하세요."
+MAX_TOKENS = 32000
+TEMPERATURE = 1.0
+# call_gpt가 예외 대신 돌려주는 오류 메시지 앞부분 (결과를 저장하기 전에 확인)
+GPT_ERROR_PREFIX = "GPT 분석 중 오류가 발생했습니다"
+
+# 프로세스 전역 LLM 클라이언트 (앱 lifespan에서 생성/종료)
+_client = None
+_http_client = None
+
+# 호출별 지연시간 및 토큰 사용량 통계
+_metrics = {
+    "calls": 0,
+    "errors": 0,
+    "total_latency": 0.0,
+    "prompt_tokens": 0,
+    "cached_tokens": 0,
+    "completion_tokens": 0,
+}
+_recent_latencies = deque(maxlen=1000)
+
+# 분석 요청별 토큰 사용량 집계 (track_llm_usage 블록 안의 호출만)
+_request_usage = contextvars.ContextVar("llm_request_usage", default=None)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def init_llm_client(transport: httpx.AsyncBaseTransport = None) -> openai.AsyncOpenAI:
+    """연결 풀을 재사용하는 LLM 클라이언트 생성
+
+    transport를 넘기면 해당 전송 계층을 사용합니다 (테스트/벤치마크용 로컬 모의 서버 등).
+    """
+    global _client, _http_client
+
+    http2 = LLM_HTTP2 and _http2_available()
+    if LLM_HTTP2 and not http2:
+        print("⚠️ h2 패키지가 없어 HTTP/1.1 keep-alive로 연결합니다")
+
+    timeout = httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+    _http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=LLM_POOL_SIZE,
+            max_keepalive_connections=LLM_POOL_SIZE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=timeout,
+        http2=http2,
+        transport=transport,
+    )
+    _client = openai.AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        base_url=OPENAI_BASE_URL,
+        http_client=_http_client,
+        timeout=timeout,
+        max_retries=0,  # 재시도는 스케줄러가 담당하므로 클라이언트 자체 재시도는 끔
+    )
+    return _client
+
+
+def get_llm_client() -> openai.AsyncOpenAI:
+    """공용 LLM 클라이언트 반환 (없으면 생성)"""
+    if _client is None:
+        init_llm_client()
+    return _client
+
+
+async def close_llm_client() -> None:
+    """LLM 클라이언트와 연결 풀 종료"""
+    global _client, _http_client
+    if _client is not None:
+        await _client.close()
+    if _http_client is not None:
+        await _http_client.aclose()
+    _client = None
+    _http_client = None
+
 
-async def call_gpt(prompt: str) -> str:
-    """GPT API 호출"""
+def get_llm_metrics() -> dict:
+    """LLM 호출 지연시간/토큰 사용량 통계"""
+    latencies = sorted(_recent_latencies)
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    calls = _metrics["calls"]
+    return {
+        **_metrics,
+        "avg_latency": _metrics["total_latency"] / calls if calls else 0.0,
+        "p50_latency": percentile(0.50),
+        "p95_latency": percentile(0.95),
+        "in_flight": llm_scheduler.in_flight,
+        "waiting": llm_scheduler.waiting,
+    }
+
+
+@contextlib.contextmanager
+def track_llm_usage():
+    """with 블록 안에서 실행(생성)되는 LLM 호출의 토큰 사용량 집계
+
+    반환된 딕셔너리(calls, prompt_tokens, cached_tokens, completion_tokens)가 호출이 끝날 때마다 갱신됩니다.
+    cached_tokens는 prompt_tokens 중 제공자 프롬프트 캐시가 적용된 토큰 수입니다.
+    """
+    usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    token = _request_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _request_usage.reset(token)
+
+
+def _record_call(latency: float, usage, error: str = None, name: str = "llm.call", characters: int = 0) -> None:
+    # 재시도 횟수는 LLM을 호출한 단계의 스팬(report.*, summary.* 등)에 집계됨
+    _metrics["calls"] += 1
+    _metrics["total_latency"] += latency
+    _recent_latencies.append(latency)
+    if error:
+        _metrics["errors"] += 1
+    request_usage = _request_usage.get()
+    if request_usage is not None:
+        request_usage["calls"] += 1
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        counts = {
+            "prompt_tokens": usage.prompt_tokens or 0,
+            "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+            "completion_tokens": usage.completion_tokens or 0,
+        }
+        for key, count in counts.items():
+            _metrics[key] += count
+            if request_usage is not None:
+                request_usage[key] += count
+    else:
+        counts = {}
+    record_span(name, latency, {"model": LLM_MODEL, "characters": characters, **counts}, error)
+
+
+def _build_messages(prompt: str, context: str = None) -> list:
+    # 공통 자료(context)는 시스템 프롬프트 바로 뒤 같은 위치에 두어 호출 간 앞부분이 동일하도록 함
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if context:
+        messages.append({"role": "user", "content": context})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+async def call_gpt(prompt: str, priority: int = None, cache: bool = False,
+                   context: str = None, response_format: dict = None) -> str:
+    """GPT API 호출 (공용 스케줄러를 통해 동시 요청 수 제한 및 429 재시도)
+
+    context를 넘기면 여러 호출이 공유하는 자료를 별도 메시지로 앞에 보냅니다 (제공자 프롬프트 캐시 적용).
+    response_format은 JSON 스키마 응답 등 OpenAI response_format 값입니다.
+    cache=True이면 프롬프트와 모델 파라미터 해시를 키로 성공한 응답을 재사용합니다.
+    """
+    cache_key = None
+    if cache:
+        parts = (LLM_MODEL, MAX_TOKENS, TEMPERATURE, SYSTEM_PROMPT, prompt)
+        if context or response_format:
+            # context/response_format이 없는 호출은 기존 캐시 키 그대로 사용
+            parts += (context, response_format)
+        cache_key = make_key("llm", *parts)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            print(f"♻️ GPT 캐시 사용 - 프롬프트 길이: {len(prompt)}")
+            return cached
+    
+    started = time.perf_counter()
     try:
         print(f"🔍 GPT API 호출 시작 - 프롬프트 길이: {len(prompt)}")
-        client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
-        response = await client.chat.completions.create(
-            model="gpt-5",
-            messages=[
-                {"role": "system", "content": "당신은 Station C 진단보고서 전문가입니다. 제공된 정보를 정확히 분석하고, 추측이나 가정 없이 실제 데이터만을 바탕으로 진단보고서를 작성해주세요. 정보가 명확하지 않은 경우 '정보 없음'으로 표시하세요."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=32000,
-            temperature=1.0
-        )
-        print(f"✅ GPT API 호출 성공")
-        return response.choices[0].message.content
+        client = get_llm_client()
+        extra = {"response_format": response_format} if response_format else {}
+        response = await llm_scheduler.run(lambda: client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=_build_messages(prompt, context),
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+            **extra
+        ), priority=priority)
+        latency = time.perf_counter() - started
+        _record_call(latency, response.usage, characters=len(prompt) + len(context or ""))
+        usage = response.usage
+        if usage is not None:
+            print(f"✅ GPT API 호출 성공 - {latency:.1f}초, 토큰 {usage.prompt_tokens}/{usage.completion_tokens}")
+        else:
+            print(f"✅ GPT API 호출 성공 - {latency:.1f}초")
+        content = response.choices[0].message.content
+        if cache_key and content:
+            result_cache.set(cache_key, content)
+        return content
     except Exception as e:
+        _record_call(time.perf_counter() - started, None, error=str(e), characters=len(prompt) + len(context or ""))
         print(f"❌ GPT API 오류: {str(e)}")
-        return f"GPT 분석 중 오류가 발생했습니다: {str(e)}"
\ No newline at end of file
+        return f"{GPT_ERROR_PREFIX}: {str(e)}"
+
+
+async def stream_gpt(prompt: str, priority: int = None, context: str = None):
+    """GPT API 스트리밍 호출 - 생성되는 텍스트 조각을 도착하는 대로 전달
+
+    context는 call_gpt와 같습니다. call_gpt와 달리 오류가 나면 예외를 그대로 전달합니다
+    (이미 보낸 조각과 오류 메시지가 섞여 정상 결과처럼 보이지 않도록, 실패 처리는 호출하는 쪽에서).
+    """
+    started = time.perf_counter()
+    usage = None
+    first_token_at = None
+    try:
+        print(f"🔍 GPT API 스트리밍 시작 - 프롬프트 길이: {len(prompt)}")
+        client = get_llm_client()
+        chunks = llm_scheduler.stream(lambda: client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=_build_messages(prompt, context),
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True}
+        ), priority=priority)
+        async for chunk in chunks:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - started
+                yield delta
+        latency = time.perf_counter() - started
+        _record_call(latency, usage, name="llm.stream", characters=len(prompt) + len(context or ""))
+        print(f"✅ GPT API 스트리밍 완료 - 첫 토큰 {first_token_at or 0:.1f}초, 전체 {latency:.1f}초")
+    except Exception as e:
+        _record_call(time.perf_counter() - started, usage, error=str(e), name="llm.stream",
+                     characters=len(prompt) + len(context or ""))
+        print(f"❌ GPT API 스트리밍 오류: {str(e)}")
+        raise
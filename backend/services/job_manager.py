@@ -0,0 +1,241 @@
+import asyncio
+import time
+import uuid
+
+from models.schemas import AnalysisRequest
+from services.job_queue import RUNNING, COMPLETED, FAILED, FINISHED_STATUSES, make_worker_id
+
+# SSE 연결 유지용 주석 전송 간격 (초)
+KEEPALIVE_INTERVAL = 15
+
+
+def _partial_key(stage: str):
+    """진행 이벤트 단계 이름 -> 부분 결과 위치"""
+    if stage == "kpi":
+        return "extracted_kpis", None
+    if stage.startswith("report:"):
+        return "reports", stage.split(":", 1)[1]
+    if stage in ("business_plan_summary", "meeting_summary"):
+        return stage, None
+    return None, None
+
+
+class JobManager:
+    """백그라운드 분석 작업 관리
+
+    작업과 단계별 진행 이벤트는 작업 대기열(services.job_queue)에 저장하므로 클라이언트 연결이 끊겨도
+    결과가 남습니다. 대기열은 여러 프로세스/서버가 공유할 수 있어서, API 프로세스는 submit()으로 작업을
+    넣기만 하고 실행은 start_workers()를 호출한 프로세스(API 프로세스 자신 또는 worker.py)가 나눠 맡습니다.
+    실행 중인 작업은 임대를 주기적으로 갱신하고, 워커가 죽어서 임대가 만료되면 다른 워커가 다시 실행합니다.
+    프로세스마다 동시에 실행하는 작업 수는 max_running개로 제한합니다.
+    대기열 호출(SQLite 잠금 대기, Redis 왕복)은 모두 asyncio.to_thread로 이벤트 루프 밖에서 실행합니다.
+
+    runner는 (request, progress)를 받아 AnalysisResponse를 반환하는 코루틴 함수입니다.
+    """
+
+    def __init__(self, queue, max_running: int, runner, poll_interval: float = 1.0):
+        self.queue = queue
+        self.runner = runner
+        self.max_running = max_running
+        self.poll_interval = poll_interval
+        self.worker_id = make_worker_id()
+        self._workers = []
+        self._wakeup = None
+        self._subscribers = {}
+
+    async def _add_event(self, job_id: str, stage: str, status: str, data: dict) -> dict:
+        event = await asyncio.to_thread(self.queue.add_event, job_id, stage, status, data)
+        # 같은 프로세스의 구독자는 바로 깨우고, 다른 프로세스의 구독자는 poll_interval마다 조회
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+        return event
+
+    async def _write_events(self, job_id: str, pending: asyncio.Queue) -> None:
+        # 진행 이벤트를 들어온 순서대로 기록 (None이 오면 종료)
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            try:
+                await self._add_event(job_id, *item)
+            except Exception as e:
+                print(f"⚠️ 진행 이벤트 기록 실패 {job_id} ({item[0]}/{item[1]}): {e}")
+
+    async def get_events(self, job_id: str, after_seq: int = 0) -> list:
+        return await asyncio.to_thread(self.queue.get_events, job_id, after_seq)
+
+    async def get_job(self, job_id: str):
+        """작업 상태, 단계별 진행 상황, 부분 결과 조회 (없으면 None)"""
+        job = await asyncio.to_thread(self.queue.get_job, job_id)
+        if job is None:
+            return None
+
+        stages = {}
+        partial = {}
+        for event in await self.get_events(job_id):
+            if event["stage"] == "job":
+                continue
+            stages[event["stage"]] = event["status"]
+            if "result" in event["data"]:
+                key, section = _partial_key(event["stage"])
+                if key and section:
+                    partial.setdefault(key, {})[section] = event["data"]["result"]
+                elif key:
+                    partial[key] = event["data"]["result"]
+
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "created_at": job["created"],
+            "updated_at": job["updated"],
+            "stages": stages,
+            "partial": partial,
+            "result": job["result"],
+            "error": job["error"],
+        }
+
+    # ---- 실행 ----
+
+    async def submit(self, request: AnalysisRequest) -> str:
+        """작업을 대기열에 등록하고 작업 ID 반환 (실행은 워커가 가져가서)"""
+        job_id = str(uuid.uuid4())
+        await asyncio.to_thread(self.queue.enqueue, job_id, request.model_dump_json())
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def start_workers(self) -> None:
+        """이 프로세스에서 대기열 작업을 실행하는 워커 max_running개 시작
+
+        서버가 재시작되기 전에 끝나지 않은 작업은 임대가 만료되면 다시 실행됩니다.
+        """
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_running)]
+        print(f"👷 분석 작업 워커 {self.max_running}개 시작 ({self.worker_id})")
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self.queue.claim, self.worker_id)
+                if claimed is None:
+                    # 같은 프로세스에 등록된 작업은 바로, 다른 프로세스에 등록된 작업은 poll_interval마다 확인
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                job_id, raw_request = claimed
+                try:
+                    request = AnalysisRequest.model_validate_json(raw_request)
+                except ValueError as e:
+                    # 저장된 요청을 해석할 수 없으면 다시 실행해도 같으므로 실패 처리
+                    print(f"❌ 분석 작업 요청 해석 실패 {job_id}: {e}")
+                    await asyncio.to_thread(self.queue.finish, job_id, self.worker_id, FAILED,
+                                            error=f"요청 해석 실패: {str(e)}")
+                    continue
+                await self._run(job_id, request)
+            except Exception as e:
+                # DB 잠금/Redis 연결 오류 등으로 워커가 멈추지 않도록 기록만 하고 잠시 뒤 다시 시도
+                print(f"❌ 분석 작업 워커 오류 ({self.worker_id}): {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _keep_lease(self, job_id: str, task: asyncio.Task, lost: list) -> None:
+        # 임대 시간의 1/3마다 갱신, 다른 워커가 가져갔으면 이 실행은 중단
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.renew, job_id, self.worker_id):
+                print(f"⚠️ 분석 작업 임대 상실 {job_id}: 실행 중단")
+                lost.append(job_id)
+                task.cancel()
+                return
+
+    async def _run(self, job_id: str, request: AnalysisRequest) -> None:
+        print(f"▶️ 분석 작업 시작 {job_id}")
+        await self._add_event(job_id, "job", RUNNING, {"worker": self.worker_id})
+        lost = []
+        lease = asyncio.create_task(self._keep_lease(job_id, asyncio.current_task(), lost))
+        # 진행 콜백은 STT 구간마다 불리므로 대기열에 넣기만 하고 기록은 별도 태스크에서 순서대로
+        pending = asyncio.Queue()
+        writer = asyncio.create_task(self._write_events(job_id, pending))
+
+        def progress(stage: str, status: str, data: dict) -> None:
+            pending.put_nowait((stage, status, data))
+
+        try:
+            try:
+                response = await self.runner(request, progress)
+            finally:
+                lease.cancel()
+                # 남은 진행 이벤트를 모두 기록한 뒤 종료 상태 기록
+                pending.put_nowait(None)
+                await writer
+        except asyncio.CancelledError:
+            if lost:
+                # 임대를 잃은 작업은 이미 다른 워커가 실행 중이므로 이 워커는 다음 작업으로
+                return
+            # 워커 종료로 취소된 작업은 대기열로 돌려보내 다른 워커(또는 다음 시작 시)가 다시 실행
+            await asyncio.to_thread(self.queue.release, job_id, self.worker_id)
+            raise
+        except Exception as e:
+            print(f"❌ 분석 작업 실패 {job_id}: {e}")
+            if await asyncio.to_thread(self.queue.finish, job_id, self.worker_id, FAILED,
+                                       error=f"분석 실패: {str(e)}"):
+                await self._add_event(job_id, "job", FAILED, {"error": str(e)})
+            return
+
+        if await asyncio.to_thread(self.queue.finish, job_id, self.worker_id, COMPLETED,
+                                   result=response.model_dump()):
+            await self._add_event(job_id, "job", COMPLETED, {})
+            print(f"✅ 분석 작업 완료 {job_id}")
+
+    async def stream_events(self, job_id: str, after_seq: int = 0):
+        """저장된 이벤트 이후의 진행 이벤트를 작업이 끝날 때까지 순서대로 전달
+
+        다른 프로세스가 실행 중인 작업은 poll_interval마다 새 이벤트를 조회합니다.
+        연결 유지를 위해 KEEPALIVE_INTERVAL초 동안 이벤트가 없으면 None을 전달합니다.
+        """
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            last_seq = after_seq
+            idle_since = time.monotonic()
+            while True:
+                events = await self.get_events(job_id, last_seq)
+                for event in events:
+                    last_seq = event["seq"]
+                    yield event
+                    if event["stage"] == "job" and event["status"] in FINISHED_STATUSES:
+                        return
+                if events:
+                    idle_since = time.monotonic()
+                else:
+                    job = await asyncio.to_thread(self.queue.get_job, job_id)
+                    if job is None:
+                        return
+                    if job["status"] in FINISHED_STATUSES:
+                        # 조회 사이에 끝난 경우 남은 이벤트까지 전달
+                        for event in await self.get_events(job_id, last_seq):
+                            yield event
+                        return
+                    if time.monotonic() - idle_since >= KEEPALIVE_INTERVAL:
+                        idle_since = time.monotonic()
+                        yield None
+
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    async def shutdown(self) -> None:
+        """워커와 실행 중인 작업 취소 (실행 중이던 작업은 대기열로 돌려보냄)"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,342 @@
+"""분석 작업 대기열 (여러 프로세스/서버의 워커가 공유)
+
+작업 상태와 진행 이벤트를 저장하고, 워커는 claim()으로 작업을 하나씩 가져가 임대(lease)를 주기적으로
+갱신하면서 실행합니다. 워커가 죽어서 임대가 만료되면 다른 워커가 같은 작업을 다시 가져갑니다.
+실행할 때마다 워커를 죽이는 작업(예: 큰 파일로 메모리 부족)이 워커를 돌아가며 죽이지 않도록,
+max_attempts번 가져간 작업은 다시 실행하지 않고 실패 처리합니다 (워커 종료로 돌려보낸 경우는 세지 않음).
+
+- SQLiteJobQueue: 한 서버 안의 여러 프로세스(API 워커, worker.py)가 파일 하나를 공유 (개발/단일 서버용)
+- RedisJobQueue: 여러 서버가 Redis 하나를 공유 (`pip install redis` 필요)
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+
+def _attempts_error(max_attempts: int) -> str:
+    return f"분석 실패: 작업이 {max_attempts}번 실행 중 중단되어 더 이상 다시 실행하지 않습니다."
+
+
+def make_worker_id() -> str:
+    """워커 식별자 (호스트 이름:프로세스 ID)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SQLiteJobQueue:
+    """SQLite 작업 대기열
+
+    WAL 모드와 BEGIN IMMEDIATE 트랜잭션으로 같은 파일을 쓰는 여러 프로세스가 같은 작업을
+    동시에 가져가지 않게 합니다. 네트워크 파일 시스템(NFS 등)에서는 잠금을 믿을 수 없으므로
+    여러 서버에서 쓰려면 RedisJobQueue를 사용하세요.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float, max_attempts: int):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # 트랜잭션은 직접 관리 (다른 프로세스가 쓰는 중이면 timeout초까지 대기)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL,"
+            " result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " job_id TEXT NOT NULL, seq INTEGER NOT NULL, stage TEXT NOT NULL, status TEXT NOT NULL,"
+            " data TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (job_id, seq))"
+        )
+        # 이전 버전 DB에 임대 컬럼 추가 (임대가 없는 실행 중 작업은 만료된 것으로 보고 다시 실행)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("worker", "TEXT"), ("lease_until", "REAL"), ("attempts", "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+
+    def _transaction(self, callback):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = callback(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def enqueue(self, job_id: str, request: str) -> None:
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, status, request, created, updated) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, request, now, now),
+        )
+
+    def claim(self, worker_id: str):
+        """대기 중이거나 임대가 만료된 가장 오래된 작업을 가져감 - (작업 ID, 요청 JSON) 또는 None"""
+        def claim_oldest(db):
+            now = time.time()
+            while True:
+                row = db.execute(
+                    "SELECT id, request, attempts FROM jobs WHERE status = ?"
+                    " OR (status = ? AND (lease_until IS NULL OR lease_until < ?)) ORDER BY created LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, request, attempts = row
+                if attempts >= self.max_attempts:
+                    print(f"❌ 분석 작업 {job_id}: {attempts}번 실행 중 중단되어 실패 처리")
+                    db.execute(
+                        "UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = NULL, updated = ?"
+                        " WHERE id = ?",
+                        (FAILED, _attempts_error(attempts), now, job_id),
+                    )
+                    continue
+                db.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated = ?"
+                    " WHERE id = ?",
+                    (RUNNING, worker_id, now + self.lease_seconds, now, job_id),
+                )
+                return job_id, request
+        return self._transaction(claim_oldest)
+
+    def renew(self, job_id: str, worker_id: str) -> bool:
+        """임대 연장 (다른 워커가 가져간 경우 False)"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker_id, RUNNING),
+            )
+            return cursor.rowcount > 0
+
+    def finish(self, job_id: str, worker_id: str, status: str, result=None, error: str = None) -> bool:
+        """작업 종료 기록 (임대를 가진 워커만, 아니면 False)"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated = ?"
+                " WHERE id = ? AND worker = ? AND status = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error,
+                 time.time(), job_id, worker_id, RUNNING),
+            )
+            return cursor.rowcount > 0
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        """실행 중인 작업을 대기열로 돌려보냄 (워커 종료 시, 실행 횟수에서 제외)"""
+        self._execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, attempts = MAX(attempts - 1, 0),"
+            " updated = ?"
+            " WHERE id = ? AND worker = ? AND status = ?",
+            (QUEUED, time.time(), job_id, worker_id, RUNNING),
+        )
+
+    def add_event(self, job_id: str, stage: str, status: str, data: dict) -> dict:
+        now = time.time()
+
+        def append(db):
+            seq = db.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            db.execute(
+                "INSERT INTO job_events (job_id, seq, stage, status, data, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, seq, stage, status, json.dumps(data, ensure_ascii=False), now),
+            )
+            db.execute("UPDATE jobs SET updated = ? WHERE id = ?", (now, job_id))
+            return seq
+        seq = self._transaction(append)
+        return {"seq": seq, "stage": stage, "status": status, "data": data, "created": now}
+
+    def get_events(self, job_id: str, after_seq: int = 0) -> list:
+        rows = self._execute(
+            "SELECT seq, stage, status, data, created FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after_seq),
+        )
+        return [
+            {"seq": seq, "stage": stage, "status": status, "data": json.loads(data), "created": created}
+            for seq, stage, status, data, created in rows
+        ]
+
+    def get_job(self, job_id: str):
+        """작업 상태와 결과 (없으면 None)"""
+        rows = self._execute(
+            "SELECT status, result, error, created, updated, worker, attempts FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not rows:
+            return None
+        status, result, error, created, updated, worker, attempts = rows[0]
+        return {"status": status, "result": json.loads(result) if result else None, "error": error,
+                "created": created, "updated": updated, "worker": worker, "attempts": attempts}
+
+
+# 만료된 임대를 대기열 앞으로 돌려놓고 가장 오래된 작업을 가져감 (max_attempts번 가져간 작업은 실패 처리)
+_REDIS_CLAIM = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], job_id)
+    redis.call('HSET', ARGV[4] .. job_id, 'status', 'queued')
+    redis.call('RPUSH', KEYS[1], job_id)
+end
+while true do
+    local job_id = redis.call('RPOP', KEYS[1])
+    if not job_id then
+        return false
+    end
+    local key = ARGV[4] .. job_id
+    if tonumber(redis.call('HGET', key, 'attempts') or '0') >= tonumber(ARGV[5]) then
+        redis.call('HSET', key, 'status', 'failed', 'error', ARGV[6], 'worker', '', 'updated', ARGV[1])
+    else
+        redis.call('HSET', key, 'status', 'running', 'worker', ARGV[3], 'updated', ARGV[1])
+        redis.call('HINCRBY', key, 'attempts', 1)
+        redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+        return {job_id, redis.call('HGET', key, 'request')}
+    end
+end
+"""
+
+# 임대를 가진 워커일 때만 실행 (KEYS[1]: 작업 해시, KEYS[2]: 임대 집합)
+_REDIS_RENEW = """
+if redis.call('HGET', KEYS[1], 'worker') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'running' then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+return 1
+"""
+
+_REDIS_FINISH = """
+if redis.call('HGET', KEYS[1], 'worker') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'running' then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HSET', KEYS[1], 'status', ARGV[3], 'result', ARGV[4], 'error', ARGV[5], 'updated', ARGV[6])
+return 1
+"""
+
+_REDIS_RELEASE = """
+if redis.call('HGET', KEYS[1], 'worker') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'running' then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HSET', KEYS[1], 'status', 'queued', 'worker', '', 'updated', ARGV[3])
+if tonumber(redis.call('HGET', KEYS[1], 'attempts') or '0') > 0 then
+    redis.call('HINCRBY', KEYS[1], 'attempts', -1)
+end
+redis.call('RPUSH', KEYS[3], ARGV[2])
+return 1
+"""
+
+# 이벤트 순번 증가와 추가를 한 번에 (목록 위치 = 순번 - 1)
+_REDIS_EVENT = """
+local seq = redis.call('HINCRBY', KEYS[1], 'seq', 1)
+redis.call('HSET', KEYS[1], 'updated', ARGV[2])
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return seq
+"""
+
+
+class RedisJobQueue:
+    """Redis 작업 대기열 (여러 서버의 API/워커 프로세스가 공유)
+
+    작업은 해시({prefix}job:{id}), 대기열은 리스트({prefix}queue), 실행 중인 작업의 임대 만료 시각은
+    정렬 집합({prefix}leases), 진행 이벤트는 작업별 리스트({prefix}events:{id})에 저장합니다.
+    가져가기/임대 갱신/종료는 Lua 스크립트로 원자적으로 처리합니다.
+    """
+
+    def __init__(self, url: str, lease_seconds: float, max_attempts: int, prefix: str = "station_c:"):
+        import redis
+
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+        self._queue = f"{prefix}queue"
+        self._leases = f"{prefix}leases"
+        self._claim = self._redis.register_script(_REDIS_CLAIM)
+        self._renew = self._redis.register_script(_REDIS_RENEW)
+        self._finish = self._redis.register_script(_REDIS_FINISH)
+        self._release = self._redis.register_script(_REDIS_RELEASE)
+        self._event = self._redis.register_script(_REDIS_EVENT)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._prefix}job:{job_id}"
+
+    def _events_key(self, job_id: str) -> str:
+        return f"{self._prefix}events:{job_id}"
+
+    def enqueue(self, job_id: str, request: str) -> None:
+        now = time.time()
+        pipe = self._redis.pipeline()
+        pipe.hset(self._job_key(job_id), mapping={
+            "status": QUEUED, "request": request, "created": now, "updated": now, "attempts": 0, "seq": 0,
+        })
+        pipe.lpush(self._queue, job_id)
+        pipe.execute()
+
+    def claim(self, worker_id: str):
+        now = time.time()
+        return self._claim(
+            keys=[self._queue, self._leases],
+            args=[now, now + self.lease_seconds, worker_id, f"{self._prefix}job:", self.max_attempts,
+                  _attempts_error(self.max_attempts)],
+        ) or None
+
+    def renew(self, job_id: str, worker_id: str) -> bool:
+        return bool(self._renew(
+            keys=[self._job_key(job_id), self._leases],
+            args=[worker_id, time.time() + self.lease_seconds, job_id],
+        ))
+
+    def finish(self, job_id: str, worker_id: str, status: str, result=None, error: str = None) -> bool:
+        return bool(self._finish(
+            keys=[self._job_key(job_id), self._leases],
+            args=[worker_id, job_id, status,
+                  json.dumps(result, ensure_ascii=False) if result is not None else "", error or "", time.time()],
+        ))
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        self._release(keys=[self._job_key(job_id), self._leases, self._queue], args=[worker_id, job_id, time.time()])
+
+    def add_event(self, job_id: str, stage: str, status: str, data: dict) -> dict:
+        now = time.time()
+        payload = json.dumps({"stage": stage, "status": status, "data": data, "created": now}, ensure_ascii=False)
+        seq = self._event(keys=[self._job_key(job_id), self._events_key(job_id)], args=[payload, now])
+        return {"seq": seq, "stage": stage, "status": status, "data": data, "created": now}
+
+    def get_events(self, job_id: str, after_seq: int = 0) -> list:
+        return [
+            {"seq": seq, **json.loads(raw)}
+            for seq, raw in enumerate(self._redis.lrange(self._events_key(job_id), after_seq, -1), after_seq + 1)
+        ]
+
+    def get_job(self, job_id: str):
+        job = self._redis.hgetall(self._job_key(job_id))
+        if not job:
+            return None
+        return {"status": job["status"], "result": json.loads(job["result"]) if job.get("result") else None,
+                "error": job.get("error") or None, "created": float(job["created"]),
+                "updated": float(job["updated"]), "worker": job.get("worker") or None,
+                "attempts": int(job.get("attempts", 0))}
+
+
+def create_job_queue(backend: str, db_path: str, redis_url: str, lease_seconds: float, max_attempts: int):
+    """JOB_QUEUE_BACKEND 설정에 맞는 작업 대기열 생성"""
+    if backend == "redis":
+        return RedisJobQueue(redis_url, lease_seconds, max_attempts)
+    if backend != "sqlite":
+        raise ValueError(f"지원하지 않는 작업 대기열: {backend}")
+    return SQLiteJobQueue(db_path, lease_seconds, max_attempts)
@@ -1,20 +1,164 @@
-from services.gpt_service import call_gpt
-
-async def extract_kpis(business_plan: str, meeting: str) -> str:
-    """KPI 추출"""
-    prompt = f"""
-    다음은 사업계획서와 미팅 분석 결과입니다. 
-    Station C 진단보고서에 필요한 핵심성과지표(KPI)를 추출하여 정리해주세요. 마크다운은 제외해주세요.
-    
-    사업계획서 분석:
-    {business_plan}
-    
-    미팅 분석:
-    {meeting}
-    
-    다음 형식으로 KPI를 정리해주세요. 마크다운 문법을 사용하지 말고 일반 텍스트로 작성해주세요:
-    
-    정보가 명확하지 않은 경우는 표시하지 말아주세요,마크다운은 제외해주세요.
+"""KPI 수치 추출 (추출/STT → KPI 단계, LLM 호출 없음)
+
+사업계획서 문서와 미팅 녹취록에서 매출, 투자, 고용 같은 KPI 수치를 규칙 기반으로 찾아 표로 만듭니다.
+1. 한국어 금액/수량 표기(1억 5천만 원, 3,000만원, 12.5%, 15명)를 숫자로 변환
+2. 같은 줄에서 수치 바로 앞에 있는 항목 이름(KPI_TERMS)으로 항목과 종류(금액, 비율, 인원 등)를 정함
+3. 출처 파일, 원문 위치, 페이지 번호를 함께 기록해 LLM이 수치를 다시 계산하지 않고 원문 표기를 그대로 쓰도록 함
+4. 같은 출처의 같은 항목/값을 합쳐 KPI_TABLE_MAX_ROWS개까지 "항목 | 값 | 원문 표기 | 출처" 표로 변환
+"""
+import bisect
+import re
+
+from config import KPI_TABLE_MAX_ROWS
+
+# 숫자 (천 단위 쉼표, 소수점 허용)
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_MAGNITUDES = {"조": 10 ** 12, "억": 10 ** 8, "천만": 10 ** 7, "백만": 10 ** 6, "십만": 10 ** 5, "만": 10 ** 4, "천": 10 ** 3}
+_MAGNITUDE = "|".join(sorted(_MAGNITUDES, key=len, reverse=True))
+
+# 수치 + 단위 (예: 1억 5천만 원, 3,000만원, 12.5%, 15명, 2024년)
+_VALUE_RE = re.compile(
+    rf"(?<![\d.,])(?P<amount>(?:{_NUMBER}\s*(?:{_MAGNITUDE})\s*)+(?:{_NUMBER}(?![\d.,]))?|{_NUMBER})"
+    r"\s*(?P<unit>원|달러|%|퍼센트|프로|명|년|개|건|회|곳)?"
+)
+_PART_RE = re.compile(rf"({_NUMBER})\s*({_MAGNITUDE})?")
+
+# KPI 항목 이름 -> 기본 종류 (금액 항목은 '원'이 생략된 '10억'도 금액으로 처리)
+KPI_TERMS = {
+    "총 사업비": "money", "총사업비": "money", "사업비": "money", "정부지원금": "money", "지원금": "money",
+    "자기부담금": "money", "현금": "money", "현물": "money", "투자 유치": "money", "투자유치": "money",
+    "투자": "money", "매출액": "money", "매출": "money", "영업이익": "money", "순이익": "money",
+    "시장 규모": "money", "시장규모": "money", "인건비": "money", "마케팅비": "money", "연구개발비": "money",
+    "수출": "money", "계약": "money", "자본금": "money",
+    "점유율": "percent", "성장률": "percent", "달성률": "percent", "전환율": "percent", "재구매율": "percent",
+    "고용": "headcount", "채용": "headcount", "임직원": "headcount", "직원": "headcount", "인력": "headcount",
+    "고객": "count", "사용자": "count", "회원": "count", "MAU": "count", "DAU": "count", "다운로드": "count",
+    "설립": "year", "창업": "year", "목표": None,
+}
+_TERM_RE = re.compile("|".join(re.escape(term) for term in sorted(KPI_TERMS, key=len, reverse=True)))
+# 수치 앞에서 항목 이름을 찾는 범위 (같은 줄 안에서만)
+_TERM_WINDOW = 40
+
+_UNIT_KINDS = {"원": "money", "달러": "money", "%": "percent", "퍼센트": "percent", "프로": "percent", "명": "headcount",
+               "년": "year", "개": "count", "건": "count", "회": "count", "곳": "count"}
+_KIND_UNITS = {"money": "KRW", "percent": "%", "headcount": "명", "year": "년", "count": "개"}
+
+
+def parse_amount(text: str) -> float:
+    """한국어 금액/수량 표기를 숫자로 (예: '1억 5천만' -> 150000000)"""
+    return sum(
+        float(number.replace(",", "")) * _MAGNITUDES.get(magnitude, 1)
+        for number, magnitude in _PART_RE.findall(text)
+        if number.replace(",", "")
+    )
+
+
+def _nearest_term(text: str, start: int) -> tuple:
+    """수치 바로 앞의 항목 이름과 기본 종류 ('매출 목표'처럼 '목표' 앞 항목은 함께 표시)"""
+    line_start = max(text.rfind("\n", 0, start) + 1, start - _TERM_WINDOW)
+    terms = _TERM_RE.findall(text, line_start, start)
+    if not terms:
+        return None, None
+    term = terms[-1]
+    if KPI_TERMS[term] is None and len(terms) > 1 and KPI_TERMS[terms[-2]] is not None:
+        return f"{terms[-2]} {term}", KPI_TERMS[terms[-2]]
+    return term, KPI_TERMS[term]
+
+
+def _classify(amount: str, unit: str, term_kind: str):
+    """(종류, 단위) - KPI로 볼 수 없는 수치는 None"""
+    if unit:
+        kind = _UNIT_KINDS[unit]
+        if unit == "달러":
+            return kind, "USD"
+        return kind, unit if kind == "count" else _KIND_UNITS[kind]
+    has_magnitude = any(magnitude in amount for magnitude in _MAGNITUDES)
+    if has_magnitude and term_kind in ("money", None):
+        return "money", "KRW"
+    if term_kind in ("count", "headcount") and has_magnitude:
+        return term_kind, _KIND_UNITS[term_kind]
+    return None
+
+
+def extract_kpis(text: str, source: str, page_of=None) -> list:
+    """텍스트에서 KPI 수치를 규칙 기반으로 추출
+
+    항목 이름(KPI_TERMS)이 같은 줄 앞쪽에 있는 수치만 골라
+    {"term", "kind", "value", "unit", "text", "source", "start", "end", "page"} 목록으로 반환합니다.
+    kind는 money/percent/headcount/year/count이고, start/end는 text 안의 원문 위치입니다.
+    page_of(offset)가 있으면 원문 페이지 번호를 함께 기록합니다.
     """
-    
-    return await call_gpt(prompt)
+    rows = []
+    for match in _VALUE_RE.finditer(text):
+        term, term_kind = _nearest_term(text, match.start())
+        if term is None:
+            continue
+        amount, unit = match.group("amount"), match.group("unit")
+        classified = _classify(amount, unit, term_kind)
+        if classified is None:
+            continue
+        kind, value_unit = classified
+        value = parse_amount(amount)
+        if kind == "year" and not 1900 <= value <= 2100:
+            continue
+        rows.append({
+            "term": term,
+            "kind": kind,
+            "value": int(value) if value.is_integer() else value,
+            "unit": value_unit,
+            "text": match.group(0).strip(),
+            "source": source,
+            "start": match.start(),
+            "end": match.end(),
+            "page": page_of(match.start()) if page_of else None,
+        })
+    return rows
+
+
+def extract_document_kpis(document: dict, source: str) -> list:
+    """추출 문서(utils.document)에서 KPI 수치 추출 (블록 위치로 페이지 번호 기록)"""
+    blocks = [block for block in document["blocks"] if block["page"] is not None]
+    starts = [block["start"] for block in blocks]
+
+    def page_of(offset: int):
+        index = bisect.bisect_right(starts, offset) - 1
+        return blocks[index]["page"] if index >= 0 else None
+
+    return extract_kpis(document["text"], source, page_of if blocks else None)
+
+
+def _format_value(row: dict) -> str:
+    value = row["value"]
+    if row["unit"] == "KRW":
+        return f"{value:,.0f}원"
+    if row["unit"] == "USD":
+        return f"{value:,.0f}달러"
+    if row["unit"] in ("%", "년"):
+        return f"{value:g}{row['unit']}"
+    return f"{value:,g}{row['unit']}"
+
+
+def merge_kpi_rows(rows: list, max_rows: int = KPI_TABLE_MAX_ROWS) -> list:
+    """같은 출처의 같은 항목/값은 처음 나온 것만 남기고 최대 max_rows개로 제한"""
+    merged = []
+    seen = set()
+    for row in rows:
+        key = (row["source"], row["term"], row["kind"], row["value"])
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(row)
+        if len(merged) >= max_rows:
+            break
+    return merged
+
+
+def format_kpi_table(rows: list) -> str:
+    """KPI 표를 LLM/보고서용 텍스트로 (항목 | 값 | 원문 표기 | 출처)"""
+    if not rows:
+        return "추출된 KPI 수치가 없습니다."
+    lines = ["항목 | 값 | 원문 표기 | 출처"]
+    for row in rows:
+        location = f"{row['source']} p.{row['page']}" if row["page"] is not None else row["source"]
+        lines.append(f"{row['term']} | {_format_value(row)} | {row['text']} | {location} @{row['start']}")
+    return "\n".join(lines)
@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+
+import openai
+
+from config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+)
+from utils.telemetry import count
+
+# 우선순위 (숫자가 작을수록 먼저 실행)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+# 호출 흐름별 기본 우선순위 (priority를 지정하지 않은 하위 호출 전체에 적용)
+_default_priority = contextvars.ContextVar("llm_priority", default=PRIORITY_NORMAL)
+
+# 재시도 대상 오류 (429 레이트 리밋, 일시적인 서버 오류)
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APITimeoutError)
+
+
+@contextlib.contextmanager
+def llm_priority(priority: int):
+    """with 블록 안에서 실행(생성)되는 LLM 요청의 기본 우선순위 지정 (예: 배치 분석은 PRIORITY_LOW)"""
+    token = _default_priority.set(priority)
+    try:
+        yield
+    finally:
+        _default_priority.reset(token)
+
+
+class LLMScheduler:
+    """전체 사용자 공용 LLM 요청 스케줄러
+
+    동시에 실행되는 LLM 요청 수를 max_concurrency개로 제한하고,
+    빈 슬롯은 우선순위가 높은(숫자가 작은) 요청부터, 같은 우선순위는 먼저 온 순서대로 배정합니다.
+    레이트 리밋(429) 오류는 지수 백오프 + 지터로 재시도하며, 대기 중에는 슬롯을 반납합니다.
+    """
+
+    def __init__(self, max_concurrency: int, max_retries: int = LLM_MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._in_flight = 0
+        self._waiters = []  # (priority, seq, future) 힙
+        self._counter = itertools.count()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def _acquire(self, priority: int) -> None:
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._counter), fut)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 슬롯을 배정받은 직후 취소된 경우 다음 요청에 넘겨줌
+                self._release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self) -> None:
+        # 대기 중인 요청이 있으면 슬롯을 그대로 넘겨주고, 없으면 반납
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        # 서버가 Retry-After를 알려주면 그 값을 우선 사용
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), LLM_RETRY_MAX_DELAY)
+                except ValueError:
+                    pass
+        # Full jitter 지수 백오프
+        backoff = min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(0, backoff)
+
+    async def run(self, request_factory, priority: int = None):
+        """request_factory()가 반환하는 코루틴을 슬롯을 확보한 뒤 실행 (priority가 없으면 llm_priority 기본값)"""
+        if priority is None:
+            priority = _default_priority.get()
+        attempt = 0
+        while True:
+            await self._acquire(priority)
+            try:
+                return await request_factory()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"⏳ LLM 요청 재시도 {attempt + 1}/{self.max_retries} ({type(e).__name__}) - {delay:.1f}초 후")
+                count(retries=1)
+            finally:
+                self._release()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def stream(self, request_factory, priority: int = None):
+        """request_factory()가 반환하는 스트림을 슬롯을 확보한 채로 끝까지 전달
+
+        스트림을 여는 단계의 오류만 재시도합니다 (토큰을 받기 시작한 뒤에는 재시도하지 않음).
+        """
+        if priority is None:
+            priority = _default_priority.get()
+        attempt = 0
+        while True:
+            await self._acquire(priority)
+            try:
+                response_stream = await request_factory()
+            except RETRYABLE_ERRORS as e:
+                self._release()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"⏳ LLM 스트림 재시도 {attempt + 1}/{self.max_retries} ({type(e).__name__}) - {delay:.1f}초 후")
+                count(retries=1)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release()
+                raise
+
+            try:
+                async for chunk in response_stream:
+                    yield chunk
+            finally:
+                self._release()
+            return
+
+
+# 프로세스 전역 스케줄러
+llm_scheduler = LLMScheduler(LLM_MAX_CONCURRENCY)
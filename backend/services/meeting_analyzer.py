@@ -1,62 +1,17 @@
+import asyncio
 import os
-import ssl
-import whisper
-from services.gpt_service import call_gpt
+from config import ANALYSIS_FILE_CONCURRENCY, TRANSCRIPT_COMPACTION_ENABLED
+from utils.concurrency import map_limited
+from services.summarizer import summarize_text
+from services.stt_service import transcribe_stream
+from services.progress import report_progress
+from services.kpi_extractor import extract_kpis
+from services.transcript_compactor import compact_transcripts
+from utils.telemetry import span
 
-async def analyze_meeting_audio(file_paths: list, upload_dir: str) -> str:
-    """미팅 오디오 분석 (Whisper STT + GPT)"""
-    if not file_paths:
-        return "업로드된 미팅 오디오가 없습니다."
-    
-    # SSL 인증서 검증 비활성화
-    ssl._create_default_https_context = ssl._create_unverified_context
-    
-    # Whisper 모델 로드 (한번만 로드)
-    try:
-        model = whisper.load_model("tiny")  # 또는 "small" 추천
-        print("✅ Whisper 모델 로드 완료")
-    except Exception as e:
-        print(f"❌ Whisper 모델 로드 실패: {e}")
-        return f"STT 처리 중 오류가 발생했습니다: {str(e)}"
-    
-    # 모든 오디오 파일에서 텍스트 추출
-    all_transcripts = []
-    for file_path in file_paths:
-        full_path = os.path.join(upload_dir, file_path)
-        if os.path.exists(full_path):
-            try:
-                print(f"🎵 Whisper STT 처리 중: {file_path}")
-                
-                # Whisper는 M4A, MP3 등을 직접 지원 - 변환 불필요!
-                whisper_result = model.transcribe(
-                    full_path, 
-                    language="ko",
-                    fp16=False,  # CPU 사용 시 False
-                    verbose=False  # 상세 로그 끄기
-                )
-                transcript = whisper_result["text"].strip()
-                
-                if transcript:
-                    all_transcripts.append(f"파일: {file_path}\n내용: {transcript}")
-                    print(f"✅ Whisper STT 완료: {len(transcript)}자 추출")
-                else:
-                    all_transcripts.append(f"파일: {file_path}\n내용: 음성을 인식할 수 없습니다.")
-                    
-            except Exception as e:
-                print(f"❌ Whisper STT 처리 실패: {e}")
-                all_transcripts.append(f"파일: {file_path}\n내용: STT 처리 중 오류 발생 - {str(e)}")
-        else:
-            all_transcripts.append(f"파일을 찾을 수 없습니다: {file_path}")
-    
-    # 모든 파일이 실패한 경우
-    if not any("내용:" in t and "오류" not in t and "찾을 수 없습니다" not in t for t in all_transcripts):
-        return "모든 오디오 파일 처리에 실패했습니다."
-    
-    # GPT-5로 직접 전체 텍스트 분석 (청크 처리 제거)
-    all_transcripts_text = "\n\n".join(all_transcripts)
-    print(f"📝 STT 텍스트 길이: {len(all_transcripts_text)}자")
-    
-    final_prompt = f"""
+def build_meeting_prompt(all_transcripts_text: str) -> str:
+    """미팅 요약 프롬프트 (■ 형식)"""
+    return f"""
     다음은 미팅 오디오에서 추출된 전체 텍스트입니다.
     이 텍스트를 분석하여 Station C 진단보고서에 필요한 핵심 정보를 추출해주세요. 마크다운은 제외해주세요.
     
@@ -89,5 +44,103 @@ async def analyze_meeting_audio(file_paths: list, upload_dir: str) -> str:
     3. 구체적인 수치, 목표, 계획 등을 정확히 추출하세요.
     4. 정보가 없는 경우에만 "정보 없음"으로 표시하세요.
     """
+
+async def transcribe_meeting(file_paths: list, upload_dir: str, progress=None) -> dict:
+    """미팅 오디오 STT 단계
+
+    {"text", "kpi_rows", "succeeded", "complete", "compaction"}를 반환합니다. kpi_rows는 녹취록에서 규칙 기반으로
+    추출한 KPI 수치이고, succeeded는 변환에 성공한 파일 수, complete는 모든 파일이 오류 없이 변환되었는지 여부입니다.
+    TRANSCRIPT_COMPACTION_ENABLED면 녹취록을 압축(services.transcript_compactor)한 뒤 text를 만들고,
+    compaction에 압축 전후 토큰 수를 담습니다.
+    """
+    # 모든 오디오 파일을 동시에 텍스트로 변환 (세그먼트는 공용 STT 워커 풀에서 처리)
+    report_progress(progress, "transcription", "started", files=len(file_paths))
+
+    async def transcribe_one(file_path: str) -> list:
+        full_path = os.path.join(upload_dir, file_path)
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+        print(f"🎵 Whisper STT 처리 중: {file_path}")
+
+        # ffmpeg 디코딩 후 무음 구간을 건너뛰고 세그먼트별로 병렬 변환 (같은 파일은 캐시 재사용)
+        # 변환된 구간은 시간 순서대로 바로 진행 이벤트로 전달
+        with span("transcription.file", file=file_path, bytes=os.path.getsize(full_path)) as current:
+            segments = []
+            async for segment in transcribe_stream(full_path):
+                segments.append(segment)
+                report_progress(progress, "transcription", "progress", file=file_path, **segment)
+            characters = sum(len(segment["text"]) for segment in segments)
+            current.set(segments=len(segments), audio_seconds=segments[-1]["end"] if segments else 0.0,
+                        characters=characters)
+        print(f"✅ Whisper STT 완료: {file_path} {characters}자 추출")
+        return segments
+
+    results = await map_limited(transcribe_one, file_paths, ANALYSIS_FILE_CONCURRENCY)
+    results, compaction = await _compact(file_paths, results)
+
+    # 입력 순서대로 정리, 실패한 파일은 파일별로 오류 표시
+    all_transcripts = []
+    kpi_rows = []
+    succeeded = 0
+    complete = True
+    for file_path, result in zip(file_paths, results):
+        if isinstance(result, FileNotFoundError):
+            all_transcripts.append(str(result))
+            complete = False
+        elif isinstance(result, Exception):
+            print(f"❌ Whisper STT 처리 실패 {file_path}: {result}")
+            report_progress(progress, "transcription", "progress", file=file_path, error=str(result))
+            all_transcripts.append(f"파일: {file_path}\n내용: STT 처리 중 오류 발생 - {str(result)}")
+            complete = False
+        elif result:
+            succeeded += 1
+            all_transcripts.append(f"파일: {file_path}\n내용: {result}")
+            kpi_rows.extend(extract_kpis(result, file_path))
+        else:
+            succeeded += 1
+            all_transcripts.append(f"파일: {file_path}\n내용: 음성을 인식할 수 없습니다.")
+    
+    # 모든 파일이 실패한 경우
+    if not succeeded:
+        report_progress(progress, "transcription", "failed", error="모든 오디오 파일 처리에 실패했습니다.")
+    else:
+        report_progress(progress, "transcription", "completed", compaction=compaction)
     
-    return await call_gpt(final_prompt)
\ No newline at end of file
+    all_transcripts_text = "\n\n".join(all_transcripts)
+    print(f"📝 STT 텍스트 길이: {len(all_transcripts_text)}자")
+    return {"text": all_transcripts_text, "kpi_rows": kpi_rows, "succeeded": succeeded, "complete": complete,
+            "compaction": compaction}
+
+async def _compact(file_paths: list, results: list) -> tuple:
+    """성공한 파일의 세그먼트 목록을 텍스트로 (압축 설정 시 반복/간투사/중복 제거 후 발화 단위로 병합)
+
+    (파일별 텍스트 또는 예외, 압축 통계)를 반환합니다. 압축하지 않으면 통계는 빈 dict입니다.
+    """
+    transcribed = [(file_path, result) for file_path, result in zip(file_paths, results)
+                   if not isinstance(result, Exception)]
+    if not TRANSCRIPT_COMPACTION_ENABLED:
+        texts = {file_path: " ".join(segment["text"] for segment in segments).strip()
+                 for file_path, segments in transcribed}
+        return [texts.get(file_path, result) for file_path, result in zip(file_paths, results)], {}
+
+    with span("transcription.compaction", files=len(transcribed)) as current:
+        compacted, stats = await asyncio.to_thread(compact_transcripts, transcribed)
+        current.set(**stats)
+    # 세그먼트는 있었지만 모두 제거된 파일 (다른 파일과 같은 녹음 등)은 인식 실패와 구분
+    texts = {file_path: text or ("(반복·중복 내용만 있어 생략)" if segments else "")
+             for (file_path, segments), text in zip(transcribed, compacted)}
+    if stats["raw_tokens"]:
+        print(f"🗜️ 녹취록 압축: {stats['raw_tokens']} → {stats['compact_tokens']} 토큰 "
+              f"(-{stats['tokens_saved'] * 100 // stats['raw_tokens']}%, 중복 {stats['dropped_duplicates']}개, "
+              f"잡음 {stats['dropped_noise']}개 세그먼트 제거)")
+    return [texts.get(file_path, result) for file_path, result in zip(file_paths, results)], stats
+
+async def summarize_meeting(transcription: dict, progress=None) -> str:
+    """미팅 요약 단계 (녹취록 -> GPT)"""
+    if not transcription["succeeded"]:
+        return "모든 오디오 파일 처리에 실패했습니다."
+    report_progress(progress, "meeting_summary", "started")
+    # 긴 텍스트는 청크별로 나눠 동시에 요약한 뒤 합침 (청크 요약은 캐시되어 바뀐 부분만 다시 요약)
+    summary = await summarize_text(transcription["text"], "meeting", build_meeting_prompt)
+    report_progress(progress, "meeting_summary", "completed", result=summary)
+    return summary
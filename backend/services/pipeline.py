@@ -0,0 +1,374 @@
+import asyncio
+import os
+
+from config import (
+    WHISPER_DEFAULT_MODEL,
+    STT_BACKEND,
+    STT_COMPUTE_TYPE,
+    STT_BEAM_SIZE,
+    STT_VAD_ENABLED,
+    TRANSCRIPT_COMPACTION_ENABLED,
+    COMPACTION_DUPLICATE_THRESHOLD,
+    COMPACTION_TURN_GAP_SECONDS,
+    KPI_TABLE_MAX_ROWS,
+    DOCUMENT_EXCERPT_MAX_CHARS,
+)
+from models.schemas import AnalysisRequest, AnalysisResponse, MentorInput
+from services.business_plan_analyzer import extract_business_plan, summarize_business_plan
+from services.meeting_analyzer import transcribe_meeting, summarize_meeting
+from services.kpi_extractor import format_kpi_table, merge_kpi_rows
+from services.report_generator import (
+    REPORT_SECTIONS,
+    REPORT_ERROR_PREFIX,
+    build_report_context,
+    build_section_instructions,
+    generate_reports,
+    generate_reports_stream,
+)
+from services.transcript_compactor import COMPACTOR_VERSION
+from services.analysis_store import STAGE_DEPENDENCIES, stage_input_key, value_digest
+from services.progress import report_progress
+from services.gpt_service import track_llm_usage
+from utils.cache import file_sha256
+from utils.file_processor import EXTRACTOR_VERSION
+from utils.telemetry import span, start_trace, annotate
+
+# 파일이 없을 때의 단계 결과
+_NO_EXTRACTION = {"text": "", "financial_excerpt": "", "kpi_rows": [], "complete": True}
+_NO_TRANSCRIPTION = {"text": "", "kpi_rows": [], "succeeded": 0, "complete": True, "compaction": {}}
+
+
+def _summary_succeeded(summary: str) -> bool:
+    # LLM 오류는 예외 대신 오류 메시지로 돌아오므로 저장하지 않고 다음 실행에서 다시 요약
+    return not summary.startswith(REPORT_ERROR_PREFIX)
+
+
+class _StageContext:
+    """분석 하나의 단계 결과 재사용/저장 (store가 없으면 항상 계산)"""
+
+    def __init__(self, store, analysis_id: str, progress):
+        self.store = store
+        self.analysis_id = analysis_id
+        self.progress = progress
+        self.results = {}
+        self.reused = []
+
+    def input_key(self, stage: str, *inputs) -> str:
+        # 단계 자신의 입력 + 앞 단계 결과 해시
+        base = stage.split(":", 1)[0]
+        digests = [value_digest(self.results[dependency]) for dependency in STAGE_DEPENDENCIES[base]]
+        return stage_input_key(stage, *inputs, *digests)
+
+    # 저장소(SQLite)는 이벤트 루프를 막지 않도록 스레드에서 호출
+    async def lookup(self, stage: str, input_key: str):
+        if self.store is None:
+            return None
+        return await asyncio.to_thread(self.store.get_artifact, self.analysis_id, stage, input_key)
+
+    async def save(self, stage: str, input_key: str, value) -> None:
+        if self.store is not None:
+            await asyncio.to_thread(self.store.put_artifact, self.analysis_id, stage, input_key, value)
+
+    async def run(self, stage: str, inputs: tuple, compute, persist=None, result=None):
+        """입력 키가 같은 저장 결과가 있으면 재사용, 없으면 compute()로 계산해서 저장
+
+        persist(value)가 False이면 (일부 파일 실패 등) 저장하지 않아 다음 실행에서 다시 계산합니다.
+        result(value)는 진행 이벤트에 실을 중간 결과입니다.
+        """
+        input_key = self.input_key(stage, *inputs)
+        value = await self.lookup(stage, input_key)
+        if value is not None:
+            self.reused.append(stage)
+            data = {"result": result(value)} if result else {}
+            report_progress(self.progress, stage, "completed", reused=True, **data)
+        else:
+            value = await compute()
+            if persist is None or persist(value):
+                await self.save(stage, input_key, value)
+        self.results[stage] = value
+        return value
+
+
+def _file_fingerprints(store, upload_dir: str, file_paths: list) -> list:
+    """파일별 (이름, 내용 해시) - 업로드 시 기록된 해시가 있으면 파일을 다시 읽지 않음"""
+    fingerprints = []
+    for file_path in file_paths:
+        upload = store.get_upload(file_path) if store is not None else None
+        full_path = os.path.join(upload_dir, file_path)
+        if upload is not None and os.path.exists(full_path):
+            fingerprints.append(f"{file_path}:{upload['sha256']}")
+        elif os.path.exists(full_path):
+            fingerprints.append(f"{file_path}:{file_sha256(full_path)}")
+        else:
+            fingerprints.append(f"{file_path}:missing")
+    return fingerprints
+
+
+async def _prepare(request: AnalysisRequest, upload_dir: str, stages: _StageContext) -> dict:
+    """보고서 생성 전 단계 실행 (추출/STT → 요약 → KPI), 단계 결과 딕셔너리 반환"""
+    progress = stages.progress
+    plan_files = await asyncio.to_thread(_file_fingerprints, stages.store, upload_dir, request.business_plan_files)
+    audio_files = await asyncio.to_thread(_file_fingerprints, stages.store, upload_dir, request.meeting_audio_files)
+
+    # 1. 사업계획서 분석과 미팅 오디오 분석을 비동기로 동시 처리
+    async def business_plan() -> None:
+        if not request.business_plan_files:
+            stages.results["extraction"] = _NO_EXTRACTION
+            stages.results["business_plan_summary"] = ""
+            return
+        with span("business_plan"):
+            await stages.run(
+                "extraction", (EXTRACTOR_VERSION, DOCUMENT_EXCERPT_MAX_CHARS, *plan_files),
+                lambda: extract_business_plan(request.business_plan_files, upload_dir, progress),
+                persist=lambda value: value["complete"],
+            )
+            await stages.run(
+                "business_plan_summary", (),
+                lambda: summarize_business_plan(stages.results["extraction"], progress),
+                persist=_summary_succeeded,
+                result=lambda value: value,
+            )
+
+    async def meeting() -> None:
+        if not request.meeting_audio_files:
+            stages.results["transcription"] = _NO_TRANSCRIPTION
+            stages.results["meeting_summary"] = ""
+            return
+        with span("meeting"):
+            await stages.run(
+                "transcription",
+                (STT_BACKEND, STT_COMPUTE_TYPE, STT_BEAM_SIZE, WHISPER_DEFAULT_MODEL, STT_VAD_ENABLED,
+                 TRANSCRIPT_COMPACTION_ENABLED and (COMPACTOR_VERSION, COMPACTION_DUPLICATE_THRESHOLD,
+                                                    COMPACTION_TURN_GAP_SECONDS),
+                 *audio_files),
+                lambda: transcribe_meeting(request.meeting_audio_files, upload_dir, progress),
+                persist=lambda value: value["complete"],
+            )
+            await stages.run(
+                "meeting_summary", (),
+                lambda: summarize_meeting(stages.results["transcription"], progress),
+                persist=lambda value: stages.results["transcription"]["succeeded"] > 0 and _summary_succeeded(value),
+                result=lambda value: value,
+            )
+
+    await asyncio.gather(business_plan(), meeting())
+
+    # 2. KPI 수치표 (원문/녹취록에서 규칙 기반으로 추출한 수치, LLM 호출 없음)
+    async def build_kpis() -> dict:
+        report_progress(progress, "kpi", "started")
+        with span("kpi"):
+            rows = merge_kpi_rows(stages.results["extraction"]["kpi_rows"] + stages.results["transcription"]["kpi_rows"])
+            text = format_kpi_table(rows)
+            annotate(rows=len(rows))
+        report_progress(progress, "kpi", "completed", result=text)
+        return {"rows": rows, "text": text}
+
+    await stages.run("kpi", (KPI_TABLE_MAX_ROWS,), build_kpis, result=lambda value: value["text"])
+    return stages.results
+
+
+def _unpack(results: dict) -> tuple:
+    return (
+        results["business_plan_summary"],
+        results["meeting_summary"],
+        results["kpi"]["text"],
+        results["extraction"]["financial_excerpt"],
+        results["kpi"]["rows"],
+    )
+
+
+def _report_inputs(results: dict, mentor_input: MentorInput) -> tuple:
+    """섹션별 보고서 입력 (공통 자료 + 섹션 지시문)"""
+    business_plan_summary, meeting_summary, extracted_kpis, financial_excerpt, _ = _unpack(results)
+    context = build_report_context(business_plan_summary, meeting_summary, extracted_kpis)
+    instructions = build_section_instructions(mentor_input, financial_excerpt)
+    return context, instructions
+
+
+async def _reusable_reports(stages: _StageContext, mentor_input: MentorInput) -> tuple:
+    """저장된 섹션 중 입력이 그대로인 것 -> (재사용 섹션, 섹션별 입력 키)"""
+    context, instructions = _report_inputs(stages.results, mentor_input)
+    keys = {
+        section: stages.input_key(f"report:{section}", context, instruction)
+        for section, instruction in instructions.items()
+    }
+    reused = {}
+    for section, key in keys.items():
+        value = await stages.lookup(f"report:{section}", key)
+        if value is not None:
+            reused[section] = value
+            stages.reused.append(f"report:{section}")
+            report_progress(stages.progress, f"report:{section}", "completed", reused=True, result=value)
+    return reused, keys
+
+
+async def _save_reports(stages: _StageContext, keys: dict, reports: dict) -> None:
+    for section, text in reports.items():
+        if text and not text.startswith(REPORT_ERROR_PREFIX):
+            await stages.save(f"report:{section}", keys[section], text)
+
+
+def _trace_attributes(request: AnalysisRequest) -> dict:
+    return {
+        "business_plan_files": len(request.business_plan_files),
+        "meeting_audio_files": len(request.meeting_audio_files),
+    }
+
+def _log_usage(usage: dict) -> None:
+    print(f"🧮 LLM 사용량 - 호출 {usage['calls']}회, 입력 토큰 {usage['prompt_tokens']}"
+          f"(캐시 {usage['cached_tokens']}), 출력 토큰 {usage['completion_tokens']}")
+
+def _log_reused(stages: _StageContext) -> None:
+    if stages.reused:
+        print(f"♻️ 저장된 단계 결과 재사용 ({stages.analysis_id}): {', '.join(stages.reused)}")
+
+async def _begin(request: AnalysisRequest, store, analysis_id: str, progress) -> _StageContext:
+    if store is not None:
+        if analysis_id is None:
+            analysis_id = await asyncio.to_thread(store.create_analysis, request)
+        else:
+            await asyncio.to_thread(store.update_request, analysis_id, request)
+    return _StageContext(store, analysis_id, progress)
+
+async def _response(stages: _StageContext, reports: dict, usage: dict) -> AnalysisResponse:
+    business_plan_summary, meeting_summary, extracted_kpis, _, kpi_table = _unpack(stages.results)
+    response = AnalysisResponse(
+        analysis_id=stages.analysis_id,
+        business_plan_summary=business_plan_summary,
+        meeting_summary=meeting_summary,
+        extracted_kpis=extracted_kpis,
+        kpi_table=kpi_table,
+        reports={section: reports[section] for section in REPORT_SECTIONS if section in reports},
+        llm_usage=usage,
+        transcript_compaction=stages.results["transcription"].get("compaction", {}),
+    )
+    if stages.store is not None:
+        await asyncio.to_thread(stages.store.save_result, stages.analysis_id, response.model_dump())
+    return response
+
+async def run_analysis(request: AnalysisRequest, upload_dir: str, progress=None,
+                       store=None, analysis_id: str = None) -> AnalysisResponse:
+    """전체 분석 파이프라인 실행 (추출/STT → 요약 → KPI → 보고서)
+
+    progress 콜백으로 단계별 진행 상황과 중간 결과를 전달합니다 (services.progress 참고).
+    이 요청에서 사용한 LLM 토큰 수는 응답의 llm_usage에 담기고, 단계별 소요 시간은 utils.telemetry로 집계됩니다.
+    store(services.analysis_store.AnalysisStore)를 주면 단계별 결과를 저장하고, 기존 analysis_id로 다시 실행하면
+    입력이 바뀐 단계와 그 뒤 단계만 다시 계산합니다 (재사용한 단계는 reused=True 진행 이벤트로 알림).
+    """
+    stages = await _begin(request, store, analysis_id, progress)
+    with track_llm_usage() as usage, start_trace("analysis", **_trace_attributes(request)):
+        await _prepare(request, upload_dir, stages)
+        business_plan_summary, meeting_summary, extracted_kpis, financial_excerpt, _ = _unpack(stages.results)
+        reports, keys = await _reusable_reports(stages, request.mentor_input)
+
+        # 3. 보고서 생성 (멘토 입력 가중치 적용, 입력이 바뀐 섹션만)
+        missing = [section for section in REPORT_SECTIONS if section not in reports]
+        if missing:
+            with span("reports"):
+                generated = await generate_reports(
+                    business_plan_summary,
+                    meeting_summary,
+                    extracted_kpis,
+                    request.mentor_input,
+                    progress,
+                    financial_excerpt=financial_excerpt,
+                    sections=missing
+                )
+            await _save_reports(stages, keys, generated)
+            reports.update(generated)
+    _log_usage(usage)
+    _log_reused(stages)
+    return await _response(stages, reports, usage)
+
+async def regenerate_report_section(store, analysis_id: str, section: str, upload_dir: str,
+                                    mentor_input: MentorInput = None) -> AnalysisResponse:
+    """저장된 분석의 보고서 섹션 하나만 LLM 한 번 호출로 다시 생성
+
+    mentor_input을 주면 저장된 요청의 멘토 입력을 바꾼 뒤 생성합니다. 앞 단계는 저장된 결과를 재사용합니다
+    (업로드 파일이 바뀐 경우 등 저장 결과가 없는 단계만 계산).
+    """
+    request = await asyncio.to_thread(store.get_request, analysis_id)
+    if mentor_input is not None:
+        request = request.model_copy(update={"mentor_input": mentor_input})
+    stages = await _begin(request, store, analysis_id, None)
+    previous = (await asyncio.to_thread(store.get_analysis, analysis_id) or {}).get("result") or {}
+    with track_llm_usage() as usage, start_trace("report_section", section=section):
+        await _prepare(request, upload_dir, stages)
+        business_plan_summary, meeting_summary, extracted_kpis, financial_excerpt, _ = _unpack(stages.results)
+        context, instructions = _report_inputs(stages.results, request.mentor_input)
+        key = stages.input_key(f"report:{section}", context, instructions[section])
+        with span("reports"):
+            generated = await generate_reports(
+                business_plan_summary,
+                meeting_summary,
+                extracted_kpis,
+                request.mentor_input,
+                financial_excerpt=financial_excerpt,
+                sections=[section]
+            )
+        await _save_reports(stages, {section: key}, generated)
+    _log_usage(usage)
+    reports = {**previous.get("reports", {}), **generated}
+    return await _response(stages, reports, usage)
+
+async def stream_analysis(request: AnalysisRequest, upload_dir: str, store=None, analysis_id: str = None):
+    """전체 분석 파이프라인을 실행하면서 이벤트를 순서대로 전달
+
+    - {"type": "progress", "stage", "status", "data"}: 추출/STT/요약/KPI 단계 진행 상황
+    - {"type": "token", "section", "delta"}: 보고서 섹션 토큰
+    - {"type": "section", "section", "text"}: 완성된 보고서 섹션 (저장된 결과를 재사용한 섹션은 토큰 없이 바로 전달)
+    - {"type": "result", "data"}: 최종 AnalysisResponse
+    """
+    queue = asyncio.Queue()
+
+    def progress(stage: str, status: str, data: dict) -> None:
+        queue.put_nowait({"type": "progress", "stage": stage, "status": status, "data": data})
+
+    async def produce(usage: dict) -> None:
+        stages = await _begin(request, store, analysis_id, progress)
+        with start_trace("analysis_stream", **_trace_attributes(request)):
+            await _prepare(request, upload_dir, stages)
+            business_plan_summary, meeting_summary, extracted_kpis, financial_excerpt, _ = _unpack(stages.results)
+            reports, keys = await _reusable_reports(stages, request.mentor_input)
+            for section, text in reports.items():
+                queue.put_nowait({"type": "section", "section": section, "text": text})
+
+            missing = [section for section in REPORT_SECTIONS if section not in reports]
+            if missing:
+                with span("reports"):
+                    async for event in generate_reports_stream(
+                        business_plan_summary,
+                        meeting_summary,
+                        extracted_kpis,
+                        request.mentor_input,
+                        financial_excerpt=financial_excerpt,
+                        sections=missing
+                    ):
+                        if "delta" in event:
+                            queue.put_nowait({"type": "token", **event})
+                        else:
+                            reports[event["section"]] = event["text"]
+                            if not event.get("failed"):
+                                await _save_reports(stages, keys, {event["section"]: event["text"]})
+                            queue.put_nowait({"type": "section", **event})
+        _log_usage(usage)
+        _log_reused(stages)
+
+        response = await _response(stages, reports, usage)
+        queue.put_nowait({"type": "result", "data": response.model_dump()})
+
+    # 파이프라인은 백그라운드 작업 하나에서 실행하고 이벤트를 도착하는 대로 전달
+    # (토큰 사용량 집계는 작업을 만들 때의 컨텍스트를 따라감)
+    with track_llm_usage() as usage:
+        task = asyncio.create_task(produce(usage))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        if not task.done():
+            task.cancel()
+    task.result()
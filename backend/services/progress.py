@@ -0,0 +1,13 @@
+def report_progress(progress, stage: str, status: str, **data) -> None:
+    """파이프라인 단계 진행 상황 알림
+
+    progress는 (stage, status, data)를 받는 콜백이며 None이면 아무것도 하지 않습니다.
+    status는 "started", "progress"(중간 결과, 예: STT 구간), "completed", "failed" 중 하나입니다.
+    콜백 오류가 분석 자체를 실패시키지 않도록 예외는 로그만 남깁니다.
+    """
+    if progress is None:
+        return
+    try:
+        progress(stage, status, data)
+    except Exception as e:
+        print(f"⚠️ 진행 상황 알림 실패 ({stage}/{status}): {e}")
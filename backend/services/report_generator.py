@@ -1,25 +1,69 @@
-from services.gpt_service import call_gpt
+import asyncio
+import json
+from config import REPORT_MODE
+from services.gpt_service import call_gpt, stream_gpt, GPT_ERROR_PREFIX
+from services.progress import report_progress
+from utils.telemetry import span
 from models.schemas import MentorInput
 
-async def generate_reports(business_plan: str, meeting: str, kpis: str, mentor_input: MentorInput) -> dict:
-    """보고서 생성 (멘토 입력 가중치 적용)"""
+# 섹션 순서 (reports 딕셔너리 키)
+REPORT_SECTIONS = ("growth", "kpi", "strategy", "budget")
+
+# 섹션 생성 실패 시 본문 앞부분 (실패한 섹션은 저장소에 저장하지 않음)
+REPORT_ERROR_PREFIX = GPT_ERROR_PREFIX
+
+# 구조화 모드 응답 스키마 (네 섹션을 한 번의 호출로 생성)
+REPORTS_JSON_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "station_c_reports",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {section: {"type": "string"} for section in REPORT_SECTIONS},
+            "required": list(REPORT_SECTIONS),
+            "additionalProperties": False,
+        },
+    },
+}
+
+def build_report_context(business_plan: str, meeting: str, kpis: str) -> str:
+    """네 섹션이 공통으로 사용하는 분석 자료
+
+    모든 섹션 호출에서 같은 내용으로 앞쪽에 보내므로 LLM 제공자의 프롬프트 캐시가 적용됩니다.
+    """
+    return f"""
+    [주요 분석 자료 - 미팅 내용을 우선적으로 고려하세요]
+    미팅 내용: {meeting}
+    
+    [보조 분석 자료 - 사업계획서는 참고용으로 활용하세요]
+    사업계획서: {business_plan}
+    KPI 수치표 (원문에서 직접 추출, 항목 | 값 | 원문 표기 | 출처 - 수치는 다시 계산하지 말고 이 표를 그대로 사용하세요):
+    {kpis}
+    """
+
+def build_financial_reference(financial_excerpt: str) -> str:
+    """KPI/사업비 섹션에만 붙이는 사업계획서 재무/KPI 원문 발췌"""
+    if not financial_excerpt:
+        return ""
+    return f"""
+    사업계획서 재무/KPI 관련 섹션 및 표 (원문 발췌 - 금액과 수치는 이 발췌를 그대로 사용하세요):
+    {financial_excerpt}
+    """
+
+def build_section_instructions(mentor_input: MentorInput, financial_excerpt: str = "") -> dict:
+    """섹션별 작성 지시문 생성 (멘토 입력 가중치 적용, 분석 자료는 build_report_context로 따로 전달)
+
+    사업계획서의 재무/KPI 발췌는 공통 자료가 아니라 KPI/사업비 섹션 지시문에만 포함합니다.
+    """
+    financial_reference = build_financial_reference(financial_excerpt)
     
     # 멘토 입력이 있는 경우 가중치 적용
     mentor_weight = 0.3 if any([mentor_input.growth, mentor_input.kpi, mentor_input.strategy]) else 0.0
     
-    # GPT를 사용한 보고서 생성
-    reports = {}
-    
     # 성장단계 보고서
     growth_prompt = f"""
-    다음 정보를 바탕으로 성장단계 진단 보고서를 작성해주세요. 마크다운은 제외해주세요.
-    
-    [주요 분석 자료 - 미팅 내용을 우선적으로 고려하세요]
-    미팅 내용: {meeting}
-    
-    [보조 분석 자료 - 사업계획서는 참고용으로 활용하세요]
-    사업계획서: {business_plan}
-    KPI: {kpis}
+    위 정보를 바탕으로 성장단계 진단 보고서를 작성해주세요. 마크다운은 제외해주세요.
     
     멘토 의견 (가중치 {mentor_weight}): {mentor_input.growth}
     
@@ -40,21 +84,12 @@ async def generate_reports(business_plan: str, meeting: str, kpis: str, mentor_i
     멘토 의견이 있는 경우 해당 내용을 반영하여 작성해주세요.
     """
     
-    reports["growth"] = await call_gpt(growth_prompt)
-    
     # KPI 보고서
     kpi_prompt = f"""
-    다음 정보를 바탕으로 KPI 진단 보고서를 작성해주세요. 마크다운 문법을 사용하지 말고 일반 텍스트로 작성해주세요.
-    
-    [주요 분석 자료 - 미팅 내용을 우선적으로 고려하세요]
-    미팅 내용: {meeting}
-    
-    [보조 분석 자료 - 사업계획서는 참고용으로 활용하세요]
-    사업계획서: {business_plan}
-    KPI: {kpis}
+    위 정보를 바탕으로 KPI 진단 보고서를 작성해주세요. 마크다운 문법을 사용하지 말고 일반 텍스트로 작성해주세요.
     
     멘토 의견 (가중치 {mentor_weight}): {mentor_input.kpi}
-    
+    {financial_reference}
     분석 지침:
     1. 미팅에서 논의된 실제 KPI 현황과 성과를 가장 중요하게 고려하세요
     2. 미팅에서 언급된 구체적인 수치, 달성률, 문제점을 우선적으로 반영하세요
@@ -73,18 +108,9 @@ async def generate_reports(business_plan: str, meeting: str, kpis: str, mentor_i
     멘토 의견이 있는 경우 해당 내용을 반영하여 작성해주세요.
     """
     
-    reports["kpi"] = await call_gpt(kpi_prompt)
-    
     # 전략 보고서
     strategy_prompt = f"""
-    다음 정보를 바탕으로 전략 진단 보고서를 작성해주세요. 마크다운은 제외해주세요.
-    
-    [주요 분석 자료 - 미팅 내용을 우선적으로 고려하세요]
-    미팅 내용: {meeting}
-    
-    [보조 분석 자료 - 사업계획서는 참고용으로 활용하세요]
-    사업계획서: {business_plan}
-    KPI: {kpis}
+    위 정보를 바탕으로 전략 진단 보고서를 작성해주세요. 마크다운은 제외해주세요.
     
     멘토 의견 (가중치 {mentor_weight}): {mentor_input.strategy}
     
@@ -109,22 +135,13 @@ async def generate_reports(business_plan: str, meeting: str, kpis: str, mentor_i
     멘토 의견이 있는 경우 해당 내용을 반영하여 작성해주세요. 마크다운은 제외해주세요.
     """
     
-    reports["strategy"] = await call_gpt(strategy_prompt)
-    
     
     # 사업비 보고서
     budget_prompt = f"""
-    다음 정보를 바탕으로 사업비 진단 보고서를 작성해주세요. 마크다운은 제외해주세요.
-    
-    [주요 분석 자료 - 미팅 내용을 우선적으로 고려하세요]
-    미팅 내용: {meeting}
-    
-    [보조 분석 자료 - 사업계획서는 참고용으로 활용하세요]
-    사업계획서: {business_plan}
-    KPI: {kpis}
+    위 정보를 바탕으로 사업비 진단 보고서를 작성해주세요. 마크다운은 제외해주세요.
     
     멘토 의견 (가중치 {mentor_weight}): {mentor_input.strategy}
-    
+    {financial_reference}
     분석 지침:
     1. 미팅에서 논의된 실제 사업비 현황과 재무 상황을 가장 중요하게 고려하세요
     2. 미팅에서 언급된 구체적인 비용, 예산, 자금 조달 현황을 우선적으로 반영하세요
@@ -145,6 +162,141 @@ async def generate_reports(business_plan: str, meeting: str, kpis: str, mentor_i
     멘토 의견이 있는 경우 해당 내용을 반영하여 작성해주세요.
     """
     
-    reports["budget"] = await call_gpt(budget_prompt)
-    
-    return reports
+    return {
+        "growth": growth_prompt,
+        "kpi": kpi_prompt,
+        "strategy": strategy_prompt,
+        "budget": budget_prompt,
+    }
+
+def build_structured_prompt(instructions: dict) -> str:
+    """구조화 모드 지시문 - 네 섹션을 하나의 JSON 객체로 생성"""
+    sections = "\n".join(
+        f"    [{section}]\n{instruction}" for section, instruction in instructions.items()
+    )
+    return f"""
+    위 정보를 바탕으로 아래 {len(instructions)}개 섹션의 진단 보고서를 모두 작성해주세요.
+    결과는 JSON 객체로 반환하고, 각 키({", ".join(instructions)})의 값은 해당 섹션의 지시에 따라 작성한 보고서 본문(일반 텍스트)입니다.
+    
+{sections}
+    """
+
+async def _generate_sections(context: str, instructions: dict, progress) -> dict:
+    # 네 섹션을 공용 LLM 스케줄러를 통해 동시에 생성 (한 섹션이 실패해도 나머지는 유지)
+    async def generate_section(section: str, instruction: str) -> str:
+        stage = f"report:{section}"
+        report_progress(progress, stage, "started")
+        try:
+            with span(f"report.{section}"):
+                result = await call_gpt(instruction, context=context)
+        except Exception as e:
+            print(f"❌ {section} 보고서 생성 실패: {e}")
+            report_progress(progress, stage, "failed", error=str(e))
+            return f"{REPORT_ERROR_PREFIX}: {str(e)}"
+        if result.startswith(REPORT_ERROR_PREFIX):
+            # call_gpt는 오류를 예외 대신 오류 메시지로 돌려줌
+            print(f"❌ {section} 보고서 생성 실패: {result}")
+            report_progress(progress, stage, "failed", error=result)
+            return result
+        report_progress(progress, stage, "completed", result=result)
+        return result
+    
+    results = await asyncio.gather(
+        *(generate_section(section, instruction) for section, instruction in instructions.items())
+    )
+    return dict(zip(instructions, results))
+
+async def _generate_structured(context: str, instructions: dict, progress) -> dict:
+    # 네 섹션을 JSON 스키마 응답 한 번으로 생성 (공통 자료를 한 번만 전송)
+    for section in instructions:
+        report_progress(progress, f"report:{section}", "started")
+    with span("report.structured"):
+        content = await call_gpt(
+            build_structured_prompt(instructions), context=context, response_format=REPORTS_JSON_SCHEMA
+        )
+    if content.startswith(REPORT_ERROR_PREFIX):
+        # 재시도까지 실패한 LLM 오류 - 섹션별 호출로 바꿔도 같은 API를 다시 부르므로 모두 실패 처리
+        print(f"❌ 구조화 보고서 생성 실패: {content}")
+        for section in instructions:
+            report_progress(progress, f"report:{section}", "failed", error=content)
+        return {section: content for section in instructions}
+    try:
+        reports = json.loads(content)
+        if not isinstance(reports, dict):
+            raise ValueError("JSON 객체가 아닙니다")
+    except ValueError as e:
+        print(f"⚠️ 구조화 보고서 응답 해석 실패, 섹션별 생성으로 전환: {e}")
+        return await _generate_sections(context, instructions, progress)
+    
+    results = {}
+    for section in instructions:
+        result = reports.get(section) or "정보 없음"
+        report_progress(progress, f"report:{section}", "completed", result=result)
+        results[section] = result
+    return results
+
+async def generate_reports(business_plan: str, meeting: str, kpis: str, mentor_input: MentorInput, progress=None,
+                           financial_excerpt: str = "", sections: list = None) -> dict:
+    """보고서 생성 (멘토 입력 가중치 적용)
+
+    REPORT_MODE가 "shared_prefix"이면 공통 분석 자료를 같은 앞부분으로 두고 섹션별로 동시에 생성하고,
+    "structured"이면 네 섹션을 JSON 스키마 응답 한 번으로 생성합니다 (해석에 실패하면 섹션별 생성).
+    sections를 주면 해당 섹션만 생성합니다.
+    """
+    context = build_report_context(business_plan, meeting, kpis)
+    instructions = build_section_instructions(mentor_input, financial_excerpt)
+    if sections is not None:
+        instructions = {section: instructions[section] for section in sections}
+    if not instructions:
+        return {}
+    if len(instructions) == 1:
+        # 섹션 하나는 구조화 응답 없이 한 번의 호출로 생성
+        return await _generate_sections(context, instructions, progress)
+    if REPORT_MODE == "structured":
+        return await _generate_structured(context, instructions, progress)
+    return await _generate_sections(context, instructions, progress)
+
+async def generate_reports_stream(business_plan: str, meeting: str, kpis: str, mentor_input: MentorInput,
+                                  financial_excerpt: str = "", sections: list = None):
+    """보고서 스트리밍 생성 - 네 섹션을 동시에 생성하며 토큰이 도착하는 대로 전달
+
+    {"section", "delta"} 이벤트를 토큰 단위로, 섹션이 끝나면 {"section", "text"} 이벤트를 전달합니다.
+    생성 도중 실패한 섹션의 마지막 이벤트에는 "failed": True가 붙고, text는 오류 메시지입니다.
+    섹션별로 토큰을 보내야 하므로 REPORT_MODE와 관계없이 공통 자료를 앞부분으로 공유하는 방식을 사용합니다.
+    sections를 주면 해당 섹션만 생성합니다.
+    """
+    context = build_report_context(business_plan, meeting, kpis)
+    prompts = build_section_instructions(mentor_input, financial_excerpt)
+    if sections is not None:
+        prompts = {section: prompts[section] for section in sections}
+    queue = asyncio.Queue()
+    
+    async def stream_section(section: str, prompt: str) -> None:
+        parts = []
+        completed = False
+        try:
+            async for delta in stream_gpt(prompt, context=context):
+                parts.append(delta)
+                await queue.put({"section": section, "delta": delta})
+            completed = True
+        except Exception as e:
+            # 중간까지 받은 조각은 버리고 오류 메시지로 (실패한 섹션은 저장하지 않음)
+            print(f"❌ {section} 보고서 생성 실패: {e}")
+            parts = [f"{REPORT_ERROR_PREFIX}: {str(e)}"]
+        finally:
+            event = {"section": section, "text": "".join(parts)}
+            if not completed:
+                event["failed"] = True
+            await queue.put(event)
+    
+    tasks = [asyncio.create_task(stream_section(section, prompt)) for section, prompt in prompts.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await queue.get()
+            if "text" in event:
+                remaining -= 1
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,35 @@
+"""faster-whisper(CTranslate2) STT 백엔드
+
+Whisper 모델을 CTranslate2 형식으로 변환해 CPU에서 int8 양자화로 추론합니다 (STT_COMPUTE_TYPE).
+같은 크기의 openai-whisper보다 훨씬 빠르고 메모리를 적게 써서, CPU에서도 small/medium 모델을 쓸 수 있습니다.
+모델 크기 대신 변환된 모델 디렉토리 경로를 지정할 수도 있습니다.
+"""
+import faster_whisper
+from faster_whisper import WhisperModel
+
+from config import STT_COMPUTE_TYPE, STT_BEAM_SIZE
+
+# 모델을 만들 때 지정하는 연산 스레드 수 (configure_threads로 설정)
+_cpu_threads = 0
+
+
+def version() -> str:
+    return f"{faster_whisper.__version__}:{STT_COMPUTE_TYPE}:beam{STT_BEAM_SIZE}"
+
+
+def configure_threads(count: int) -> None:
+    """워커 하나가 쓰는 연산 스레드 수 (이후 로드하는 모델에 적용)"""
+    global _cpu_threads
+    _cpu_threads = count
+
+
+def load_model(model_size: str):
+    return WhisperModel(model_size, device="cpu", compute_type=STT_COMPUTE_TYPE, cpu_threads=_cpu_threads)
+
+
+def transcribe(model, audio) -> dict:
+    """audio(파일 경로 또는 16kHz float32 배열) -> {"text", "segments": [{"start", "end", "text"}, ...]}"""
+    # 무음 구간 분할은 stt_service(VAD)가 담당하므로 내장 VAD 필터는 끔
+    segments, _ = model.transcribe(audio, language="ko", beam_size=max(1, STT_BEAM_SIZE), vad_filter=False)
+    segments = [{"start": segment.start, "end": segment.end, "text": segment.text} for segment in segments]
+    return {"text": "".join(segment["text"] for segment in segments), "segments": segments}
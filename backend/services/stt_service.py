@@ -0,0 +1,241 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    WHISPER_MODEL_SIZES,
+    WHISPER_DEFAULT_MODEL,
+    WHISPER_WARMUP,
+    STT_MAX_WORKERS,
+    STT_BACKEND,
+    STT_CPU_THREADS,
+    STT_MAX_QUEUE,
+    STT_VAD_ENABLED,
+    STT_SEGMENT_MAX_SECONDS,
+    VAD_FRAME_MS,
+    VAD_THRESHOLD_DB,
+    VAD_MIN_SILENCE_MS,
+    VAD_MIN_SPEECH_MS,
+    VAD_SPEECH_PAD_MS,
+)
+from utils.cache import result_cache, file_sha256, make_key
+from utils.plugins import load as load_plugin, register as register_plugin
+from utils.telemetry import span, annotate
+
+# STT 백엔드 (torch/whisper, ctranslate2는 처음 사용할 때 불러옴)
+# 각 백엔드 모듈은 version(), configure_threads(count), load_model(model_size), transcribe(model, audio)를 제공
+register_plugin("stt", "whisper", "services.stt_whisper")
+register_plugin("stt", "faster_whisper", "services.stt_faster_whisper")
+
+# 프로세스 전역 모델 레지스트리 ((백엔드, 모델 크기) -> 로드된 모델)
+_models = {}
+_models_lock = threading.Lock()
+# 연산 스레드 수를 설정한 백엔드
+_configured_backends = set()
+
+# STT 전용 워커 풀과 동시 실행 제한
+_executor = None
+_semaphore = None
+_pending = 0
+
+
+class STTQueueFullError(Exception):
+    """STT 대기열이 가득 찬 경우"""
+
+
+def _cpu_threads() -> int:
+    # 워커끼리 CPU 코어를 나눠 쓰도록 워커당 연산 스레드 수를 맞춤 (과도한 스레드 경합 방지)
+    return STT_CPU_THREADS or max(1, (os.cpu_count() or 1) // STT_MAX_WORKERS)
+
+
+def _backend(name: str = STT_BACKEND):
+    backend = load_plugin("stt", name)
+    if name not in _configured_backends:
+        backend.configure_threads(_cpu_threads())
+        _configured_backends.add(name)
+    return backend
+
+
+def load_whisper_model(model_size: str = WHISPER_DEFAULT_MODEL, backend: str = STT_BACKEND):
+    """STT 모델 로드 (백엔드/모델 크기별로 프로세스에서 한번만 로드)"""
+    model = _models.get((backend, model_size))
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get((backend, model_size))
+        if model is None:
+            model = _backend(backend).load_model(model_size)
+            _models[(backend, model_size)] = model
+            print(f"✅ STT 모델 로드 완료: {backend}/{model_size}")
+    return model
+
+
+def _warmup_model(model, backend: str = STT_BACKEND) -> None:
+    """1초 무음으로 한번 추론해서 첫 요청의 지연을 줄임"""
+    import numpy as np
+
+    _backend(backend).transcribe(model, np.zeros(16000, dtype=np.float32))
+
+
+def preload_whisper_models() -> None:
+    """설정된 STT 백엔드의 모든 모델을 미리 로드 (서버 시작 시 호출)"""
+    for model_size in WHISPER_MODEL_SIZES:
+        try:
+            model = load_whisper_model(model_size)
+            if WHISPER_WARMUP:
+                _warmup_model(model)
+                print(f"🔥 Whisper 모델 워밍업 완료: {model_size}")
+        except Exception as e:
+            print(f"❌ Whisper 모델 사전 로드 실패 ({model_size}): {e}")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _semaphore
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=STT_MAX_WORKERS, thread_name_prefix="stt")
+        _semaphore = asyncio.Semaphore(STT_MAX_WORKERS)
+    return _executor
+
+
+def shutdown_stt_pool() -> None:
+    """STT 워커 풀 종료 (서버 종료 시 호출)"""
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _semaphore = None
+
+
+def _transcribe_sync(audio, model_size: str, backend: str) -> dict:
+    return _backend(backend).transcribe(load_whisper_model(model_size, backend), audio)
+
+
+async def _run_on_pool(audio, model_size: str, backend: str = STT_BACKEND) -> dict:
+    async with _semaphore:
+        loop = asyncio.get_running_loop()
+        attributes = {"model": model_size, "backend": backend}
+        if not isinstance(audio, str):
+            from utils.audio import SAMPLE_RATE
+            attributes["audio_seconds"] = len(audio) / SAMPLE_RATE
+        with span("stt.whisper", **attributes):
+            return await loop.run_in_executor(_executor, _transcribe_sync, audio, model_size, backend)
+
+
+def _check_queue() -> None:
+    if _pending >= STT_MAX_WORKERS + STT_MAX_QUEUE:
+        raise STTQueueFullError("STT 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+
+
+async def transcribe_audio(audio, model_size: str = WHISPER_DEFAULT_MODEL, backend: str = STT_BACKEND) -> dict:
+    """STT 워커 풀에서 변환 실행 (이벤트 루프를 막지 않음)
+
+    audio는 파일 경로 또는 16kHz float32 numpy 배열입니다.
+    동시에 STT_MAX_WORKERS개까지 실행되고, 나머지는 최대 STT_MAX_QUEUE개까지 대기합니다.
+    """
+    global _pending
+    _get_executor()
+    _check_queue()
+
+    _pending += 1
+    try:
+        return await _run_on_pool(audio, model_size, backend)
+    finally:
+        _pending -= 1
+
+
+def _segments_of(result: dict, offset: float = 0.0) -> list:
+    return [
+        {"start": round(seg["start"] + offset, 2), "end": round(seg["end"] + offset, 2), "text": seg["text"].strip()}
+        for seg in result.get("segments", [])
+        if seg["text"].strip()
+    ]
+
+
+async def _transcribe_segmented(file_path: str, model_size: str, backend: str):
+    """ffmpeg 디코딩 → VAD 분할 → 세그먼트 병렬 STT, 변환된 구간을 시간 순서대로 전달
+
+    무음 구간은 변환하지 않고, 세그먼트는 STT 워커 수만큼 동시에 변환합니다.
+    앞 세그먼트가 끝나는 대로 바로 전달하므로 긴 녹음도 앞부분부터 결과를 받을 수 있습니다.
+    """
+    global _pending
+    _get_executor()
+    _check_queue()
+
+    # 오디오 디코딩/VAD(numpy)는 처음 변환할 때 불러옴
+    from utils.audio import SAMPLE_RATE, decode_audio_to_pcm, detect_speech, group_segments, segment_audio
+
+    # 대기열에는 파일 단위로 한 번만 들어감 (세그먼트 수와 무관)
+    _pending += 1
+    pcm_path = None
+    tasks = []
+    try:
+        with span("stt.decode", bytes=os.path.getsize(file_path)) as current:
+            pcm, pcm_path = await asyncio.to_thread(decode_audio_to_pcm, file_path)
+            current.set(audio_seconds=len(pcm) / SAMPLE_RATE)
+        with span("stt.vad"):
+            regions = await asyncio.to_thread(detect_speech, pcm)
+        segments = group_segments(regions)
+        speech_seconds = sum(end - start for start, end in segments) / SAMPLE_RATE
+        print(f"🔪 VAD 분할: {len(pcm) / SAMPLE_RATE:.0f}초 중 음성 {speech_seconds:.0f}초, {len(segments)}개 세그먼트")
+
+        def submit(index: int) -> asyncio.Task:
+            start, end = segments[index]
+            return asyncio.create_task(_run_on_pool(segment_audio(pcm, start, end), model_size, backend))
+
+        # 워커 수만큼 미리 띄워두고, 앞 세그먼트가 끝날 때마다 다음 세그먼트를 추가
+        window = STT_MAX_WORKERS
+        tasks = [submit(i) for i in range(min(window, len(segments)))]
+        for index, (start, _) in enumerate(segments):
+            result = await tasks[index]
+            if index + window < len(segments):
+                tasks.append(submit(index + window))
+            for segment in _segments_of(result, start / SAMPLE_RATE):
+                yield segment
+    finally:
+        _pending -= 1
+        for task in tasks:
+            task.cancel()
+        if pcm_path:
+            os.remove(pcm_path)
+
+
+async def transcribe_stream(file_path: str, model_size: str = WHISPER_DEFAULT_MODEL, backend: str = STT_BACKEND):
+    """오디오 파일을 변환하면서 구간({"start", "end", "text"}, 초 단위)을 순서대로 전달
+
+    STT_VAD_ENABLED이면 무음 기준으로 나눈 세그먼트를 병렬로 변환하고, 아니면 파일 전체를 한 번에 변환합니다.
+    결과는 파일 내용 해시 + 백엔드(버전, 연산 형식, 빔 크기) + 모델 + 분할 설정 기준으로 캐시합니다.
+    """
+    file_hash = await asyncio.to_thread(file_sha256, file_path)
+    if STT_VAD_ENABLED:
+        mode = ("vad", STT_SEGMENT_MAX_SECONDS, VAD_FRAME_MS, VAD_THRESHOLD_DB,
+                VAD_MIN_SILENCE_MS, VAD_MIN_SPEECH_MS, VAD_SPEECH_PAD_MS)
+    else:
+        mode = ("full",)
+    key = make_key("stt", file_hash, backend, model_size, _backend(backend).version(), *mode)
+    cached = result_cache.get(key)
+    if cached is not None:
+        print(f"♻️ STT 캐시 사용: {file_path}")
+        annotate(cached=True)
+        for segment in cached["segments"]:
+            yield segment
+        return
+
+    segments = []
+    if STT_VAD_ENABLED:
+        async for segment in _transcribe_segmented(file_path, model_size, backend):
+            segments.append(segment)
+            yield segment
+    else:
+        segments = _segments_of(await transcribe_audio(file_path, model_size, backend))
+        for segment in segments:
+            yield segment
+
+    result_cache.set(key, {"text": " ".join(seg["text"] for seg in segments), "segments": segments})
+
+
+async def transcribe_file(file_path: str, model_size: str = WHISPER_DEFAULT_MODEL, backend: str = STT_BACKEND) -> dict:
+    """오디오 파일 전체 변환 결과 ({"text", "segments"})"""
+    segments = [segment async for segment in transcribe_stream(file_path, model_size, backend)]
+    return {"text": " ".join(seg["text"] for seg in segments), "segments": segments}
@@ -0,0 +1,38 @@
+"""openai-whisper(PyTorch) STT 백엔드
+
+services.stt_service가 처음 변환하거나 모델을 미리 로드할 때 불러옵니다 (torch/whisper import는 이 모듈에서만).
+"""
+import ssl
+
+import torch
+import whisper
+
+from config import STT_BEAM_SIZE
+
+
+def version() -> str:
+    # 기본값(greedy)은 기존 캐시 키를 그대로 유지
+    return whisper.__version__ if STT_BEAM_SIZE <= 1 else f"{whisper.__version__}:beam{STT_BEAM_SIZE}"
+
+
+def configure_threads(count: int) -> None:
+    """워커 하나가 쓰는 연산 스레드 수"""
+    torch.set_num_threads(count)
+
+
+def load_model(model_size: str):
+    # 모델 다운로드 시 SSL 인증서 검증 비활성화
+    ssl._create_default_https_context = ssl._create_unverified_context
+    return whisper.load_model(model_size)
+
+
+def transcribe(model, audio) -> dict:
+    """audio(파일 경로 또는 16kHz float32 배열) -> {"text", "segments": [{"start", "end", "text"}, ...]}"""
+    options = {"beam_size": STT_BEAM_SIZE} if STT_BEAM_SIZE > 1 else {}
+    return model.transcribe(
+        audio,
+        language="ko",
+        fp16=False,  # CPU 사용 시 False
+        verbose=None,  # 상세 로그 및 진행바 끄기
+        **options
+    )
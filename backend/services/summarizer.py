@@ -0,0 +1,185 @@
+import asyncio
+import re
+import zlib
+
+from config import SUMMARY_SINGLE_PASS_TOKENS, SUMMARY_CHUNK_TOKENS, SUMMARY_MAP_CONCURRENCY
+from services.gpt_service import call_gpt, GPT_ERROR_PREFIX
+from utils.telemetry import span, annotate
+
+# 청크 분할 경계 (앞에 있을수록 우선)
+_BOUNDARY_PATTERNS = [
+    re.compile(r"\n(?==== 파일: )"),          # 파일 경계
+    re.compile(r"\n(?=--- \d+페이지 ---)"),   # PDF 페이지 경계
+    re.compile(r"\n(?=(?:파일: |■ ))"),       # 오디오 파일/섹션 경계
+    re.compile(r"\n\s*\n"),                   # 문단
+    re.compile(r"\n"),                        # 줄
+    re.compile(r"(?<=[.!?다요])\s+"),          # 문장
+]
+
+# 청크 요약 지시문 (종류별)
+_MAP_INSTRUCTIONS = {
+    "business_plan": (
+        "사업계획서",
+        "기업 개요(기업명, 업종, 설립년도, 대표자), 제품/서비스, 시장(타겟, 규모, 경쟁사), 비즈니스 모델, "
+        "재무 계획, 사업비 및 투자 정보(총 사업비, 지원금, 자기부담금, 투자 유치, 매출 목표), 기타 중요 정보",
+    ),
+    "meeting": (
+        "미팅 녹취록",
+        "미팅 주제와 참석자, 주요 논의사항, 결정사항, 액션 아이템, 사업/전략/목표 관련 핵심 내용",
+    ),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 등 비ASCII는 글자당 1토큰, ASCII는 4글자당 1토큰)"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii) // 4 + 1
+
+
+def _split(text: str, max_tokens: int, level: int) -> list:
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    if level >= len(_BOUNDARY_PATTERNS):
+        # 더 나눌 경계가 없으면 글자 수 기준으로 자름
+        size = max(1, len(text) * max_tokens // estimate_tokens(text))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    pieces = [piece for piece in _BOUNDARY_PATTERNS[level].split(text) if piece.strip()]
+    if len(pieces) <= 1:
+        return _split(text, max_tokens, level + 1)
+
+    # 경계 단위로 나눈 조각을 예산 안에서 앞에서부터 묶음
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if piece_tokens > max_tokens:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split(piece, max_tokens, level + 1))
+            continue
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+        # 예산 절반 이상 찼으면 내용 기반으로 청크를 닫음 - 앞부분이 수정되어도 뒤쪽 경계가 다시 맞춰짐
+        if current_tokens >= max_tokens // 2 and zlib.crc32(piece.encode('utf-8')) % 4 == 0:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def split_into_chunks(text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> list:
+    """파일/페이지/섹션/문단 경계를 우선으로 토큰 예산 이하의 청크로 분할
+
+    청크 경계가 내용에 따라 정해지므로, 문서 일부만 바뀌면 나머지 청크의 요약 캐시를 재사용할 수 있습니다.
+    """
+    return _split(text, max_tokens, 0)
+
+
+def _map_prompt(kind: str, chunk: str) -> str:
+    # 청크 번호는 넣지 않음 (청크 수가 바뀌어도 같은 청크의 캐시를 재사용하도록)
+    document, topics = _MAP_INSTRUCTIONS[kind]
+    return f"""
+    다음은 {document}의 일부입니다.
+    이 부분에 나온 내용 중 {topics}에 해당하는 사실을 빠짐없이 간결하게 정리해주세요. 마크다운은 제외해주세요.
+    숫자, 금액, 연도, 이름은 원문 그대로 옮기고, 이 부분에 없는 내용은 추측하지 마세요.
+
+    {document} 일부:
+    {chunk}
+    """
+
+
+def _reduce_prompt(kind: str, notes: str) -> str:
+    document, topics = _MAP_INSTRUCTIONS[kind]
+    return f"""
+    다음은 {document}의 여러 부분을 각각 정리한 내용입니다.
+    {topics}별로 중복을 합쳐 하나로 정리해주세요. 마크다운은 제외해주세요.
+    숫자, 금액, 연도, 이름은 그대로 유지하고, 서로 다른 수치는 모두 남겨주세요.
+
+    부분별 정리:
+    {notes}
+    """
+
+
+def _first_error(notes: list):
+    """청크 요약 중 실패한 것 (오류 메시지를 요약처럼 합치지 않도록)"""
+    return next((note for note in notes if note.startswith(GPT_ERROR_PREFIX)), None)
+
+
+async def _gather_bounded(prompts: list, priority: int) -> list:
+    semaphore = asyncio.Semaphore(SUMMARY_MAP_CONCURRENCY)
+
+    async def run(prompt: str) -> str:
+        async with semaphore:
+            return await call_gpt(prompt, priority=priority, cache=True)
+
+    return await asyncio.gather(*(run(prompt) for prompt in prompts))
+
+
+def _group_by_budget(notes: list, max_tokens: int) -> list:
+    groups = []
+    current = []
+    current_tokens = 0
+    for note in notes:
+        note_tokens = estimate_tokens(note)
+        if current and current_tokens + note_tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(note)
+        current_tokens += note_tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def summarize_text(text: str, kind: str, build_final_prompt, priority: int = None) -> str:
+    """긴 텍스트 요약 (map-reduce)
+
+    텍스트가 SUMMARY_SINGLE_PASS_TOKENS 이하이면 build_final_prompt(text)로 한 번에 요약하고,
+    넘으면 청크별로 동시에 요약(map)한 뒤 예산 안에 들어올 때까지 단계적으로 합쳐(reduce)
+    마지막에 build_final_prompt로 기존 ■ 형식의 요약을 만듭니다. 모든 호출은 캐시됩니다.
+    청크 요약이 하나라도 실패하면 합치지 않고 GPT_ERROR_PREFIX로 시작하는 오류 메시지를 반환합니다.
+    kind는 "business_plan" 또는 "meeting"입니다.
+    """
+    with span(f"summary.{kind}", characters=len(text)):
+        return await _summarize(text, kind, build_final_prompt, priority)
+
+
+async def _summarize(text: str, kind: str, build_final_prompt, priority: int) -> str:
+    if estimate_tokens(text) <= SUMMARY_SINGLE_PASS_TOKENS:
+        return await call_gpt(build_final_prompt(text), priority=priority, cache=True)
+
+    chunks = split_into_chunks(text)
+    annotate(chunks=len(chunks))
+    print(f"🧩 {kind} 텍스트 {estimate_tokens(text)}토큰 → {len(chunks)}개 청크로 분할 요약")
+    notes = await _gather_bounded(
+        [_map_prompt(kind, chunk) for chunk in chunks],
+        priority,
+    )
+    error = _first_error(notes)
+    if error:
+        print(f"❌ {kind} 청크 요약 실패: {error}")
+        return error
+
+    # 합친 요약이 예산을 넘으면 묶음 단위로 다시 요약
+    while len(notes) > 1 and estimate_tokens("\n\n".join(notes)) > SUMMARY_SINGLE_PASS_TOKENS:
+        groups = _group_by_budget(notes, SUMMARY_CHUNK_TOKENS)
+        if len(groups) == len(notes):
+            # 요약 하나하나가 이미 예산 크기라 더 묶을 수 없으면 두 개씩 합침
+            groups = [notes[i:i + 2] for i in range(0, len(notes), 2)]
+        notes = await _gather_bounded(
+            [_reduce_prompt(kind, "\n\n".join(group)) for group in groups],
+            priority,
+        )
+        error = _first_error(notes)
+        if error:
+            print(f"❌ {kind} 요약 병합 실패: {error}")
+            return error
+
+    return await call_gpt(build_final_prompt("\n\n".join(notes)), priority=priority, cache=True)
@@ -0,0 +1,158 @@
+"""녹취록 압축 (STT → LLM 사이)
+
+Whisper 출력을 미팅 요약 프롬프트에 넣기 전에 규칙 기반으로 줄입니다 (LLM 호출 없음).
+1. 무음 구간에서 생기는 환각 문구(예: "시청해주셔서 감사합니다") 세그먼트 제거
+2. 연속해서 반복되는 n-gram을 한 번으로 축약 ("감사합니다 감사합니다 감사합니다" -> "감사합니다")
+3. 간투사(어, 음, 으음 등) 제거
+4. 거의 같은 세그먼트 제거 - 글자 3-gram MinHash + LSH로 후보를 찾고 추정 Jaccard 유사도로 판정
+   (같은 파일의 반복 출력과, 겹쳐서 녹음된 여러 파일 사이의 중복 모두)
+5. 짧은 간격으로 이어지는 세그먼트를 발화 단위 문단으로 병합
+"""
+import re
+import zlib
+
+from config import COMPACTION_DUPLICATE_THRESHOLD, COMPACTION_TURN_GAP_SECONDS
+from services.summarizer import estimate_tokens
+
+# 압축 규칙이 바뀌면 올려서 저장된 녹취록 단계 결과를 무효화
+COMPACTOR_VERSION = "1"
+
+# 무음/잡음에서 Whisper가 자주 만들어내는 문구 (세그먼트 전체가 이 문구뿐이면 제거)
+_HALLUCINATION_RE = re.compile(
+    r"^(?:시청\s*해\s*주셔서\s*감사합니다|구독과\s*좋아요.*|자막\s*(?:제공|by).*|MBC\s*뉴스.*|"
+    r"다음\s*영상에서\s*만나요|오늘도\s*시청해\s*주셔서\s*감사합니다)[.!\s]*$"
+)
+# 단독으로 쓰인 간투사 (문장 부호가 붙은 경우 포함)
+_FILLERS = frozenset(("어", "어어", "음", "음음", "으", "으음", "흠", "에", "에에", "아", "아아", "엄", "응"))
+_PUNCTUATION = ".,!?…~·"
+
+# n-gram 반복 축약 (단어 1개는 3회 이상, 2개 이상은 2회 이상 연속 반복될 때)
+_MAX_NGRAM = 8
+
+# MinHash 설정 (밴드 16개 × 행 4개)
+_SHINGLE = 3
+_PERMUTATIONS = 64
+_BANDS = 16
+_MIN_DEDUP_CHARS = 8
+# 2^32보다 작은 소수 (a * h + b가 uint64 범위를 넘지 않도록)
+_PRIME = 4294967291
+
+
+def collapse_repeats(words: list) -> list:
+    """연속 반복되는 n-gram을 한 번만 남김"""
+    result = []
+    index = 0
+    count = len(words)
+    while index < count:
+        for size in range(min(_MAX_NGRAM, (count - index) // 2), 0, -1):
+            gram = words[index:index + size]
+            repeats = 1
+            while words[index + repeats * size:index + (repeats + 1) * size] == gram:
+                repeats += 1
+            if repeats >= (3 if size == 1 else 2):
+                result.extend(gram)
+                index += repeats * size
+                break
+        else:
+            result.append(words[index])
+            index += 1
+    return result
+
+
+def clean_segment(text: str) -> str:
+    """세그먼트 하나 정리 (환각 문구, 반복, 간투사) - 남는 내용이 없으면 빈 문자열"""
+    text = text.strip()
+    if not text or _HALLUCINATION_RE.match(text):
+        return ""
+    words = [word for word in text.split() if word.strip(_PUNCTUATION) not in _FILLERS]
+    return " ".join(collapse_repeats(words))
+
+
+def _normalize(text: str) -> str:
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+class _MinHashIndex:
+    """MinHash LSH 색인 (추가하면서 이미 들어간 것과 거의 같은지 확인)"""
+
+    def __init__(self, threshold: float):
+        import numpy as np
+
+        self._np = np
+        self.threshold = threshold
+        rng = np.random.default_rng(0)
+        self._a = rng.integers(1, _PRIME, _PERMUTATIONS, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, _PERMUTATIONS, dtype=np.uint64)
+        self._rows = _PERMUTATIONS // _BANDS
+        self._buckets = {}
+        self._signatures = []
+
+    def _signature(self, text: str):
+        np = self._np
+        shingles = {text[i:i + _SHINGLE] for i in range(len(text) - _SHINGLE + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles), dtype=np.uint64,
+                             count=len(shingles))
+        # 순열 64개를 (a * h + b) mod p 로 근사
+        values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return values.min(axis=1)
+
+    def add_if_new(self, text: str) -> bool:
+        """색인에 거의 같은 텍스트가 없으면 추가하고 True, 있으면 False"""
+        signature = self._signature(text)
+        bands = [(band, signature[band * self._rows:(band + 1) * self._rows].tobytes()) for band in range(_BANDS)]
+        candidates = set()
+        for key in bands:
+            candidates.update(self._buckets.get(key, ()))
+        for candidate in candidates:
+            if float((self._signatures[candidate] == signature).mean()) >= self.threshold:
+                return False
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for key in bands:
+            self._buckets.setdefault(key, []).append(position)
+        return True
+
+
+def compact_transcripts(files: list) -> tuple:
+    """파일별 세그먼트 목록을 압축
+
+    files는 [(파일 이름, [{"start", "end", "text"}, ...]), ...]이고,
+    ([파일별 압축된 텍스트], 통계)를 반환합니다. 텍스트는 발화 단위 문단이 줄바꿈으로 구분됩니다.
+    통계: raw_tokens, compact_tokens, tokens_saved, segments, dropped_noise, dropped_duplicates
+    """
+    index = _MinHashIndex(COMPACTION_DUPLICATE_THRESHOLD)
+    stats = {"raw_tokens": 0, "compact_tokens": 0, "tokens_saved": 0, "segments": 0,
+             "dropped_noise": 0, "dropped_duplicates": 0}
+    texts = []
+    for _, segments in files:
+        turns = []
+        previous_end = None
+        last_short = None
+        for segment in segments:
+            stats["segments"] += 1
+            stats["raw_tokens"] += estimate_tokens(segment["text"])
+            text = clean_segment(segment["text"])
+            if not text:
+                # 환각 문구나 간투사뿐인 세그먼트
+                stats["dropped_noise"] += 1
+                continue
+            normalized = _normalize(text)
+            if len(normalized) >= _MIN_DEDUP_CHARS:
+                duplicate = not index.add_if_new(normalized)
+            else:
+                # 짧은 세그먼트는 바로 앞 세그먼트와 같을 때만 중복
+                duplicate = normalized == last_short
+                last_short = normalized
+            if duplicate:
+                stats["dropped_duplicates"] += 1
+                continue
+            if turns and previous_end is not None and segment["start"] - previous_end <= COMPACTION_TURN_GAP_SECONDS:
+                turns[-1].append(text)
+            else:
+                turns.append([text])
+            previous_end = segment["end"]
+        texts.append("\n".join(" ".join(turn) for turn in turns))
+
+    stats["compact_tokens"] = sum(estimate_tokens(text) for text in texts)
+    stats["tokens_saved"] = max(0, stats["raw_tokens"] - stats["compact_tokens"])
+    return texts, stats
@@ -0,0 +1,118 @@
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+
+from config import (
+    FFMPEG_BINARY,
+    VAD_FRAME_MS,
+    VAD_THRESHOLD_DB,
+    VAD_MIN_SILENCE_MS,
+    VAD_MIN_SPEECH_MS,
+    VAD_SPEECH_PAD_MS,
+    STT_SEGMENT_MAX_SECONDS,
+)
+
+# Whisper 입력 형식 (16kHz mono)
+SAMPLE_RATE = 16000
+
+# 프레임 에너지를 계산할 때 한 번에 읽는 프레임 수 (메모리 사용량 일정)
+_ENERGY_BLOCK_FRAMES = 20000
+
+
+def decode_audio_to_pcm(file_path: str, temp_dir: str = None) -> tuple:
+    """ffmpeg로 오디오를 16kHz mono 16bit PCM 파일로 디코딩한 뒤 메모리 매핑
+
+    반환값은 (int16 memmap 배열, PCM 임시 파일 경로)이며, 사용 후 임시 파일은 호출한 쪽에서 지웁니다.
+    """
+    fd, pcm_path = tempfile.mkstemp(suffix=".pcm", dir=temp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as pcm_file:
+            subprocess.run(
+                [FFMPEG_BINARY, "-nostdin", "-v", "error", "-i", file_path,
+                 "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"],
+                stdout=pcm_file,
+                stderr=subprocess.PIPE,
+                check=True,
+            )
+        if os.path.getsize(pcm_path) == 0:
+            return np.zeros(0, dtype=np.int16), pcm_path
+        return np.memmap(pcm_path, dtype=np.int16, mode='r'), pcm_path
+    except BaseException:
+        os.remove(pcm_path)
+        raise
+
+
+def _frame_energy_db(pcm: np.ndarray, frame_size: int) -> np.ndarray:
+    """프레임별 RMS 에너지 (dBFS), 블록 단위로 계산해서 긴 녹음도 메모리 사용량이 일정"""
+    frame_count = len(pcm) // frame_size
+    energies = np.empty(frame_count, dtype=np.float32)
+    for start in range(0, frame_count, _ENERGY_BLOCK_FRAMES):
+        end = min(start + _ENERGY_BLOCK_FRAMES, frame_count)
+        block = np.asarray(pcm[start * frame_size:end * frame_size], dtype=np.float32) / 32768.0
+        rms = np.sqrt(np.mean(block.reshape(-1, frame_size) ** 2, axis=1))
+        energies[start:end] = 20 * np.log10(np.maximum(rms, 1e-10))
+    return energies
+
+
+def detect_speech(pcm: np.ndarray) -> list:
+    """에너지 기반 음성 구간 검출 (VAD)
+
+    잡음 수준(하위 10% 프레임)보다 충분히 크고 VAD_THRESHOLD_DB 이상인 프레임을 음성으로 보고,
+    짧은 무음은 메우고 짧은 잡음은 버린 뒤 앞뒤 여유를 붙여 [(시작 샘플, 끝 샘플)] 목록을 반환합니다.
+    """
+    frame_size = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    energies = _frame_energy_db(pcm, frame_size)
+    if len(energies) == 0:
+        return []
+
+    noise_floor = float(np.percentile(energies, 10))
+    threshold = max(VAD_THRESHOLD_DB, noise_floor + 10)
+    voiced = energies > threshold
+
+    # 음성 프레임 구간 [start, end) 찾기
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_silence = VAD_MIN_SILENCE_MS // VAD_FRAME_MS
+    min_speech = VAD_MIN_SPEECH_MS // VAD_FRAME_MS
+    pad = VAD_SPEECH_PAD_MS // VAD_FRAME_MS
+
+    regions = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    total_frames = len(energies)
+    return [
+        (int(max(0, start - pad)) * frame_size, int(min(total_frames, end + pad)) * frame_size)
+        for start, end in regions
+        if end - start >= min_speech
+    ]
+
+
+def group_segments(regions: list, max_seconds: float = STT_SEGMENT_MAX_SECONDS) -> list:
+    """음성 구간을 Whisper 창 크기(기본 30초) 이하의 세그먼트로 묶음
+
+    가까운 음성 구간은 무음 경계에서 합치고, 한 구간이 너무 길면 창 크기로 자릅니다.
+    """
+    max_samples = int(max_seconds * SAMPLE_RATE)
+    segments = []
+    for start, end in regions:
+        while end - start > max_samples:
+            segments.append((start, start + max_samples))
+            start += max_samples
+        if segments and end - segments[-1][0] <= max_samples and start - segments[-1][1] < SAMPLE_RATE:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+def segment_audio(pcm: np.ndarray, start: int, end: int) -> np.ndarray:
+    """세그먼트를 Whisper 입력 형식(float32, -1~1)으로 변환"""
+    return np.asarray(pcm[start:end], dtype=np.float32) / 32768.0
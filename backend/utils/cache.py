@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    CACHE_ENABLED,
+    CACHE_DIR,
+    CACHE_MEMORY_ITEMS,
+    CACHE_DISK_MAX_MB,
+    CACHE_TTL_SECONDS,
+)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# (경로, 크기, 수정시각) -> SHA-256 (같은 파일을 반복해서 해시하지 않도록)
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_sha256(file_path: str) -> str:
+    """파일 내용의 SHA-256 (청크 단위로 읽어 메모리 사용량 일정)"""
+    stat = os.stat(file_path)
+    stamp = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(stamp)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _file_hashes_lock:
+        _file_hashes[stamp] = value
+    return value
+
+
+def remember_file_sha256(file_path: str, value: str) -> None:
+    """업로드 중 계산한 해시를 등록해서 나중에 파일을 다시 읽지 않도록 함"""
+    stat = os.stat(file_path)
+    stamp = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        _file_hashes[stamp] = value
+
+
+def make_key(namespace: str, *parts) -> str:
+    """네임스페이스와 구성 요소들로 캐시 키 생성"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return f"{namespace}:{digest.hexdigest()}"
+
+
+class ResultCache:
+    """콘텐츠 해시 기반 2단계 결과 캐시
+
+    1단계는 프로세스 메모리 LRU, 2단계는 SQLite 디스크 저장소입니다.
+    디스크 저장소는 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제하고,
+    ttl초가 지난 항목은 조회 시 만료 처리합니다. 값은 JSON으로 직렬화 가능해야 합니다.
+    """
+
+    def __init__(self, db_path: str, memory_items: int, max_bytes: int, ttl: float):
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> None:
+        # 워커 프로세스(fork)에서는 부모의 연결/락을 쓰지 않고 새로 만듦
+        self._pid = os.getpid()
+        self._memory = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._db.commit()
+
+    def _check_process(self) -> None:
+        if self._pid != os.getpid():
+            self._connect()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl > 0 and now - created > self.ttl
+
+    def _remember(self, key: str, created: float, value) -> None:
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """캐시된 값 반환 (없거나 만료되었으면 None)"""
+        self._check_process()
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            raw, created = row
+            if self._expired(created, now):
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            value = json.loads(raw)
+            self._remember(key, created, value)
+            return value
+
+    def set(self, key: str, value) -> None:
+        """값 저장 (메모리와 디스크 모두)"""
+        self._check_process()
+        now = time.time()
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, now, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, raw, len(raw.encode('utf-8')), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM cache ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+
+    def clear(self) -> None:
+        self._check_process()
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM cache")
+            self._db.commit()
+
+
+class _DisabledCache:
+    """CACHE_ENABLED=false일 때 사용하는 빈 캐시"""
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+# 프로세스 전역 결과 캐시
+if CACHE_ENABLED:
+    result_cache = ResultCache(
+        os.path.join(CACHE_DIR, "results.sqlite3"),
+        memory_items=CACHE_MEMORY_ITEMS,
+        max_bytes=CACHE_DISK_MAX_MB * 1024 * 1024,
+        ttl=CACHE_TTL_SECONDS,
+    )
+else:
+    result_cache = _DisabledCache()
@@ -0,0 +1,15 @@
+import asyncio
+
+
+async def map_limited(func, items: list, limit: int) -> list:
+    """items 각각에 코루틴 함수 func를 최대 limit개까지 동시에 실행
+
+    결과는 입력 순서대로 반환하며, 실패한 항목은 해당 위치에 예외 객체가 들어갑니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
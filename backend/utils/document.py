@@ -0,0 +1,153 @@
+"""추출 결과 문서 구조
+
+문서는 {"source", "text", "blocks"} 딕셔너리입니다 (JSON 직렬화 가능, 캐시/워커 프로세스 간 전달용).
+text는 LLM에 보내는 전체 텍스트이고, 각 블록은 text 안의 위치만 가리킵니다.
+
+블록: {"type": "heading" | "paragraph" | "table", "start", "end", "page", "section"}
+- start/end: text 안의 글자 오프셋 (text[start:end]가 블록 내용)
+- page: PDF 페이지 번호 (페이지가 없는 형식은 None)
+- section: 블록이 속한 제목 블록의 인덱스 (제목 블록은 자기 자신, 첫 제목 이전 블록은 None)
+- 표 블록은 추가로 "rows"([[셀 텍스트, ...], ...])와 "caption"을 가집니다.
+
+추출에 실패한(또는 일부 페이지가 실패한) 문서에는 "error"(오류 메시지)가 있습니다. 이런 문서는 캐시/저장하지 않으므로
+본문 내용으로 실패를 판단하지 않고 이 값으로 확인합니다.
+"""
+import re
+
+# 사업계획서에서 흔히 쓰는 제목 형식 (Ⅰ. / 1. / 1.1 / □ / [제목] / <제목>)
+_HEADING_RE = re.compile(
+    r"^(?:[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]+\s*[.)]"
+    r"|\d{1,2}(?:\.\d{1,2})*[.)]?\s"
+    r"|[□■◆◇▣]"
+    r"|\[[^\]]{1,30}\]$"
+    r"|<[^>]{1,30}>$)"
+)
+_HEADING_MAX_CHARS = 40
+
+
+def is_heading(line: str) -> bool:
+    """짧은 줄이 제목 형식으로 시작하면 제목으로 판단"""
+    line = line.strip()
+    return 0 < len(line) <= _HEADING_MAX_CHARS and bool(_HEADING_RE.match(line)) and not line.endswith(("다.", "요."))
+
+
+def format_table(rows: list, caption: str = "") -> str:
+    """표를 행 단위 텍스트로 (셀은 ' | '로 구분)"""
+    lines = [f"[표] {caption}".rstrip()]
+    lines.extend(" | ".join(row) for row in rows if any(row))
+    return "\n".join(lines)
+
+
+class DocumentBuilder:
+    """블록을 순서대로 추가해서 문서를 만듦
+
+    텍스트 조각은 목록에 모았다가 build()에서 한 번만 결합하므로 문서 길이에 선형 시간입니다.
+    """
+
+    def __init__(self, source: str = ""):
+        self.source = source
+        self.blocks = []
+        self._parts = []
+        self._length = 0
+        self._page = None
+        self._section = None
+
+    def _write(self, text: str) -> tuple:
+        start = self._length + (1 if self._parts else 0)
+        self._parts.append(text)
+        self._length = start + len(text)
+        return start, self._length
+
+    def start_page(self, page: int) -> None:
+        """이후 블록의 페이지 번호 지정 (텍스트에 페이지 구분 표시 추가)"""
+        self._page = page
+        self._write(f"--- {page}페이지 ---")
+
+    def _add(self, kind: str, text: str, **fields) -> None:
+        start, end = self._write(text)
+        if kind == "heading":
+            self._section = len(self.blocks)
+        self.blocks.append({
+            "type": kind, "start": start, "end": end, "page": self._page, "section": self._section, **fields,
+        })
+
+    def add_heading(self, text: str) -> None:
+        self._add("heading", text.strip())
+
+    def add_paragraph(self, text: str) -> None:
+        text = text.strip()
+        if text:
+            self._add("paragraph", text)
+
+    def add_table(self, rows: list, caption: str = "") -> None:
+        rows = [[" ".join(cell.split()) for cell in row] for row in rows]
+        if not any(any(row) for row in rows):
+            return
+        self._add("table", format_table(rows, caption), rows=rows, caption=caption)
+
+    def add_text(self, text: str) -> None:
+        """일반 텍스트를 줄 단위로 제목/문단으로 나눠 추가 (이어지는 줄은 하나의 문단)"""
+        lines = []
+        for line in text.splitlines():
+            if is_heading(line):
+                self.add_paragraph("\n".join(lines))
+                lines = []
+                self.add_heading(line)
+            else:
+                lines.append(line)
+        self.add_paragraph("\n".join(lines))
+
+    def build(self) -> dict:
+        return {"source": self.source, "text": "\n".join(self._parts), "blocks": self.blocks}
+
+
+def text_document(text: str, source: str = "") -> dict:
+    """일반 텍스트로 문서 생성"""
+    builder = DocumentBuilder(source)
+    builder.add_text(text)
+    document = builder.build()
+    if not document["blocks"]:
+        document["text"] = text
+    return document
+
+
+def error_document(message: str, source: str = "") -> dict:
+    """추출 실패 문서 (오류 메시지가 본문, "error" 표시)"""
+    return {**text_document(message, source), "error": message}
+
+
+def block_text(document: dict, block: dict) -> str:
+    return document["text"][block["start"]:block["end"]]
+
+
+def select_blocks(document: dict, pattern) -> list:
+    """제목이 pattern과 맞는 섹션의 블록 전체와, 내용이 pattern과 맞는 표 블록"""
+    selected = []
+    matched = False
+    for block in document["blocks"]:
+        if block["type"] == "heading":
+            matched = bool(pattern.search(block_text(document, block)))
+            if matched:
+                selected.append(block)
+        elif matched or (block["type"] == "table" and pattern.search(block_text(document, block))):
+            selected.append(block)
+    return selected
+
+
+def render_excerpt(document: dict, blocks: list) -> str:
+    """선택한 블록을 원문 위치(제목/페이지)와 함께 하나의 텍스트로 결합"""
+    parts = []
+    section = None
+    for block in blocks:
+        if block["section"] is not None and block["section"] != section:
+            section = block["section"]
+            if block["type"] != "heading":
+                # 표만 골라진 경우에도 어느 섹션의 표인지 표시
+                parts.append(block_text(document, document["blocks"][section]))
+        text = block_text(document, block)
+        if block["type"] == "table" and block["page"] is not None:
+            # 표 제목 줄에 원문 페이지 표시
+            title, _, rows = text.partition("\n")
+            text = f"{title} (p.{block['page']})\n{rows}"
+        parts.append(text)
+    return "\n".join(parts)
@@ -0,0 +1,44 @@
+"""DOCX 추출기 (본문 순서대로 문단과 표)"""
+import os
+
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from utils.document import DocumentBuilder, error_document
+
+def _docx_table_rows(table) -> list:
+    rows = []
+    for row in table.rows:
+        # 병합된 셀은 row.cells에 같은 셀이 반복되므로 한 번만 사용
+        cells = []
+        seen = set()
+        for cell in row.cells:
+            if id(cell._tc) in seen:
+                cells.append("")
+                continue
+            seen.add(id(cell._tc))
+            cells.append(cell.text)
+        rows.append(cells)
+    return rows
+
+def extract_document_from_docx(file_path: str) -> dict:
+    """DOCX에서 문서 추출 (본문 순서대로 문단과 표)"""
+    source = os.path.basename(file_path)
+    try:
+        doc = Document(file_path)
+        builder = DocumentBuilder(source)
+        for element in doc.element.body.iterchildren():
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'p':
+                paragraph = Paragraph(element, doc)
+                style = paragraph.style.name if paragraph.style is not None else ""
+                if style.startswith(("Heading", "Title", "제목")) and paragraph.text.strip():
+                    builder.add_heading(paragraph.text)
+                else:
+                    builder.add_text(paragraph.text)
+            elif tag == 'tbl':
+                builder.add_table(_docx_table_rows(Table(element, doc)))
+        return builder.build()
+    except Exception as e:
+        return error_document(f"DOCX 처리 오류: {str(e)}", source)
@@ -1,126 +1,67 @@
+"""파일 형식별 문서 추출 진입점
+
+형식별 추출기는 utils.plugins 레지스트리에 "extractor" 플러그인으로 등록되어 처음 사용할 때 불러옵니다
+(PyPDF2, python-docx, PIL/pytesseract 등은 이 모듈을 import해도 로드되지 않고, 보통 추출 워커 프로세스에서만 로드됨).
+"""
 import os
-import pytesseract
-from PIL import Image
-import PyPDF2
-from docx import Document
 
-def extract_text_from_file(file_path: str) -> str:
-    """파일에서 텍스트 추출 (PDF, DOCX, 이미지 지원)"""
-    try:
-        file_extension = file_path.split('.')[-1].lower()
-        
-        if file_extension == 'pdf':
-            return extract_text_from_pdf(file_path)
-        elif file_extension in ['docx', 'doc']:
-            return extract_text_from_docx(file_path)
-        elif file_extension == 'hwp':
-            return extract_text_from_hwp(file_path)
-        elif file_extension in ['png', 'jpg', 'jpeg', 'gif', 'bmp']:
-            return extract_text_from_image(file_path)
-        elif file_extension == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        else:
-            return f"지원하지 않는 파일 형식: {file_extension}"
-    except Exception as e:
-        return f"파일 처리 중 오류 발생: {str(e)}"
+from utils.cache import file_sha256, make_key
+from utils.document import DocumentBuilder, text_document, error_document
+from utils.plugins import load as load_plugin, names as plugin_names, register as register_plugin
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """PDF에서 텍스트 추출"""
-    try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        return f"PDF 처리 오류: {str(e)}"
+# 추출 로직이 바뀌면 올려서 기존 캐시를 무효화
+EXTRACTOR_VERSION = "5"
 
-def extract_text_from_docx(file_path: str) -> str:
-    """DOCX에서 텍스트 추출"""
-    try:
-        doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
-    except Exception as e:
-        return f"DOCX 처리 오류: {str(e)}"
+# OCR로 처리하는 이미지 형식 (TIFF는 멀티 페이지 지원)
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'bmp', 'tif', 'tiff', 'webp')
 
-def extract_text_from_hwp(file_path: str) -> str:
-    """HWP 파일에서 텍스트 추출 (hwp5txt의 TextTransform 직접 사용)"""
-    try:
-        from hwp5.hwp5txt import TextTransform
-        from hwp5.xmlmodel import Hwp5File
-        from contextlib import closing
-        import io
-        
-        # TextTransform을 사용해서 텍스트 추출
-        try:
-            text_transform = TextTransform()
-            transform = text_transform.transform_hwp5_to_text
-            
-            # BytesIO를 사용해서 출력 캡처
-            output = io.BytesIO()
-            
-            # HWP 파일을 열고 텍스트로 변환
-            with closing(Hwp5File(file_path)) as hwp5file:
-                transform(hwp5file, output)
-            
-            # 추출된 텍스트 가져오기 (bytes를 문자열로 변환)
-            extracted_text = output.getvalue().decode('utf-8', errors='ignore')
-            output.close()
-            
-            if extracted_text.strip():
-                return extracted_text.strip()
-            else:
-                return "HWP 파일에서 텍스트를 추출할 수 없습니다."
-                
-        except Exception as e:
-            print(f"hwp5txt TextTransform 오류: {e}")
-            return extract_text_from_hwp_fallback(file_path)
-                
-    except Exception as e:
-        print(f"hwp5txt 라이브러리 오류: {e}")
-        return extract_text_from_hwp_fallback(file_path)
+# 확장자별 추출기 (document = extract(file_path))
+register_plugin("extractor", "pdf", "utils.pdf_extractor:extract_document_from_pdf")
+for _extension in ('docx', 'doc'):
+    register_plugin("extractor", _extension, "utils.docx_extractor:extract_document_from_docx")
+register_plugin("extractor", "hwp", "utils.hwp_extractor:extract_document_from_hwp")
+for _extension in IMAGE_EXTENSIONS:
+    register_plugin("extractor", _extension, "utils.ocr:extract_document_from_image")
+
+def extraction_cache_key(file_path: str) -> str:
+    """파일 내용 해시 + 추출기 버전 기준 캐시 키"""
+    return make_key("document", file_sha256(file_path), EXTRACTOR_VERSION)
+
+def is_extraction_error(document: dict) -> bool:
+    """추출에 실패한 문서인지 확인 (실패 문서는 캐시하지 않음)"""
+    return bool(document.get("error"))
 
-def extract_text_from_hwp_fallback(file_path: str) -> str:
-    """HWP 파일 텍스트 추출 (대체 방법)"""
+def extract_text_from_file(file_path: str) -> str:
+    """파일에서 텍스트 추출 (PDF, DOCX, HWP, 이미지 지원)"""
+    return extract_document_from_file(file_path)["text"]
+
+def extract_document_from_file(file_path: str) -> dict:
+    """파일에서 문서 구조 추출 (utils.document 형식, 실패 시 오류 메시지 문서)"""
+    source = os.path.basename(file_path)
     try:
-        # HWP 파일을 바이너리로 읽어서 패턴 매칭으로 텍스트 추출
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        # UTF-8로 디코딩
-        decoded = content.decode('utf-8', errors='ignore')
-        
-        # 한글 텍스트 패턴 찾기 (연속된 한글 3글자 이상)
-        import re
-        korean_patterns = re.findall(r'[가-힣]{3,}', decoded)
+        file_extension = file_path.split('.')[-1].lower()
         
-        if korean_patterns:
-            # 의미있는 문장들만 추출
-            sentences = []
-            for pattern in korean_patterns:
-                if len(pattern) > 5:  # 최소 5글자 이상
-                    sentences.append(pattern)
-            
-            if sentences:
-                return ' '.join(sentences[:50])  # 최대 50개 문장
-            else:
-                return "HWP 파일에서 의미있는 텍스트를 찾을 수 없습니다."
+        if file_extension in plugin_names("extractor"):
+            return load_plugin("extractor", file_extension)(file_path)
+        elif file_extension == 'txt':
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return text_document(f.read(), source)
         else:
-            return "HWP 파일에서 한글 텍스트를 찾을 수 없습니다."
-            
+            return error_document(f"지원하지 않는 파일 형식: {file_extension}", source)
     except Exception as e:
-        return f"HWP 대체 처리 오류: {str(e)}"
+        return error_document(f"파일 처리 중 오류 발생: {str(e)}", source)
 
-def extract_text_from_image(file_path: str) -> str:
-    """이미지에서 OCR로 텍스트 추출"""
-    try:
-        image = Image.open(file_path)
-        text = pytesseract.image_to_string(image, lang='kor+eng')
-        return text
-    except Exception as e:
-        return f"OCR 처리 오류: {str(e)}"
+def pdf_pages_to_document(pages: list, source: str = "") -> dict:
+    """페이지별 추출 결과를 페이지 번호가 붙은 문서로 결합 (실패한 페이지가 있으면 "error" 표시)"""
+    ocr_pages = sum(1 for page in pages if page["ocr"])
+    if ocr_pages:
+        print(f"🔎 PDF OCR 페이지: {ocr_pages}/{len(pages)}")
+    builder = DocumentBuilder(source)
+    for page in pages:
+        builder.start_page(page["page"])
+        builder.add_text(page["text"])
+    document = builder.build()
+    failed = [page["page"] for page in pages if page.get("error")]
+    if failed:
+        document["error"] = f"PDF 페이지 처리 오류: {', '.join(map(str, failed))}페이지"
+    return document
@@ -0,0 +1,240 @@
+"""HWP 5.x 본문 직접 추출
+
+OLE 컨테이너의 BodyText/Section* 스트림을 조금씩 풀면서(raw deflate) 레코드를 순서대로 읽고,
+문단 텍스트(PARA_TEXT)는 UTF-16LE로 바로 디코딩하며 표는 행/셀 구조로 모읍니다.
+배포용 문서나 암호가 걸린 문서는 지원하지 않습니다 (ValueError).
+"""
+import io
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+
+import olefile
+
+from utils.document import DocumentBuilder, format_table, text_document, error_document
+
+# 스트림을 읽어서 압축 해제하는 단위
+_READ_CHUNK = 64 * 1024
+
+# 레코드 태그 (HWPTAG_BEGIN = 0x10 기준)
+HWPTAG_PARA_TEXT = 0x10 + 51
+HWPTAG_CTRL_HEADER = 0x10 + 55
+HWPTAG_LIST_HEADER = 0x10 + 56
+HWPTAG_TABLE = 0x10 + 61
+
+# 컨트롤 ID는 리틀 엔디언으로 저장되므로 'tbl '이 거꾸로 기록됨
+_CTRL_TABLE = b" lbt"
+
+# FileHeader 속성 비트
+_FLAG_COMPRESSED = 0x1
+_FLAG_PASSWORD = 0x2
+_FLAG_DISTRIBUTION = 0x4
+
+# 8 WCHAR를 차지하는 인라인/확장 컨트롤 문자 (나머지 32 미만 문자는 1 WCHAR)
+_WIDE_CONTROLS = frozenset((1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23))
+_CHAR_CONTROLS = {9: "\t", 10: "\n", 24: "-", 30: " ", 31: " "}
+
+_SECTION_RE = re.compile(r"^Section(\d+)$")
+
+
+def _read_flags(ole) -> int:
+    if not ole.exists("FileHeader"):
+        raise ValueError("HWP 5.x 문서가 아닙니다 (FileHeader 없음)")
+    header = ole.openstream("FileHeader").read()
+    if not header.startswith(b"HWP Document File") or len(header) < 40:
+        raise ValueError("HWP 5.x 문서가 아닙니다")
+    flags, = struct.unpack_from("<I", header, 36)
+    if flags & _FLAG_PASSWORD:
+        raise ValueError("암호가 설정된 HWP 문서입니다")
+    if flags & _FLAG_DISTRIBUTION:
+        raise ValueError("배포용 HWP 문서입니다")
+    return flags
+
+
+def _section_streams(ole) -> list:
+    """BodyText/Section{n} 스트림 경로를 번호 순서대로"""
+    sections = []
+    for path in ole.listdir():
+        if len(path) == 2 and path[0] == "BodyText":
+            match = _SECTION_RE.match(path[1])
+            if match:
+                sections.append((int(match.group(1)), "/".join(path)))
+    return [path for _, path in sorted(sections)]
+
+
+def iter_records(stream, compressed: bool):
+    """섹션 스트림에서 (tag, level, payload) 레코드를 순서대로 읽기 (청크 단위 압축 해제)"""
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS) if compressed else None
+    buffer = bytearray()
+    while True:
+        chunk = stream.read(_READ_CHUNK)
+        if chunk:
+            buffer += inflater.decompress(chunk) if inflater else chunk
+        elif inflater:
+            buffer += inflater.flush()
+
+        offset = 0
+        available = len(buffer)
+        while available - offset >= 4:
+            header, = struct.unpack_from("<I", buffer, offset)
+            size = header >> 20
+            start = offset + 4
+            if size == 0xFFF:
+                if available - offset < 8:
+                    break
+                size, = struct.unpack_from("<I", buffer, start)
+                start += 4
+            if available - start < size:
+                break
+            yield header & 0x3FF, (header >> 10) & 0x3FF, bytes(buffer[start:start + size])
+            offset = start + size
+        del buffer[:offset]
+
+        if not chunk:
+            break
+
+
+def decode_para_text(payload: bytes) -> str:
+    """PARA_TEXT 레코드를 문자열로 (컨트롤 문자는 건너뛰고 탭/줄바꿈만 유지)"""
+    chars = array("H")
+    chars.frombytes(payload[:len(payload) & ~1])
+    if sys.byteorder != "little":
+        chars.byteswap()
+
+    parts = []
+    start = 0
+    index = 0
+    count = len(chars)
+    while index < count:
+        code = chars[index]
+        if code >= 32:
+            index += 1
+            continue
+        if start < index:
+            parts.append(payload[start * 2:index * 2].decode("utf-16-le", errors="ignore"))
+        parts.append(_CHAR_CONTROLS.get(code, ""))
+        index += 8 if code in _WIDE_CONTROLS else 1
+        start = index
+    if start < count:
+        parts.append(payload[start * 2:count * 2].decode("utf-16-le", errors="ignore"))
+    return "".join(parts)
+
+
+def _new_table(level: int) -> dict:
+    return {"level": level, "rows": 0, "cols": 0, "cells": [], "caption": [], "target": None}
+
+
+def _table_block(table: dict, section: int) -> dict:
+    rows = max([table["rows"]] + [cell["row"] + 1 for cell in table["cells"]])
+    cols = max([table["cols"]] + [cell["col"] + 1 for cell in table["cells"]])
+    grid = [[""] * cols for _ in range(rows)]
+    for cell in table["cells"]:
+        grid[cell["row"]][cell["col"]] = " ".join(cell["texts"])
+    return {"type": "table", "section": section, "caption": " ".join(table["caption"]), "rows": grid}
+
+
+def _parse_section(records, section: int, blocks: list) -> None:
+    tables = []
+
+    def close_table():
+        block = _table_block(tables.pop(), section)
+        if tables:
+            # 셀 안의 표는 바깥 셀 텍스트로 포함
+            append_text(format_table(block["rows"], block["caption"]).replace("\n", " / "))
+        else:
+            blocks.append(block)
+
+    def append_text(text):
+        table = tables[-1]
+        if table["target"] is None:
+            table["target"] = table["caption"]
+        table["target"].append(text)
+
+    for tag, level, payload in records:
+        while tables and level <= tables[-1]["level"]:
+            close_table()
+
+        if tag == HWPTAG_PARA_TEXT:
+            text = decode_para_text(payload).strip()
+            if not text:
+                continue
+            if tables:
+                append_text(" ".join(text.split()))
+            else:
+                blocks.append({"type": "paragraph", "section": section, "text": text})
+        elif tag == HWPTAG_CTRL_HEADER and payload[:4] == _CTRL_TABLE:
+            tables.append(_new_table(level))
+        elif tables and level == tables[-1]["level"] + 1:
+            table = tables[-1]
+            if tag == HWPTAG_TABLE and len(payload) >= 8:
+                table["rows"], table["cols"] = struct.unpack_from("<HH", payload, 4)
+            elif tag == HWPTAG_LIST_HEADER:
+                if table["rows"] and len(payload) >= 12:
+                    col, row = struct.unpack_from("<HH", payload, 8)
+                    cell = {"row": row, "col": col, "texts": []}
+                    table["cells"].append(cell)
+                    table["target"] = cell["texts"]
+                else:
+                    # TABLE 레코드 이전의 목록은 표 캡션
+                    table["target"] = table["caption"]
+
+    while tables:
+        close_table()
+
+
+def extract_hwp_blocks(file_path: str) -> list:
+    """HWP 본문을 문서 순서의 블록 목록으로 추출
+
+    문단은 {"type": "paragraph", "section", "text"},
+    표는 {"type": "table", "section", "caption", "rows": [[셀 텍스트, ...], ...]} 입니다.
+    """
+    with olefile.OleFileIO(file_path) as ole:
+        compressed = bool(_read_flags(ole) & _FLAG_COMPRESSED)
+        blocks = []
+        for section, path in enumerate(_section_streams(ole)):
+            stream = ole.openstream(path)
+            try:
+                _parse_section(iter_records(stream, compressed), section, blocks)
+            finally:
+                stream.close()
+    return blocks
+
+
+def extract_document_from_hwp(file_path: str) -> dict:
+    """HWP 파일에서 문서 추출 (본문 레코드 직접 해석, 실패 시 hwp5txt 사용)"""
+    source = os.path.basename(file_path)
+    try:
+        builder = DocumentBuilder(source)
+        for block in extract_hwp_blocks(file_path):
+            if block["type"] == "table":
+                builder.add_table(block["rows"], block["caption"])
+            else:
+                builder.add_text(block["text"])
+        if builder.blocks:
+            return builder.build()
+    except Exception as e:
+        print(f"⚠️ HWP 직접 추출 실패, hwp5txt로 재시도: {e}")
+    try:
+        return text_document(extract_text_from_hwp5(file_path), source)
+    except Exception as e:
+        return error_document(f"HWP 처리 오류: {str(e)}", source)
+
+
+def extract_text_from_hwp5(file_path: str) -> str:
+    """HWP 파일에서 텍스트 추출 (hwp5txt의 TextTransform 직접 사용, 실패하거나 텍스트가 없으면 예외)"""
+    from hwp5.hwp5txt import TextTransform
+    from hwp5.xmlmodel import Hwp5File
+    from contextlib import closing
+    
+    transform = TextTransform().transform_hwp5_to_text
+    output = io.BytesIO()
+    with closing(Hwp5File(file_path)) as hwp5file:
+        transform(hwp5file, output)
+    extracted_text = output.getvalue().decode('utf-8', errors='ignore')
+    
+    if not extracted_text.strip():
+        raise ValueError("HWP 파일에서 텍스트를 추출할 수 없습니다.")
+    return extracted_text.strip()
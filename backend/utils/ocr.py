@@ -0,0 +1,266 @@
+"""이미지 OCR 엔진
+
+- 전처리: 그레이스케일 → 기울기 보정(deskew) → 해상도 정규화(DPI 또는 글자 줄 높이 기준) → 이진화(Otsu)
+- 인식: tesserocr가 있으면 Tesseract C API 인스턴스를 프로세스별 풀에 두고 재사용 (언어 데이터는 인스턴스당 한 번만 로드),
+  없으면 pytesseract로 처리
+- 병렬 처리: 멀티 페이지 TIFF의 페이지와 큰 이미지의 타일(빈 줄에서 가로로 분할)을 스레드 풀에서 동시에 인식
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# 여러 엔진을 동시에 쓰므로 엔진 내부 OpenMP 스레드는 1개로 (설정하지 않으면 코어를 두고 서로 경쟁)
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+import numpy as np
+import pytesseract
+from PIL import Image, ImageOps, ImageSequence
+
+from config import (
+    OCR_LANG,
+    OCR_TESSDATA_PATH,
+    OCR_THREADS,
+    OCR_TARGET_DPI,
+    OCR_MAX_SIDE,
+    OCR_TILE_HEIGHT,
+    OCR_DESKEW,
+    OCR_BINARIZE,
+)
+from utils.document import DocumentBuilder, text_document, error_document
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# 기울기/줄 높이 추정용 축소 이미지 폭
+_ANALYSIS_WIDTH = 1000
+# 기울기 탐색 범위와 간격 (도)
+_MAX_SKEW = 5.0
+_COARSE_STEP = 0.5
+_FINE_STEP = 0.1
+# OCR_TARGET_DPI에서 본문 글자 줄(잉크가 있는 연속된 행)의 기대 높이 (픽셀, 10~12pt 기준)
+_TARGET_LINE_HEIGHT = 40
+# 이미지에 기록된 DPI 중 믿을 수 있는 범위 (72/96은 대부분 화면/카메라 기본값)
+_TRUSTED_DPI = (100, 1200)
+_MAX_UPSCALE = 4.0
+
+# 프로세스별 엔진 풀과 스레드 풀 (처음 사용할 때 생성, 생성한 프로세스에서만 사용)
+_engines = None
+_executor = None
+_owner_pid = None
+
+
+class _EnginePool:
+    """초기화된 Tesseract API 인스턴스 풀 (최대 size개, 한 인스턴스는 한 스레드만 사용)"""
+
+    def __init__(self, size: int):
+        self._size = max(1, size)
+        self._created = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _create(self):
+        options = {"lang": OCR_LANG}
+        if OCR_TESSDATA_PATH:
+            options["path"] = OCR_TESSDATA_PATH
+        api = tesserocr.PyTessBaseAPI(**options)
+        print(f"🔤 Tesseract API 초기화 ({OCR_LANG}, pid {os.getpid()})")
+        return api
+
+    @contextmanager
+    def acquire(self):
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    api = self._create()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                api = self._idle.get()
+        try:
+            yield api
+        finally:
+            self._idle.put(api)
+
+
+def _ensure_process_state() -> None:
+    global _engines, _executor, _owner_pid
+    if _owner_pid != os.getpid():
+        _engines = _EnginePool(OCR_THREADS) if tesserocr is not None else None
+        _executor = ThreadPoolExecutor(max_workers=max(1, OCR_THREADS))
+        _owner_pid = os.getpid()
+
+
+def _recognize(image: Image.Image) -> str:
+    _ensure_process_state()
+    if _engines is None:
+        return pytesseract.image_to_string(image, lang=OCR_LANG, config=f"--dpi {OCR_TARGET_DPI}")
+    with _engines.acquire() as api:
+        api.SetImage(image)
+        api.SetSourceResolution(OCR_TARGET_DPI)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+
+# ---- 전처리 ----
+
+def _to_grayscale(image: Image.Image) -> Image.Image:
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        # 투명 배경은 흰색으로 (그대로 변환하면 검은 배경이 됨)
+        rgba = image.convert("RGBA")
+        image = Image.alpha_composite(Image.new("RGBA", rgba.size, (255, 255, 255, 255)), rgba)
+    return image.convert("L")
+
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    """그레이스케일 픽셀의 Otsu 이진화 임계값"""
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    probabilities = histogram / max(histogram.sum(), 1)
+    omega = np.cumsum(probabilities)
+    mu = np.cumsum(probabilities * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1 - omega))
+    return int(np.argmax(np.nan_to_num(between)))
+
+
+def _ink_mask(gray: Image.Image) -> Image.Image:
+    """잉크(글자)가 255, 배경이 0인 이미지"""
+    threshold = otsu_threshold(np.asarray(gray))
+    return gray.point(lambda value: 255 if value <= threshold else 0)
+
+
+def _profile_score(ink: Image.Image, angle: float) -> float:
+    # 글자 줄이 수평일수록 행별 잉크 합계의 변화가 커짐
+    rows = np.asarray(ink.rotate(angle, resample=Image.NEAREST, fillcolor=0)).sum(axis=1, dtype=np.float64)
+    return float(np.sum(np.diff(rows) ** 2))
+
+
+def estimate_skew(ink: Image.Image) -> float:
+    """행 투영 프로파일로 기울기(도) 추정 (ink: _ink_mask 결과, 축소 이미지 권장)"""
+    coarse = np.arange(-_MAX_SKEW, _MAX_SKEW + _COARSE_STEP / 2, _COARSE_STEP)
+    best = max(coarse, key=lambda angle: _profile_score(ink, angle))
+    fine = np.arange(best - _COARSE_STEP, best + _COARSE_STEP + _FINE_STEP / 2, _FINE_STEP)
+    return round(float(max(fine, key=lambda angle: _profile_score(ink, angle))), 2)
+
+
+def estimate_line_height(ink: Image.Image):
+    """잉크가 있는 연속된 행(글자 줄)의 높이 중앙값 (줄이 3개 미만이면 None)"""
+    rows = np.asarray(ink).mean(axis=1) > 255 * 0.01
+    edges = np.diff(np.concatenate(([0], rows.astype(np.int8), [0])))
+    heights = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    heights = heights[heights >= 2]
+    if len(heights) < 3:
+        return None
+    return float(np.median(heights))
+
+
+def _image_dpi(image: Image.Image):
+    dpi = image.info.get("dpi")
+    if not dpi:
+        return None
+    value = float(dpi[0])
+    return value if _TRUSTED_DPI[0] <= value <= _TRUSTED_DPI[1] else None
+
+
+def preprocess(image: Image.Image, dpi: float = None) -> Image.Image:
+    """OCR 전처리 (그레이스케일, 기울기 보정, 해상도 정규화, 이진화)
+
+    dpi를 알면(예: PDF 래스터화 해상도) OCR_TARGET_DPI로 맞추고, 모르면 이미지에 기록된 DPI나
+    글자 줄 높이로 배율을 정합니다. 긴 변은 OCR_MAX_SIDE를 넘지 않습니다.
+    """
+    dpi = dpi or _image_dpi(image)
+    gray = _to_grayscale(image)
+
+    reduction = max(1, gray.width // _ANALYSIS_WIDTH)
+    small_ink = _ink_mask(gray.reduce(reduction) if reduction > 1 else gray)
+    angle = estimate_skew(small_ink) if OCR_DESKEW else 0.0
+    if abs(angle) >= _FINE_STEP:
+        small_ink = small_ink.rotate(angle, resample=Image.NEAREST, fillcolor=0)
+
+    scale = 1.0
+    if dpi:
+        scale = OCR_TARGET_DPI / dpi
+    else:
+        line_height = estimate_line_height(small_ink)
+        if line_height:
+            scale = _TARGET_LINE_HEIGHT / (line_height * reduction)
+    scale = min(scale, _MAX_UPSCALE, OCR_MAX_SIDE / max(gray.size))
+    if abs(scale - 1) > 0.15:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS if scale < 1 else Image.BICUBIC)
+
+    if abs(angle) >= _FINE_STEP:
+        gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    if OCR_BINARIZE:
+        threshold = otsu_threshold(np.asarray(gray))
+        gray = gray.point(lambda value: 255 if value > threshold else 0)
+    return gray
+
+
+def split_tiles(image: Image.Image, tile_height: int = OCR_TILE_HEIGHT) -> list:
+    """큰 이미지를 가로 띠로 분할 (경계 근처에서 잉크가 가장 적은 행을 잘라 글자 줄이 끊기지 않게)"""
+    if image.height <= tile_height * 1.5:
+        return [image]
+    ink = (np.asarray(image) < 128).sum(axis=1)
+    window = tile_height // 4
+    cuts = [0]
+    while image.height - cuts[-1] > tile_height * 1.5:
+        low = cuts[-1] + tile_height - window
+        cuts.append(low + int(np.argmin(ink[low:low + 2 * window])))
+    cuts.append(image.height)
+    return [image.crop((0, top, image.width, bottom)) for top, bottom in zip(cuts, cuts[1:])]
+
+
+# ---- 인식 ----
+
+def ocr_images(images: list, dpi: float = None) -> list:
+    """이미지(페이지) 목록 OCR - 전처리와 타일 인식을 스레드 풀에서 병렬로, 입력 순서대로 텍스트 반환"""
+    _ensure_process_state()
+    if len(images) == 1:
+        tile_lists = [split_tiles(preprocess(images[0], dpi))]
+    else:
+        tile_lists = list(_executor.map(lambda image: split_tiles(preprocess(image, dpi)), images))
+
+    tiles = [tile for tile_list in tile_lists for tile in tile_list]
+    texts = iter([_recognize(tiles[0])] if len(tiles) == 1 else _executor.map(_recognize, tiles))
+    return ["\n".join(next(texts).strip() for _ in tile_list).strip() for tile_list in tile_lists]
+
+
+def ocr_file(file_path: str) -> list:
+    """이미지 파일 OCR (멀티 페이지 TIFF/GIF는 페이지별) - 페이지별 텍스트 목록"""
+    with Image.open(file_path) as image:
+        pages = [frame.copy() for frame in ImageSequence.Iterator(image)]
+        for page in pages:
+            # frame.copy()에는 DPI 정보가 빠지는 경우가 있어 원본 정보를 유지
+            page.info.setdefault("dpi", image.info.get("dpi"))
+    return ocr_images(pages)
+
+
+def extract_document_from_image(file_path: str) -> dict:
+    """이미지에서 OCR로 문서 추출 (멀티 페이지 TIFF는 페이지 번호 포함)"""
+    source = os.path.basename(file_path)
+    try:
+        pages = ocr_file(file_path)
+    except Exception as e:
+        return error_document(f"OCR 처리 오류: {str(e)}", source)
+    if len(pages) == 1:
+        return text_document(pages[0], source)
+    builder = DocumentBuilder(source)
+    for number, text in enumerate(pages, 1):
+        builder.start_page(number)
+        builder.add_text(text)
+    return builder.build()
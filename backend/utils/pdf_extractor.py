@@ -0,0 +1,86 @@
+"""PDF 추출기 (페이지 단위 텍스트 추출, 텍스트 레이어가 없는 페이지만 OCR)"""
+import io
+import hashlib
+import os
+
+import PyPDF2
+
+from config import PDF_MIN_TEXT_CHARS, PDF_OCR_DPI
+from utils.cache import result_cache, make_key
+from utils.document import error_document
+from utils.file_processor import EXTRACTOR_VERSION, pdf_pages_to_document
+
+def _pdf_page_hash(page) -> str:
+    """PDF 페이지 내용 해시 (콘텐츠 스트림 + 포함된 이미지 원본 데이터)"""
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    if xobjects is not None:
+        for name, ref in sorted(xobjects.get_object().items(), key=lambda item: item[0]):
+            digest.update(name.encode('utf-8'))
+            digest.update(getattr(ref.get_object(), "_data", b"") or b"")
+    return digest.hexdigest()
+
+def _ocr_pdf_page(file_path: str, page, page_number: int) -> str:
+    """텍스트 레이어가 없는 PDF 페이지 OCR (래스터화, 실패 시 페이지 내 이미지 사용)"""
+    # 텍스트 레이어가 있는 PDF만 처리하는 워커는 OCR 엔진(numpy, pytesseract 등)을 불러오지 않음
+    from utils.ocr import ocr_images
+
+    try:
+        from pdf2image import convert_from_path
+        images = convert_from_path(file_path, dpi=PDF_OCR_DPI, first_page=page_number, last_page=page_number,
+                                   grayscale=True)
+        dpi = PDF_OCR_DPI
+    except Exception as e:
+        # poppler가 없는 환경에서는 스캔 페이지에 포함된 이미지를 직접 OCR (해상도는 전처리에서 추정)
+        print(f"⚠️ PDF 래스터화 실패, 페이지 이미지로 OCR ({page_number}페이지): {e}")
+        from PIL import Image
+        images = [Image.open(io.BytesIO(image.data)) for image in page.images]
+        dpi = None
+    return "\n".join(ocr_images(images, dpi=dpi)) if images else ""
+
+def extract_pdf_page_range(file_path: str, start: int, end: int) -> list:
+    """PDF의 [start, end) 페이지 추출 (추출 워커 프로세스에서 실행)"""
+    pdf_reader = PyPDF2.PdfReader(file_path)
+    pages = []
+    for index in range(start, end):
+        page = pdf_reader.pages[index]
+        try:
+            key = make_key("pdf_page", _pdf_page_hash(page), EXTRACTOR_VERSION)
+            cached = result_cache.get(key)
+            if cached is not None:
+                pages.append({**cached, "page": index + 1})
+                continue
+            
+            text = page.extract_text() or ""
+            ocr = False
+            if len(text.strip()) < PDF_MIN_TEXT_CHARS:
+                # 텍스트 레이어가 없는 스캔 페이지만 OCR
+                text = _ocr_pdf_page(file_path, page, index + 1)
+                ocr = True
+            result_cache.set(key, {"text": text, "ocr": ocr})
+            pages.append({"page": index + 1, "text": text, "ocr": ocr})
+        except Exception as e:
+            message = f"페이지 처리 오류: {str(e)}"
+            pages.append({"page": index + 1, "text": message, "ocr": False, "error": message})
+    return pages
+
+def get_pdf_page_count(file_path: str) -> int:
+    """PDF 전체 페이지 수"""
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+def extract_document_from_pdf(file_path: str) -> dict:
+    """PDF에서 문서 추출 (현재 프로세스에서 전체 페이지를 순서대로)
+
+    분석에서는 services.extraction_service가 페이지 묶음을 추출 워커 프로세스에 나눠 병렬로 처리합니다.
+    """
+    source = os.path.basename(file_path)
+    try:
+        pages = extract_pdf_page_range(file_path, 0, get_pdf_page_count(file_path))
+        return pdf_pages_to_document(pages, source)
+    except Exception as e:
+        return error_document(f"PDF 처리 오류: {str(e)}", source)
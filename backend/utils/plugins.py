@@ -0,0 +1,107 @@
+"""무거운 엔진 지연 로딩 레지스트리와 시작 비용 리포트
+
+파일 형식별 추출기(PDF/DOCX/HWP/이미지 OCR)와 STT 백엔드는 PyPDF2, python-docx, PIL, pytesseract,
+torch/whisper처럼 import만으로 수백 ms~수 초와 수백 MB를 쓰는 모듈에 의존합니다.
+각 엔진은 "패키지.모듈:속성" 문자열로 등록하고, 처음 사용할 때(대부분 추출 워커 프로세스 안에서) 불러옵니다.
+로드마다 소요 시간과 RSS 증가량을 기록해 startup_report()로 확인할 수 있습니다.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+
+# import 비용이 큰 모듈 (API 프로세스에 올라와 있는지 리포트에 표시)
+HEAVY_MODULES = ("torch", "whisper", "numpy", "PIL", "pytesseract", "tesserocr", "PyPDF2", "docx", "hwp5", "pdf2image")
+
+# (종류, 이름) -> "패키지.모듈:속성" (속성이 없으면 모듈 자체)
+_registry = {}
+# (종류, 이름) -> 불러온 객체
+_loaded = {}
+_lock = threading.Lock()
+
+# 로드 기록과 서버 시작 단계별 소요 시간
+_load_log = []
+_boot = {}
+
+
+class PluginNotFoundError(LookupError):
+    """등록되지 않은 플러그인"""
+
+
+def rss_mb():
+    """현재 프로세스 메모리(RSS, MB) - /proc이 없는 환경은 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        return None
+
+
+def register(kind: str, name: str, target: str) -> None:
+    """플러그인 등록 (import하지 않음)"""
+    _registry[(kind, name)] = target
+
+
+def names(kind: str) -> list:
+    return [name for registered_kind, name in _registry if registered_kind == kind]
+
+
+def resolve(target: str):
+    """"패키지.모듈:속성" 문자열을 import해서 객체 반환 (워커 프로세스에 함수를 이름으로 넘길 때 사용)"""
+    module_name, _, attribute = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute) if attribute else module
+
+
+def load(kind: str, name: str):
+    """플러그인을 처음 사용할 때 불러오고 이후에는 같은 객체 반환"""
+    plugin = _loaded.get((kind, name))
+    if plugin is not None:
+        return plugin
+    target = _registry.get((kind, name))
+    if target is None:
+        raise PluginNotFoundError(f"등록되지 않은 {kind} 플러그인: {name}")
+
+    with _lock:
+        plugin = _loaded.get((kind, name))
+        if plugin is None:
+            modules = len(sys.modules)
+            rss = rss_mb()
+            started = time.perf_counter()
+            plugin = resolve(target)
+            seconds = time.perf_counter() - started
+            after = rss_mb()
+            _loaded[(kind, name)] = plugin
+            entry = {
+                "kind": kind,
+                "name": name,
+                "target": target,
+                "pid": os.getpid(),
+                "seconds": round(seconds, 4),
+                "modules": len(sys.modules) - modules,
+                "rss_delta_mb": round(after - rss, 1) if rss is not None and after is not None else None,
+            }
+            _load_log.append(entry)
+            print(f"📦 플러그인 로드: {kind}/{name} ({entry['seconds']:.2f}초, 모듈 {entry['modules']}개"
+                  + (f", +{entry['rss_delta_mb']}MB" if entry["rss_delta_mb"] is not None else "") + ")")
+    return plugin
+
+
+def mark_boot(stage: str, started: float) -> None:
+    """서버 시작 단계 소요 시간 기록 (started: time.perf_counter() 기준 시작 시각)"""
+    _boot[stage] = round(time.perf_counter() - started, 4)
+
+
+def startup_report() -> dict:
+    """시작 단계별 소요 시간, 현재 RSS, 불러온 모듈 수, 무거운 모듈 로드 여부, 플러그인 로드 기록"""
+    return {
+        "boot_seconds": dict(_boot),
+        "rss_mb": rss_mb(),
+        "modules": len(sys.modules),
+        "heavy_modules": {name: name in sys.modules for name in HEAVY_MODULES},
+        "plugins": {
+            "registered": {f"{kind}/{name}": target for (kind, name), target in _registry.items()},
+            "loaded": list(_load_log),
+        },
+    }
@@ -0,0 +1,92 @@
+"""업로드 파일 저장소
+
+업로드 파일은 "business_plan_{uuid}.pdf" 같은 키(UploadedFile.file_path)로 저장하고, 분석하는 프로세스는
+fetch_many()로 로컬 디렉토리(local_root)에 파일이 있는지 확인한 뒤 local_root 기준 경로로 읽습니다.
+
+- LocalStorage: 로컬 디스크 또는 여러 서버가 마운트한 공유 볼륨 (local_root 자체가 저장소)
+- S3Storage: S3 호환 저장소 (`pip install boto3` 필요). local_root는 서버별 캐시로 쓰이며,
+  업로드를 받은 서버는 파일을 올린 뒤 로컬 사본을 남겨두고, 다른 서버는 처음 분석할 때 내려받습니다.
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def is_storage_key(key: str) -> bool:
+    """업로드 키 형식인지 (디렉토리 없는 파일 이름)"""
+    return bool(key) and os.path.basename(key) == key and key not in (".", "..")
+
+
+class LocalStorage:
+    """로컬 디스크/공유 볼륨 저장소 (업로드 디렉토리가 곧 저장소)"""
+
+    def __init__(self, local_root: str):
+        self.local_root = local_root
+        os.makedirs(local_root, exist_ok=True)
+
+    def save(self, key: str) -> None:
+        """local_root/key에 기록된 업로드 파일 저장 (로컬 저장소는 할 일 없음)"""
+
+    def fetch_many(self, keys: list) -> None:
+        """분석할 파일을 local_root 아래로 준비 (로컬 저장소는 이미 있음)"""
+
+
+class S3Storage:
+    """S3 호환 저장소 (AWS S3, MinIO 등)"""
+
+    def __init__(self, local_root: str, bucket: str, prefix: str = "", endpoint_url: str = None,
+                 max_concurrency: int = 4):
+        import boto3
+
+        self.local_root = local_root
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_concurrency = max_concurrency
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        os.makedirs(local_root, exist_ok=True)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def save(self, key: str) -> None:
+        """local_root/key 파일을 저장소에 올림 (로컬 사본은 캐시로 남김)"""
+        self._client.upload_file(os.path.join(self.local_root, key), self.bucket, self._object_key(key))
+        print(f"☁️ 업로드 저장: s3://{self.bucket}/{self._object_key(key)}")
+
+    def _fetch(self, key: str) -> None:
+        path = os.path.join(self.local_root, key)
+        if os.path.exists(path):
+            return
+        # 업로드 키에 UUID가 들어 있어 내용이 바뀌지 않으므로 한 번 받은 파일은 그대로 재사용
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            self._client.download_file(self.bucket, self._object_key(key), tmp_path)
+            os.replace(tmp_path, path)
+            print(f"☁️ 저장소에서 받음: {key}")
+        except Exception as e:
+            # 없는 파일은 분석 단계에서 파일별 오류로 표시
+            print(f"❌ 저장소에서 받기 실패 {key}: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def fetch_many(self, keys: list) -> None:
+        """분석할 파일 중 로컬에 없는 것을 동시에 내려받음"""
+        # 업로드 키는 파일 이름뿐이므로 디렉토리가 들어간 경로(../ 등)는 받지 않음
+        missing = [key for key in dict.fromkeys(keys)
+                   if is_storage_key(key) and not os.path.exists(os.path.join(self.local_root, key))]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(missing))) as executor:
+            list(executor.map(self._fetch, missing))
+
+
+def create_storage(backend: str, local_root: str, bucket: str = "", prefix: str = "", endpoint_url: str = ""):
+    """STORAGE_BACKEND 설정에 맞는 저장소 생성"""
+    if backend == "s3":
+        if not bucket:
+            raise ValueError("STORAGE_BACKEND=s3에는 S3_BUCKET 설정이 필요합니다.")
+        return S3Storage(local_root, bucket, prefix, endpoint_url)
+    if backend != "local":
+        raise ValueError(f"지원하지 않는 저장소: {backend}")
+    return LocalStorage(local_root)
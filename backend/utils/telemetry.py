@@ -0,0 +1,244 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+from config import TRACE_ENABLED, TRACE_DIR
+
+# 단계별 소요 시간 히스토그램 구간 (초)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# /metrics에 함께 내보내는 분위수 (최근 RECENT_SAMPLES개 기준)
+QUANTILES = (0.5, 0.95, 0.99)
+RECENT_SAMPLES = 1000
+# 스팬 속성 중 단계별 합계를 카운터로 내보내는 값
+COUNTED_ATTRIBUTES = (
+    "bytes", "characters", "audio_seconds", "pages", "ocr_pages",
+    "prompt_tokens", "cached_tokens", "completion_tokens", "retries", "tokens_saved",
+)
+
+_lock = threading.Lock()
+_histograms = {}
+_totals = defaultdict(float)
+_errors = defaultdict(int)
+
+# 현재 요청의 트레이스와 실행 중인 스팬 (asyncio 작업/스레드로 전파됨)
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    """파이프라인 단계/파일/LLM 호출 하나의 측정 구간"""
+
+    def __init__(self, name: str, attributes: dict, parent_id: str = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, **counts) -> None:
+        for key, value in counts.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def fail(self, message: str) -> None:
+        """예외 없이 실패를 반환하는 경우(오류 문자열 등)에도 오류로 집계"""
+        self.error = message
+
+
+def _histogram(name: str) -> dict:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = {
+            "buckets": [0] * len(DURATION_BUCKETS),
+            "sum": 0.0,
+            "count": 0,
+            "recent": deque(maxlen=RECENT_SAMPLES),
+        }
+        _histograms[name] = histogram
+    return histogram
+
+
+def record_span(name: str, duration: float, attributes: dict = None, error: str = None,
+                span_id: str = None, parent_id: str = None, started: float = None) -> None:
+    """끝난 구간 하나를 메트릭과 현재 트레이스에 기록
+
+    with span(...)을 쓸 수 없는 곳(비동기 제너레이터 등)에서는 직접 호출합니다.
+    """
+    attributes = attributes or {}
+    with _lock:
+        histogram = _histogram(name)
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                histogram["buckets"][index] += 1
+        histogram["sum"] += duration
+        histogram["count"] += 1
+        histogram["recent"].append(duration)
+        if error:
+            _errors[name] += 1
+        for key in COUNTED_ATTRIBUTES:
+            value = attributes.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                _totals[(key, name)] += value
+
+    trace = _current_trace.get()
+    if trace is not None:
+        if parent_id is None:
+            parent = _current_span.get()
+            parent_id = parent.id if parent else None
+        started = started if started is not None else time.time() - duration
+        trace["spans"].append({
+            "id": span_id or uuid.uuid4().hex[:12],
+            "parent": parent_id,
+            "name": name,
+            "start": round(started - trace["started_at"], 4),
+            "duration": round(duration, 4),
+            "attributes": attributes,
+            "error": error,
+        })
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """with 블록의 소요 시간과 속성(bytes, characters, 토큰 수 등)을 측정
+
+    블록 안에서 예외가 나면 오류로 집계하고 예외는 그대로 전달합니다.
+    이름은 메트릭 레이블로 쓰이므로 파일명처럼 값이 계속 바뀌는 정보는 속성에 넣습니다.
+    """
+    parent = _current_span.get()
+    current = Span(name, attributes, parent.id if parent else None)
+    token = _current_span.set(current)
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = current.error or f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _current_span.reset(token)
+        record_span(name, duration, current.attributes, current.error,
+                    span_id=current.id, parent_id=current.parent_id, started=started_at)
+
+
+def annotate(**attributes) -> None:
+    """실행 중인 스팬에 속성 추가 (스팬 밖이면 무시)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def count(**counts) -> None:
+    """실행 중인 스팬의 카운트 속성 증가 (예: retries=1)"""
+    current = _current_span.get()
+    if current is not None:
+        current.add(**counts)
+
+
+@contextlib.contextmanager
+def start_trace(name: str, **attributes):
+    """요청 하나의 트레이스 시작 - 블록 안의 모든 스팬을 모아 TRACE_ENABLED이면 TRACE_DIR에 JSON으로 저장"""
+    trace = {
+        "trace_id": uuid.uuid4().hex,
+        "name": name,
+        "started_at": time.time(),
+        "attributes": attributes,
+        "spans": [],
+    }
+    token = _current_trace.set(trace)
+    try:
+        with span(name, **attributes):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        trace["duration"] = round(time.time() - trace["started_at"], 4)
+        if TRACE_ENABLED:
+            _write_trace(trace)
+
+
+def _write_trace(trace: dict) -> None:
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"{trace['trace_id']}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False, indent=2, default=str)
+        print(f"🧭 트레이스 저장: {path} ({trace['duration']:.1f}초, 스팬 {len(trace['spans'])}개)")
+    except Exception as e:
+        print(f"⚠️ 트레이스 저장 실패: {e}")
+
+
+def _quantile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def get_stage_stats() -> dict:
+    """단계별 호출 수, 오류 수, 평균/p50/p95/p99 소요 시간(초)"""
+    with _lock:
+        stats = {}
+        for name, histogram in sorted(_histograms.items()):
+            recent = sorted(histogram["recent"])
+            stats[name] = {
+                "count": histogram["count"],
+                "errors": _errors.get(name, 0),
+                "avg": histogram["sum"] / histogram["count"] if histogram["count"] else 0.0,
+                **{f"p{int(q * 100)}": _quantile(recent, q) for q in QUANTILES},
+            }
+        return stats
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    """Prometheus 텍스트 형식의 메트릭"""
+    lines = [
+        "# HELP station_c_stage_duration_seconds 파이프라인 단계/파일/LLM 호출 소요 시간",
+        "# TYPE station_c_stage_duration_seconds histogram",
+    ]
+    with _lock:
+        histograms = {name: (list(h["buckets"]), h["sum"], h["count"], sorted(h["recent"]))
+                      for name, h in sorted(_histograms.items())}
+        errors = dict(_errors)
+        totals = dict(_totals)
+
+    for name, (buckets, total, calls, _) in histograms.items():
+        stage = _label(name)
+        for bound, value in zip(DURATION_BUCKETS, buckets):
+            lines.append(f'station_c_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {value}')
+        lines.append(f'station_c_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {calls}')
+        lines.append(f'station_c_stage_duration_seconds_sum{{stage="{stage}"}} {total}')
+        lines.append(f'station_c_stage_duration_seconds_count{{stage="{stage}"}} {calls}')
+
+    lines.append(f"# HELP station_c_stage_duration_quantile_seconds 최근 {RECENT_SAMPLES}회 기준 소요 시간 분위수")
+    lines.append("# TYPE station_c_stage_duration_quantile_seconds gauge")
+    for name, (_, _, _, recent) in histograms.items():
+        for q in QUANTILES:
+            lines.append(
+                f'station_c_stage_duration_quantile_seconds{{stage="{_label(name)}",quantile="{q}"}} {_quantile(recent, q)}'
+            )
+
+    lines.append("# HELP station_c_stage_errors_total 단계별 오류 수")
+    lines.append("# TYPE station_c_stage_errors_total counter")
+    for name in histograms:
+        lines.append(f'station_c_stage_errors_total{{stage="{_label(name)}"}} {errors.get(name, 0)}')
+
+    for key in COUNTED_ATTRIBUTES:
+        values = {name: value for (attribute, name), value in totals.items() if attribute == key}
+        if not values:
+            continue
+        lines.append(f"# HELP station_c_stage_{key}_total 단계별 {key} 합계")
+        lines.append(f"# TYPE station_c_stage_{key}_total counter")
+        for name, value in sorted(values.items()):
+            lines.append(f'station_c_stage_{key}_total{{stage="{_label(name)}"}} {value}')
+
+    return "\n".join(lines) + "\n"
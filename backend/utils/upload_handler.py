@@ -0,0 +1,215 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import uuid
+from contextlib import contextmanager
+
+import aiofiles
+
+from config import UPLOAD_CHUNK_SIZE
+
+# 분할 업로드 중인 파일과 메타데이터 저장 위치 (업로드 디렉토리 하위)
+PARTIAL_DIR_NAME = ".partial"
+
+# 진행 중인 분할 업로드의 (누적 해시, 해시에 반영된 바이트 수)
+# 프로세스별 값이라 다른 API 워커가 받은 청크는 빠져 있을 수 있으므로, 바이트 수가 파일 크기와 다르면 파일에서 다시 계산
+_session_hashes = {}
+
+
+class UploadTooLargeError(Exception):
+    """업로드 파일이 허용 크기를 넘은 경우"""
+
+
+class UploadSessionError(Exception):
+    """분할 업로드 세션 오류 (없는 세션, 오프셋 불일치 등)"""
+
+
+def make_upload_path(prefix: str, filename: str, file_id: str) -> str:
+    """업로드 디렉토리 기준 저장 파일명 생성"""
+    file_extension = filename.split('.')[-1] if '.' in filename else ''
+    return f"{prefix}_{file_id}.{file_extension}"
+
+
+async def save_upload_stream(upload, full_path: str, max_bytes: int) -> tuple:
+    """업로드 파일을 고정 크기 청크로 디스크에 저장하면서 SHA-256 계산
+
+    파일 크기와 관계없이 메모리 사용량은 청크 하나 크기로 일정합니다.
+    max_bytes를 넘으면 저장 중인 파일을 지우고 UploadTooLargeError를 발생시킵니다.
+    반환값은 (파일 크기, SHA-256)입니다.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(full_path, 'wb') as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"파일 크기가 허용 한도({max_bytes // (1024 * 1024)}MB)를 초과했습니다.")
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        if os.path.exists(full_path):
+            os.remove(full_path)
+        raise
+    return size, digest.hexdigest()
+
+
+def _partial_dir(upload_dir: str) -> str:
+    path = os.path.join(upload_dir, PARTIAL_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _session_paths(upload_dir: str, upload_id: str) -> tuple:
+    # upload_id는 경로 조작을 막기 위해 UUID 형식만 허용
+    try:
+        upload_id = str(uuid.UUID(upload_id))
+    except ValueError:
+        raise UploadSessionError("잘못된 업로드 ID입니다.")
+    base = os.path.join(_partial_dir(upload_dir), upload_id)
+    return f"{base}.json", f"{base}.part"
+
+
+def _read_session(meta_path: str) -> dict:
+    if not os.path.exists(meta_path):
+        raise UploadSessionError("업로드 세션을 찾을 수 없습니다.")
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_session(meta_path: str, session: dict) -> None:
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(session, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+
+@contextmanager
+def _locked_session(part_path: str):
+    """세션 파일 잠금 (같은 세션에 동시에 들어온 요청이 같은 오프셋에 중복 기록하지 않도록, 프로세스 간 공유)"""
+    try:
+        fd = os.open(part_path, os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        raise UploadSessionError("업로드 세션을 찾을 수 없습니다.")
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadSessionError("같은 업로드 세션에 다른 요청이 기록 중입니다.")
+        yield
+    finally:
+        os.close(fd)
+
+
+def _session_digest(upload_id: str, part_path: str, offset: int):
+    """offset 바이트까지의 누적 해시 (캐시된 해시가 다른 길이를 덮고 있으면 파일에서 다시 계산)"""
+    cached = _session_hashes.pop(upload_id, None)
+    if cached is not None and cached[1] == offset:
+        return cached[0]
+    return _rehash(part_path, offset)
+
+
+def create_upload_session(upload_dir: str, prefix: str, filename: str, total_size: int, max_bytes: int) -> dict:
+    """분할(재개 가능) 업로드 세션 생성"""
+    if total_size > max_bytes:
+        raise UploadTooLargeError(f"파일 크기가 허용 한도({max_bytes // (1024 * 1024)}MB)를 초과했습니다.")
+
+    upload_id = str(uuid.uuid4())
+    meta_path, part_path = _session_paths(upload_dir, upload_id)
+    session = {
+        "upload_id": upload_id,
+        "prefix": prefix,
+        "filename": filename,
+        "total_size": total_size,
+        "max_bytes": max_bytes,
+        "offset": 0,
+    }
+    open(part_path, 'wb').close()
+    _write_session(meta_path, session)
+    _session_hashes[upload_id] = (hashlib.sha256(), 0)
+    return session
+
+
+def get_upload_session(upload_dir: str, upload_id: str) -> dict:
+    """업로드 세션 상태 조회 (재개 시 현재 오프셋 확인용)"""
+    meta_path, part_path = _session_paths(upload_dir, upload_id)
+    session = _read_session(meta_path)
+    # 메타데이터 기록 전에 중단된 경우에도 실제 파일 크기를 기준으로 재개
+    session["offset"] = os.path.getsize(part_path)
+    return session
+
+
+def _rehash(part_path: str, length: int):
+    digest = hashlib.sha256()
+    remaining = length
+    with open(part_path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
+
+
+async def append_upload_chunk(upload_dir: str, upload_id: str, offset: int, stream) -> dict:
+    """요청 본문 스트림을 세션 파일의 offset 위치에 이어서 기록
+
+    오프셋 확인부터 기록까지 세션 파일을 잠그므로, 같은 세션에 동시에 들어온 요청은 UploadSessionError가 됩니다.
+    """
+    meta_path, part_path = _session_paths(upload_dir, upload_id)
+    _read_session(meta_path)
+    with _locked_session(part_path):
+        session = get_upload_session(upload_dir, upload_id)
+        if offset != session["offset"]:
+            raise UploadSessionError(f"오프셋이 일치하지 않습니다 (현재 {session['offset']}).")
+
+        digest = await asyncio.to_thread(_session_digest, upload_id, part_path, offset)
+        size = offset
+        async with aiofiles.open(part_path, 'ab') as f:
+            async for chunk in stream:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > session["max_bytes"]:
+                    raise UploadTooLargeError(f"파일 크기가 허용 한도({session['max_bytes'] // (1024 * 1024)}MB)를 초과했습니다.")
+                digest.update(chunk)
+                await f.write(chunk)
+                # 중간에 끊겨도 해시와 기록된 바이트 수가 맞도록 청크마다 갱신
+                _session_hashes[upload_id] = (digest, size)
+
+        session["offset"] = size
+        _write_session(meta_path, session)
+    return session
+
+
+def complete_upload_session(upload_dir: str, upload_id: str) -> dict:
+    """분할 업로드 완료 처리 - 최종 파일명으로 옮기고 크기/해시와 업로드 종류(prefix) 반환
+
+    해시를 파일에서 다시 계산할 수 있으므로 이벤트 루프 밖(asyncio.to_thread)에서 호출합니다.
+    """
+    meta_path, part_path = _session_paths(upload_dir, upload_id)
+    _read_session(meta_path)
+    with _locked_session(part_path):
+        session = get_upload_session(upload_dir, upload_id)
+        if session["total_size"] and session["offset"] != session["total_size"]:
+            raise UploadSessionError(f"업로드가 완료되지 않았습니다 ({session['offset']}/{session['total_size']} 바이트).")
+
+        digest = _session_digest(upload_id, part_path, session["offset"])
+        file_path = make_upload_path(session["prefix"], session["filename"], upload_id)
+        os.replace(part_path, os.path.join(upload_dir, file_path))
+        os.remove(meta_path)
+
+    return {
+        "file_id": upload_id,
+        "filename": session["filename"],
+        "file_path": file_path,
+        "size": session["offset"],
+        "sha256": digest.hexdigest(),
+        "prefix": session["prefix"],
+    }
@@ -0,0 +1,95 @@
+"""분석 작업 워커
+
+사용법:
+    python worker.py [--concurrency N]
+
+API 서버(main.py)가 POST /jobs로 대기열에 넣은 분석 작업을 가져와 실행합니다. STT/OCR처럼 CPU를 많이 쓰는
+단계는 이 프로세스에서 실행되므로, API 서버는 RUN_JOB_WORKERS=false / WHISPER_PRELOAD=false로 가볍게 두고
+워커 프로세스를 코어/서버 수에 맞춰 따로 늘릴 수 있습니다.
+대기열(JOB_QUEUE_BACKEND)과 업로드 저장소(STORAGE_BACKEND)는 API 서버와 같은 설정을 사용해야 합니다.
+POST /batches로 등록된 배치 중 실행하던 서버가 죽어서 끝나지 않은 배치도 임대가 만료되면 이어서 실행합니다
+(결과 번들은 BATCH_OUTPUT_DIR에 저장되므로 API 서버와 같은 디렉토리를 써야 다운로드할 수 있음).
+SIGTERM/Ctrl+C로 종료하면 실행 중이던 작업은 대기열로 돌아가 다른 워커가 이어서 실행합니다.
+"""
+import argparse
+import asyncio
+import signal
+
+from config import (
+    WHISPER_PRELOAD,
+    UPLOAD_DIR,
+    STORAGE_BACKEND,
+    S3_BUCKET,
+    S3_PREFIX,
+    S3_ENDPOINT_URL,
+    ANALYSIS_DB_PATH,
+    JOBS_DB_PATH,
+    MAX_RUNNING_JOBS,
+    JOB_QUEUE_BACKEND,
+    REDIS_URL,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL,
+    BATCH_DB_PATH,
+    BATCH_OUTPUT_DIR,
+    BATCH_MAX_COMPANIES,
+)
+from services.analysis_store import AnalysisStore
+from services.batch_manager import BatchManager
+from services.job_manager import JobManager
+from services.job_queue import create_job_queue
+from services.pipeline import run_analysis
+from services.stt_service import preload_whisper_models, shutdown_stt_pool
+from services.gpt_service import init_llm_client, close_llm_client
+from utils.storage import create_storage
+
+
+async def main(concurrency: int) -> None:
+    storage = create_storage(STORAGE_BACKEND, UPLOAD_DIR, S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL)
+    analysis_store = AnalysisStore(ANALYSIS_DB_PATH)
+
+    async def run_stored_analysis(request, progress):
+        await asyncio.to_thread(storage.fetch_many, request.business_plan_files + request.meeting_audio_files)
+        return await run_analysis(request, UPLOAD_DIR, progress, store=analysis_store)
+
+    manager = JobManager(
+        create_job_queue(JOB_QUEUE_BACKEND, JOBS_DB_PATH, REDIS_URL, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS),
+        concurrency,
+        run_stored_analysis,
+        JOB_POLL_INTERVAL,
+    )
+    batch_manager = BatchManager(
+        BATCH_DB_PATH,
+        BATCH_OUTPUT_DIR,
+        BATCH_MAX_COMPANIES,
+        run_stored_analysis,
+        lease_seconds=JOB_LEASE_SECONDS,
+    )
+
+    if WHISPER_PRELOAD:
+        await asyncio.to_thread(preload_whisper_models)
+    init_llm_client()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    manager.start_workers()
+    batch_manager.start_recovery()
+    try:
+        await stop.wait()
+    finally:
+        print(f"🛑 워커 종료 중 ({manager.worker_id})")
+        await batch_manager.shutdown()
+        await manager.shutdown()
+        await close_llm_client()
+        shutdown_stt_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Station C 분석 작업 워커")
+    parser.add_argument("--concurrency", type=int, default=MAX_RUNNING_JOBS,
+                        help="이 프로세스에서 동시에 실행하는 작업 수 (기본값: MAX_RUNNING_JOBS)")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { AnalysisRequest, AnalysisResponse, UploadedFile } from '@/types';
+import { AnalysisRequest, AnalysisResponse, AnalysisStreamEvent, UploadedFile } from '@/types';
 
 const API_BASE_URL = 'http://localhost:8002';
 
@@ -40,3 +40,48 @@ export const analyzeDocuments = async (request: AnalysisRequest): Promise<Analys
   const response = await api.post('/analyze', request);
   return response.data;
 };
+
+export const analyzeDocumentsStream = async (
+  request: AnalysisRequest,
+  onEvent: (event: AnalysisStreamEvent) => void,
+): Promise<void> => {
+  const response = await fetch(`${API_BASE_URL}/analyze/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`분석 요청 실패: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE 메시지는 빈 줄로 구분됨
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let type = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event: ')) type = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) {
+        onEvent({ type, ...JSON.parse(data) } as AnalysisStreamEvent);
+      }
+    }
+  }
+};
@@ -11,20 +11,55 @@ export interface AnalysisRequest {
 }
 
 export interface AnalysisResponse {
+  analysis_id?: string;
   business_plan_summary: string;
   meeting_summary: string;
   extracted_kpis: string;
+  kpi_table?: {
+    term: string;
+    kind: 'money' | 'percent' | 'headcount' | 'year' | 'count';
+    value: number;
+    unit: string;
+    text: string;
+    source: string;
+    start: number;
+    end: number;
+    page: number | null;
+  }[];
   reports: {
     growth: string;
     kpi: string;
     strategy: string;
   };
+  llm_usage?: {
+    calls: number;
+    prompt_tokens: number;
+    cached_tokens: number;
+    completion_tokens: number;
+  };
+  transcript_compaction?: {
+    raw_tokens: number;
+    compact_tokens: number;
+    tokens_saved: number;
+    segments: number;
+    dropped_noise: number;
+    dropped_duplicates: number;
+  };
 }
 
+export type AnalysisStreamEvent =
+  | { type: 'progress'; stage: string; status: string; data: Record<string, unknown> }
+  | { type: 'token'; section: string; delta: string }
+  | { type: 'section'; section: string; text: string }
+  | { type: 'result'; data: AnalysisResponse }
+  | { type: 'error'; detail: string };
+
 export interface UploadedFile {
   file_id: string;
   filename: string;
   file_path: string;
+  size?: number;
+  sha256?: string;
 }
 
 export interface FileUpload {